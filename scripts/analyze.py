@@ -1,16 +1,30 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
+import contextlib
 import getopt
+import io
 import os
 import sys
+import traceback
 
+from game_manifest import GameManifest
+from game_watcher import GameWatcher
 from gambit_html_exporter import GambitHtmlExporter
 from game_list_manager import GameListManager
+from gambit_parse_cache import GambitParseCache
 from gambit_parser import GambitParser
+from log import GambitError
+from profiler import profiler
+from term_index import TermIndex, collectTerms
 
 SRC_DIR = "../src"
 OUTPUT_DIR = "../games"
+CACHE_DIR = "../.cache/parse"
+MANIFEST_FILE = "../.cache/manifest.json"
+PROFILE_FILE = "../.cache/profile.json"
+TERM_INDEX_FILE = "../.cache/terms.db"
 
 def warning(msg):
 	print(f"WARNING: {msg}")
@@ -23,16 +37,112 @@ class Analyzer:
 		self.useWarnings = True
 
 		self.gameMgr = GameListManager()
+		self.parseCache = None
+		self.manifest = None
+		self.termIndex = None
+		# Games in the term index when processAll started.
+		self.indexedGames = None
+		# Terms (from collectTerms) for the most recently analyzed game.
+		self.lastTerms = None
+
+		# Number of worker processes used by processAll.
+		self.jobs = 1
+
+	def enableParseCache(self):
+		self.parseCache = GambitParseCache(CACHE_DIR, os.path.join(SRC_DIR, "_import.gm"))
+
+	# Only rebuild games whose inputs have changed since the last run.
+	def enableIncremental(self):
+		self.manifest = GameManifest(MANIFEST_FILE, SRC_DIR, OUTPUT_DIR)
+
+	# Record the terms defined or imported by each game in the term index.
+	def enableTermIndex(self):
+		self.termIndex = TermIndex(TERM_INDEX_FILE)
 	
 	# ==========
 	# Process .GM files
 	# ==========
 	
 	def processAll(self, options):
-		for (id, gameInfo) in self.gameMgr.nextGame():
-			self.processOne(id, options)
+		ids = self.gameMgr.gameOrder
+		if self.manifest:
+			ids = [id for id in ids if self.isStale(id)]
+		try:
+			if self.jobs > 1:
+				self.processAllParallel(ids, options)
+			else:
+				for id in ids:
+					self.processOne(id, options)
+					self.updateManifest(id)
+		finally:
+			if self.manifest:
+				self.manifest.save()
+			if self.termIndex:
+				self.termIndex.removeOtherGames(self.gameMgr.gameOrder)
+				self.termIndex.save()
+		if self.manifest:
+			self.reportRebuilt(ids)
+
+	# Return true if the game |id| needs to be rebuilt in incremental mode.
+	# A game that is missing from the term index (e.g., if the index was
+	# deleted or reset, or the last run used --no-term-index) is also
+	# rebuilt so that the index is filled in.
+	def isStale(self, id):
+		if self.manifest.isStale(id):
+			return True
+		if self.termIndex:
+			if self.indexedGames is None:
+				self.indexedGames = set(self.termIndex.getGames())
+			return not id in self.indexedGames
+		return False
+
+	def updateManifest(self, id):
+		if self.manifest:
+			self.manifest.update(id)
+
+	def updateTermIndex(self, id, terms):
+		if self.termIndex:
+			self.termIndex.updateGame(id, terms)
+
+	def reportRebuilt(self, ids):
+		total = len(self.gameMgr.gameOrder)
+		if not ids:
+			print(f"All {total} games are up to date")
+		else:
+			print(f"Rebuilt {len(ids)} of {total} games: {', '.join(ids)}")
+
+	# Process the games in a pool of worker processes. The output for each
+	# game is reported in list order, and an error in one game does not
+	# stop the others from being processed.
+	def processAllParallel(self, ids, options):
+		useCache = self.parseCache is not None
+		failed = []
+		with concurrent.futures.ProcessPoolExecutor(self.jobs) as executor:
+			futures = [executor.submit(processGame, id, options, useCache, profiler.enabled) for id in ids]
+			for future in futures:
+				result = future.result()
+				print(result.output, end='')
+				if result.profile:
+					profiler.addGame(result.id, result.profile)
+				if result.error:
+					failed.append(result.id)
+				else:
+					self.updateManifest(result.id)
+					self.updateTermIndex(result.id, result.terms)
+		print(f"Processed {len(ids)} games with {self.jobs} jobs")
+		if failed:
+			print(f"ERROR: {len(failed)} games failed: {', '.join(failed)}")
+			sys.exit(1)
 
 	def processOne(self, id, options):
+		profiler.setGame(id)
+		try:
+			self.analyzeGame(id, options)
+		finally:
+			profiler.setGame(None)
+		self.updateTermIndex(id, self.lastTerms)
+
+	def analyzeGame(self, id, options):
 		print(f"Analyzing {id}...")
 		if not os.path.isdir(OUTPUT_DIR):
 			os.makedirs(OUTPUT_DIR)
@@ -45,11 +155,18 @@ class Analyzer:
 
 		filename = f"{gameInfo.basepath}.gm"
 		filepath = os.path.join(SRC_DIR, filename)
-		parser.process(SRC_DIR, filepath)
+		with profiler.span("parse"):
+			if self.parseCache:
+				self.parseCache.process(parser, SRC_DIR, filepath)
+			else:
+				parser.process(SRC_DIR, filepath)
+
+		self.lastTerms = collectTerms(parser, SRC_DIR)
 
 		summary = parser.calc.getSummary()
 		gameInfo.updateScore(summary)
-		gameInfo.save()
+		with profiler.span("xml-save"):
+			gameInfo.save()
 
 		if self.showCost:
 			self.printCost(parser.calc)
@@ -62,7 +179,8 @@ class Analyzer:
 		dir = os.path.dirname(outpath)
 		if not os.path.isdir(dir):
 			os.makedirs(dir)
-		htmlExporter.writeHtml(outpath)
+		with profiler.span("html"):
+			htmlExporter.writeHtml(outpath)
 	
 	def printCost(self, calc):
 		scoreTotal, sections = calc.getSummary()
@@ -92,41 +210,139 @@ class Analyzer:
 			print(f"| {name:<20} {scoreTotal:>3}    {percent:>5.1f}% |")
 			print("+------------------------------------+")
 
+class GameResult:
+	"""Result of processing a single game in a worker process."""
+	def __init__(self, id):
+		self.id = id
+		self.output = ""
+		self.error = None
+		# Profile spans for the game, if profiling is enabled.
+		self.profile = None
+		# Terms for the term index (from collectTerms).
+		self.terms = None
+
+# Analyzer for the current worker process, so that its caches are reused
+# for each game processed by the worker.
+workerAnalyzer = None
+
+def processGame(id, options, useCache, profile=False):
+	global workerAnalyzer
+	if not workerAnalyzer:
+		workerAnalyzer = Analyzer()
+		if useCache:
+			workerAnalyzer.enableParseCache()
+	if profile and not profiler.enabled:
+		profiler.enable()
+
+	result = GameResult(id)
+	output = io.StringIO()
+	with contextlib.redirect_stdout(output):
+		try:
+			workerAnalyzer.processOne(id, options)
+			result.terms = workerAnalyzer.lastTerms
+		except GambitError as e:
+			result.error = str(e)
+		except Exception as e:
+			result.error = str(e)
+			print(traceback.format_exc(), end='')
+	result.output = output.getvalue()
+	if profile:
+		result.profile = profiler.getGameSpans(id)
+	return result
+
 def usage():
 	print("Usage: %s [<options>] [<game>]" % sys.argv[0])
 	print("where <options> are:")
+	print("  --compact [-c]")  # store line info in a LineTable
+	print("  --incremental [-i]")  # only rebuild games whose inputs have changed
+	print("  --jobs [-j] <n>")  # process games with <n> worker processes
+	print("  --cprofile <file>")  # also write cProfile stats to <file> (with --profile)
+	print("  --no-cache")  # don't use (or update) the parse cache
+	print("  --no-term-index")  # don't update the term index (../.cache/terms.db)
+	print("  --profile")  # write the time spent in each phase to ../.cache/profile.json
 	print("  --verbose [-v]")  # verbose debug output
 	print("  --warnings [-w]")  # verbose debug output
+	print("  --watch")  # regenerate games whenever their source files change
 	print("if <game> is not specified, then all games will be processed")
+	print("with --profile, the parse time for uncached games is split into lex+vocab and")
+	print("refs+costs (each is a single pass, so the vocab and refs aren't timed separately)")
 
 def main():
 	try:
 		opts, args = getopt.getopt(sys.argv[1:],
-			'vw',
-			['verbose', 'warnings'])
+			'cij:vw',
+			['compact', 'cprofile=', 'incremental', 'jobs=', 'no-cache', 'no-term-index', 'profile',
+				'verbose', 'warnings', 'watch'])
 	except getopt.GetoptError:
 		usage()
 		exit()
 
+	useCache = True
+	useTermIndex = True
+	incremental = False
+	watch = False
+	jobs = 1
+	profile = False
+	cprofilePath = None
 	options = {
+		'compact': False,
 		'verbose': False,
 		'warnings': False,
 	}
 
 	for opt, arg in opts:
+		if opt in ('-c', '--compact'):
+			options['compact'] = True
+		if opt in ('-i', '--incremental'):
+			incremental = True
+		if opt in ('-j', '--jobs'):
+			jobs = int(arg)
+		if opt == '--cprofile':
+			cprofilePath = arg
+		if opt == '--no-cache':
+			useCache = False
+		if opt == '--no-term-index':
+			useTermIndex = False
+		if opt == '--profile':
+			profile = True
 		if opt in ('-v', '--verbose'):
 			options['verbose'] = True
 		if opt in ('-w', '--warnings'):
 			options['warnings'] = True
+		if opt == '--watch':
+			watch = True
 		
 
+	if profile:
+		profiler.enable(cprofilePath is not None)
+
 	analyzer = Analyzer()
-	if args:
-		analyzer.showCost = True
-		for gameId in args:
-			analyzer.processOne(gameId, options)
-	else:
-		analyzer.processAll(options)
+	analyzer.jobs = jobs
+	if useCache:
+		analyzer.enableParseCache()
+	if incremental:
+		analyzer.enableIncremental()
+	if useTermIndex:
+		analyzer.enableTermIndex()
+	if watch:
+		ids = args if args else analyzer.gameMgr.gameOrder
+		GameWatcher(analyzer, SRC_DIR, options, ids).run()
+		return
+	try:
+		if args:
+			analyzer.showCost = True
+			for gameId in args:
+				analyzer.processOne(gameId, options)
+		else:
+			analyzer.processAll(options)
+	except GambitError:
+		# The error has already been reported.
+		sys.exit(0)
+	finally:
+		if analyzer.termIndex:
+			analyzer.termIndex.save()
+		if profile:
+			profiler.save(PROFILE_FILE, cprofilePath)
 
 if __name__ == '__main__':
 	main()
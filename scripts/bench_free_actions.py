@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import glob
+import os
+import sys
+import time
+
+from gambit import LineCategory
+from gambit_free_actions import FreeActionMatcher, isFreeActionReference
+from gambit_parser import GambitParser
+
+SRC_DIR = "../src"
+
+class FreeActionBenchmark:
+	"""Compare free action matching throughput on the DESC lines in the corpus."""
+	def __init__(self, repeat):
+		self.repeat = repeat
+		# List of (line, vocab) for each DESC/CONSTRAINT line.
+		self.lines = []
+
+	def loadCorpus(self):
+		importFile = os.path.join(SRC_DIR, "_import.gm")
+		for path in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+			parser = GambitParser({})
+			parser.loadImportableTerms(importFile)
+			parser.process(SRC_DIR, path)
+			for r in parser.lineInfo:
+				if r.lineType in LineCategory.DESCRIPTION:
+					self.lines.append((r.line, parser.vocab))
+
+	# Return the number of lines checked per second by |isFree|.
+	def measure(self, isFree):
+		lines = self.lines
+		best = None
+		for i in range(self.repeat):
+			start = time.perf_counter()
+			for (line, vocab) in lines:
+				isFree(line, vocab)
+			elapsed = time.perf_counter() - start
+			if best is None or elapsed < best:
+				best = elapsed
+		return len(lines) / best
+
+	def run(self):
+		self.loadCorpus()
+		matcher = FreeActionMatcher()
+		numFree = sum([1 for (line, vocab) in self.lines if matcher.isFree(line, vocab)])
+		print(f"Corpus: {len(self.lines)} DESC lines ({numFree} free), best of {self.repeat} runs")
+		before = self.measure(isFreeActionReference)
+		after = self.measure(matcher.isFree)
+		print(f"  Pattern loop:      {before:>12,.0f} lines/sec")
+		print(f"  FreeActionMatcher: {after:>12,.0f} lines/sec")
+		print(f"  Speedup:           {after / before:>12.2f}x")
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --repeat <n> [-r]")  # number of timed runs over the corpus
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'r:',
+			['repeat='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	repeat = 20
+	for opt, arg in opts:
+		if opt in ('-r', '--repeat'):
+			repeat = int(arg)
+
+	FreeActionBenchmark(repeat).run()
+
+if __name__ == '__main__':
+	main()
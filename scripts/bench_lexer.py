@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import glob
+import os
+import sys
+import time
+
+from gambit_lexer import GambitLexer
+from gambit_line_processor import GambitLineProcessor
+
+SRC_DIR = "../src"
+
+class LexerBenchmark:
+	"""Compare line lexing throughput on the .gm corpus."""
+	def __init__(self, repeat):
+		self.repeat = repeat
+		self.lines = []
+
+	def loadCorpus(self):
+		files = glob.glob(os.path.join(SRC_DIR, "*.gm"))
+		files += glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))
+		for path in sorted(files):
+			with open(path, 'r') as file:
+				self.lines.extend(file.readlines())
+
+	# Return the number of lines processed per second by |processLine|.
+	def measure(self, processLine):
+		lines = self.lines
+		best = None
+		for i in range(self.repeat):
+			start = time.perf_counter()
+			lineNum = 0
+			for line in lines:
+				lineNum += 1
+				processLine(lineNum, line)
+			elapsed = time.perf_counter() - start
+			if best is None or elapsed < best:
+				best = elapsed
+		return len(lines) / best
+
+	def run(self):
+		self.loadCorpus()
+		print(f"Corpus: {len(self.lines)} lines, best of {self.repeat} runs")
+		before = self.measure(GambitLineProcessor.processLine)
+		after = self.measure(GambitLexer.processLine)
+		print(f"  GambitLineProcessor: {before:>12,.0f} lines/sec")
+		print(f"  GambitLexer:         {after:>12,.0f} lines/sec")
+		print(f"  Speedup:             {after / before:>12.2f}x")
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --repeat <n> [-r]")  # number of timed runs over the corpus
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'r:',
+			['repeat='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	repeat = 20
+	for opt, arg in opts:
+		if opt in ('-r', '--repeat'):
+			repeat = int(arg)
+
+	LexerBenchmark(repeat).run()
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import gc
+import getopt
+import glob
+import os
+import sys
+import tracemalloc
+
+from gambit_parser import GambitParser
+
+SRC_DIR = "../src"
+
+class MemoryBenchmark:
+	"""Compare memory retained by GambitLineInfo lists and LineTables."""
+	def __init__(self, numGames):
+		self.numGames = numGames
+
+	# Return the .gm files with the most lines.
+	def largestGames(self):
+		sizes = []
+		for path in glob.glob(os.path.join(SRC_DIR, "*", "*.gm")):
+			with open(path, 'r') as file:
+				sizes.append((len(file.readlines()), path))
+		sizes.sort(reverse=True)
+		return sizes[:self.numGames]
+
+	# Return the number of bytes retained by a parser after processing |path|.
+	def measure(self, path, compact):
+		gc.collect()
+		tracemalloc.start()
+		parser = GambitParser({'compact': compact})
+		parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+		parser.process(SRC_DIR, path)
+		gc.collect()
+		(current, peak) = tracemalloc.get_traced_memory()
+		tracemalloc.stop()
+		return current
+
+	def run(self):
+		print(f"{'Game':<24} {'Lines':>6} {'List':>10} {'LineTable':>10} {'Saved':>7}")
+		for (numLines, path) in self.largestGames():
+			name = os.path.splitext(os.path.basename(path))[0]
+			before = self.measure(path, False)
+			after = self.measure(path, True)
+			saved = 100 * (before - after) / before
+			print(f"{name:<24} {numLines:>6} {before:>10,} {after:>10,} {saved:>6.1f}%")
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --games <n> [-g]")  # number of (largest) games to measure
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'g:',
+			['games='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	numGames = 5
+	for opt, arg in opts:
+		if opt in ('-g', '--games'):
+			numGames = int(arg)
+
+	MemoryBenchmark(numGames).run()
+
+if __name__ == '__main__':
+	main()
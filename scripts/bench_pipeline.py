@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import getopt
+import io
+import os
+import sys
+import time
+
+from gambit_html_exporter import GambitHtmlExporter
+from gambit_parser import GambitParser
+from game_list_manager import GameListManager
+
+SRC_DIR = "../src"
+
+PHASES = ["lex", "references", "costs", "totals", "html-rows"]
+
+# Phases that are replaced by the fused GambitCalc.processLines.
+FUSED_PHASES = ["references", "costs", "totals"]
+
+class PipelineBenchmark:
+	"""Time each phase of the analysis pipeline over the full game list."""
+	def __init__(self, repeat):
+		self.repeat = repeat
+		self.gameMgr = GameListManager()
+
+	# Return the time (in seconds) spent in each phase for a single run
+	# over all of the games.
+	def runOnce(self):
+		times = dict.fromkeys(PHASES + ["fused"], 0.0)
+		for (id, gameInfo) in self.gameMgr.nextGame():
+			parser = GambitParser({})
+			parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+			parser.currentDir = SRC_DIR
+			with open(os.path.join(SRC_DIR, f"{gameInfo.basepath}.gm"), 'r') as file:
+				lines = file.readlines()
+
+			start = time.perf_counter()
+			for line in lines:
+				parser.processLine(line)
+			lexed = time.perf_counter()
+			parser.extractAllReferences()
+			referenced = time.perf_counter()
+			parser.calc.updateCosts(parser.lineInfo)
+			costed = time.perf_counter()
+			parser.calc.calcTotalCost(parser.lineInfo)
+			totaled = time.perf_counter()
+			GambitHtmlExporter(parser, gameInfo).writeTableRows(io.StringIO())
+			exported = time.perf_counter()
+			# Repeating the passes gives the same results. Start with an empty
+			# isDefinedTerm cache as in the costs phase.
+			parser.vocab.clearCache()
+			fusedStart = time.perf_counter()
+			parser.calc.processLines(parser.lineInfo)
+			fused = time.perf_counter()
+
+			times["lex"] += lexed - start
+			times["references"] += referenced - lexed
+			times["costs"] += costed - referenced
+			times["totals"] += totaled - costed
+			times["html-rows"] += exported - totaled
+			times["fused"] += fused - fusedStart
+		return times
+
+	def run(self):
+		best = None
+		# Discard warnings from the parser.
+		with contextlib.redirect_stdout(io.StringIO()):
+			for i in range(self.repeat):
+				times = self.runOnce()
+				if best is None:
+					best = times
+				for phase in times:
+					best[phase] = min(best[phase], times[phase])
+
+		print(f"Best of {self.repeat} runs over {len(self.gameMgr.gameOrder)} games")
+		for phase in PHASES:
+			print(f"  {phase:<12} {1000 * best[phase]:>8.2f} ms")
+		print(f"  {'total':<12} {1000 * sum([best[p] for p in PHASES]):>8.2f} ms")
+		separate = sum([best[p] for p in FUSED_PHASES])
+		print(f"Fused references/costs/totals: {1000 * best['fused']:.2f} ms (vs {1000 * separate:.2f} ms)")
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --repeat <n> [-r]")  # number of timed runs over the game list
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'r:',
+			['repeat='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	repeat = 10
+	for opt, arg in opts:
+		if opt in ('-r', '--repeat'):
+			repeat = int(arg)
+
+	PipelineBenchmark(repeat).run()
+
+if __name__ == '__main__':
+	main()
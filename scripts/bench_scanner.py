@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import glob
+import os
+import sys
+import time
+
+from gambit import LineCategory, LineType
+from gambit_generator import GambitGenerator
+from gambit_line_info import GambitLineInfo
+from gambit_parser import GambitParser
+from gambit_scanner import GambitScanner
+from gambit_vocab import GambitVocab
+
+SRC_DIR = "../src"
+
+class ScannerBenchmark:
+	"""Compare the trie scanner with the per-word reference extraction."""
+	def __init__(self, repeat):
+		self.repeat = repeat
+
+	# Return the best time (in seconds) of |repeat| calls to |func|.
+	def measure(self, func):
+		best = None
+		for i in range(self.repeat):
+			start = time.perf_counter()
+			func()
+			elapsed = time.perf_counter() - start
+			if best is None or elapsed < best:
+				best = elapsed
+		return best
+
+	# Return the (vocab, texts) for each game in the corpus, where |texts|
+	# are the lines and comments that references are extracted from.
+	def loadCorpus(self):
+		games = []
+		for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+			parser = GambitParser({})
+			parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+			parser.process(SRC_DIR, filepath)
+			texts = []
+			for info in parser.lineInfo:
+				if info.lineType in LineCategory.TEXT and info.line:
+					texts.append(info.line)
+				if info.lineComment:
+					texts.append(info.lineComment)
+			games.append((parser.vocab, texts))
+		return games
+
+	# Return a vocab with |numTerms| terms, and |numLines| DESC lines that
+	# refer to them.
+	def createSynthetic(self, numTerms, numLines):
+		vocab = GambitVocab()
+		generator = GambitGenerator(numLines)
+		generator.nouns = []
+		for i in range(numTerms):
+			term = generator.newTerm("Term")
+			if i % 10 == 0:
+				generator.plurals[term] = term + "Group"
+			vocab.addDef(term, generator.plurals.get(term), ["Noun"], None)
+			generator.nouns.append(term)
+		return (vocab, [generator.desc() for i in range(numLines)])
+
+	# Extract the references with GambitLineInfo.extractReference (which
+	# splits the line into words and resolves each word).
+	def extractWords(self, games):
+		info = GambitLineInfo(0, LineType.DESC)
+		for (vocab, texts) in games:
+			for text in texts:
+				info.extractReference(text, "Noun", vocab, True)
+
+	def extractScanner(self, games, scanners):
+		for ((vocab, texts), scanner) in zip(games, scanners):
+			for text in texts:
+				for (start, end, term) in scanner.scan(text):
+					vocab.addReference(term, "Noun")
+
+	def run(self, name, games):
+		numTexts = sum([len(texts) for (vocab, texts) in games])
+		numTerms = sum([len(vocab.vocab) for (vocab, texts) in games])
+		scanners = [GambitScanner(vocab) for (vocab, texts) in games]
+		start = time.perf_counter()
+		for scanner in scanners:
+			scanner.update()
+		buildTime = time.perf_counter() - start
+
+		wordsTime = self.measure(lambda: self.extractWords(games))
+		scannerTime = self.measure(lambda: self.extractScanner(games, scanners))
+		print(f"{name}: {numTexts} lines, {numTerms} terms")
+		print(f"  Trie build:     {1000 * buildTime:>10.1f} ms")
+		print(f"  Per-word:       {1000 * wordsTime:>10.1f} ms")
+		print(f"  Scanner:        {1000 * scannerTime:>10.1f} ms")
+		print(f"  Speedup:        {wordsTime / scannerTime:>10.2f}x")
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --lines <n> [-l]")  # number of synthetic lines
+	print("  --repeat <n> [-r]")  # number of timed runs for each benchmark
+	print("  --terms <n> [-t]")  # number of synthetic terms
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'l:r:t:',
+			['lines=', 'repeat=', 'terms='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	numLines = 20000
+	numTerms = 50000
+	repeat = 5
+	for opt, arg in opts:
+		if opt in ('-l', '--lines'):
+			numLines = int(arg)
+		elif opt in ('-r', '--repeat'):
+			repeat = int(arg)
+		elif opt in ('-t', '--terms'):
+			numTerms = int(arg)
+
+	benchmark = ScannerBenchmark(repeat)
+	benchmark.run("Corpus", benchmark.loadCorpus())
+	benchmark.run("Synthetic", [benchmark.createSynthetic(numTerms, numLines)])
+
+if __name__ == '__main__':
+	main()
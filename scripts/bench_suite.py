@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import getopt
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from build_index import IndexBuilder
+from gambit_generator import calcGamePath, writeCorpus
+from gambit_html_exporter import GambitHtmlExporter, GM_CSS_PATH
+from gambit_parser import GambitParser
+from game_info import GameInfo
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_FILE = os.path.join(SCRIPT_DIR, "../src/_import.gm")
+RESULTS_FILE = "../.cache/bench.json"
+BASELINE_FILE = "../.cache/bench_baseline.json"
+
+# A benchmark regresses if it is this much slower than the baseline.
+DEFAULT_THRESHOLD = 1.25
+
+class BenchmarkSuite:
+	"""Time the main stages of the pipeline on generated .gm files."""
+	def __init__(self, numLines, numGames, repeat):
+		self.numLines = numLines
+		self.numGames = numGames
+		self.repeat = repeat
+		self.ids = []
+
+	# Name used to match results with the baseline.
+	def getConfig(self):
+		return f"lines={self.numLines},games={self.numGames}"
+
+	# The scripts use paths relative to the scripts directory (like
+	# "../src"), so the benchmarks run in a scripts directory inside a
+	# temporary root, next to the generated src directory.
+	@contextlib.contextmanager
+	def tempRoot(self):
+		cwd = os.getcwd()
+		with tempfile.TemporaryDirectory() as root:
+			srcDir = os.path.join(root, "src")
+			scriptsDir = os.path.join(root, "scripts")
+			os.makedirs(srcDir)
+			os.makedirs(scriptsDir)
+			shutil.copyfile(os.path.join(SCRIPT_DIR, GM_CSS_PATH), os.path.join(scriptsDir, GM_CSS_PATH))
+			self.ids = writeCorpus(srcDir, IMPORT_FILE, self.numGames, self.numLines)
+			os.chdir(scriptsDir)
+			try:
+				yield "../src"
+			finally:
+				os.chdir(cwd)
+
+	# Return the best time (in seconds) of |repeat| calls to |func|. If
+	# |setup| is given, it is called before each run (and not timed), and
+	# its result is passed to |func|.
+	def measure(self, func, setup=None):
+		best = None
+		for i in range(self.repeat):
+			if setup:
+				arg = setup()
+				start = time.perf_counter()
+				func(arg)
+			else:
+				start = time.perf_counter()
+				func()
+			elapsed = time.perf_counter() - start
+			if best is None or elapsed < best:
+				best = elapsed
+		return best
+
+	def createParser(self, srcDir):
+		parser = GambitParser({})
+		parser.loadImportableTerms(os.path.join(srcDir, "_import.gm"))
+		return parser
+
+	def parseAll(self, srcDir):
+		parsers = []
+		for id in self.ids:
+			parser = self.createParser(srcDir)
+			parser.process(srcDir, calcGamePath(srcDir, id))
+			parsers.append(parser)
+		return parsers
+
+	# Return parsers with the references extracted, but without costs.
+	def parseWithoutCosts(self, srcDir):
+		parsers = []
+		for id in self.ids:
+			parser = self.createParser(srcDir)
+			parser.currentDir = srcDir
+			with open(calcGamePath(srcDir, id), 'r') as file:
+				for line in file:
+					parser.processLine(line)
+			parser.extractAllReferences()
+			parsers.append(parser)
+		return parsers
+
+	def run(self):
+		results = {}
+		with self.tempRoot() as srcDir:
+			numLines = sum([len(p.lines) for p in self.parseAll(srcDir)])
+			results['parse'] = self.measure(lambda: self.parseAll(srcDir))
+			results['updateCosts'] = self.measure(
+				lambda parsers: [p.calc.updateCosts(p.lineInfo) for p in parsers],
+				lambda: self.parseWithoutCosts(srcDir))
+			parsers = self.parseAll(srcDir)
+			games = [GameInfo(id) for id in self.ids]
+			results['writeHtml'] = self.measure(lambda: self.writeHtml(parsers, games))
+			results['indexBuild'] = self.measure(self.buildIndex)
+		return {
+			'config': self.getConfig(),
+			'lines': numLines,
+			'repeat': self.repeat,
+			'results': {name: round(1000 * seconds, 3) for (name, seconds) in results.items()},
+		}
+
+	def writeHtml(self, parsers, games):
+		for (parser, gameInfo) in zip(parsers, games):
+			outpath = calcGamePath("../games", gameInfo.id)[:-3] + ".html"
+			if not os.path.isdir(os.path.dirname(outpath)):
+				os.makedirs(os.path.dirname(outpath))
+			GambitHtmlExporter(parser, gameInfo).writeHtml(outpath)
+
+	def buildIndex(self):
+		# Ignore the progress output from the index builder.
+		with contextlib.redirect_stdout(io.StringIO()):
+			IndexBuilder().build()
+
+# Return the benchmarks in |results| that are slower than the baseline by
+# more than |threshold|, as a list of (name, baseline ms, current ms).
+def findRegressions(results, baseline, threshold):
+	regressions = []
+	for (name, ms) in results['results'].items():
+		if name in baseline['results'] and ms > baseline['results'][name] * threshold:
+			regressions.append((name, baseline['results'][name], ms))
+	return regressions
+
+def loadBaselines(path):
+	if not os.path.isfile(path):
+		return {}
+	with open(path, 'r') as file:
+		return json.load(file)
+
+def saveJson(path, data):
+	dir = os.path.dirname(path)
+	if dir and not os.path.isdir(dir):
+		os.makedirs(dir)
+	with open(path, 'w') as file:
+		json.dump(data, file, indent=1, sort_keys=True)
+
+def printResults(results, baseline):
+	print(f"{results['config']}: {results['lines']} lines, best of {results['repeat']} runs")
+	for (name, ms) in results['results'].items():
+		line = f"  {name:<12} {ms:>10.1f} ms"
+		if baseline and name in baseline['results']:
+			line += f"  ({ms / baseline['results'][name]:.2f}x baseline)"
+		print(line)
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --baseline <file> [-b]")  # baseline file (default ../.cache/bench_baseline.json)
+	print("  --games <n> [-g]")  # number of generated games
+	print("  --lines <n> [-l]")  # number of lines in each generated game
+	print("  --repeat <n> [-r]")  # number of timed runs for each benchmark
+	print("  --save-baseline")  # record the results as the new baseline
+	print("  --threshold <x> [-t]")  # slowdown (vs the baseline) that is a regression
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'b:g:l:r:t:',
+			['baseline=', 'games=', 'lines=', 'repeat=', 'save-baseline', 'threshold='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	baselinePath = BASELINE_FILE
+	numGames = 5
+	numLines = 10000
+	repeat = 3
+	saveBaseline = False
+	threshold = DEFAULT_THRESHOLD
+	for opt, arg in opts:
+		if opt in ('-b', '--baseline'):
+			baselinePath = arg
+		elif opt in ('-g', '--games'):
+			numGames = int(arg)
+		elif opt in ('-l', '--lines'):
+			numLines = int(arg)
+		elif opt in ('-r', '--repeat'):
+			repeat = int(arg)
+		elif opt == '--save-baseline':
+			saveBaseline = True
+		elif opt in ('-t', '--threshold'):
+			threshold = float(arg)
+
+	# Make the relative paths independent of the current directory.
+	baselinePath = os.path.join(SCRIPT_DIR, baselinePath)
+	resultsPath = os.path.join(SCRIPT_DIR, RESULTS_FILE)
+
+	suite = BenchmarkSuite(numLines, numGames, repeat)
+	results = suite.run()
+	saveJson(resultsPath, results)
+
+	baselines = loadBaselines(baselinePath)
+	baseline = baselines.get(results['config'])
+	printResults(results, baseline)
+
+	if saveBaseline:
+		baselines[results['config']] = results
+		saveJson(baselinePath, baselines)
+		print(f"Baseline saved to {baselinePath}")
+	elif baseline:
+		regressions = findRegressions(results, baseline, threshold)
+		for (name, before, after) in regressions:
+			print(f"REGRESSION: {name} {before:.1f} ms -> {after:.1f} ms")
+		if regressions:
+			sys.exit(1)
+	else:
+		print(f"No baseline for {results['config']} (use --save-baseline)")
+
+if __name__ == '__main__':
+	main()
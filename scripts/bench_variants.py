@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import os
+import sys
+import tempfile
+import time
+
+from gambit import LineType
+from gambit_parser import GambitParser
+from gambit_variants import GambitVariantScorer, VariantPatch
+
+SRC_DIR = "../src"
+
+class VariantBenchmark:
+	"""Compare scoring variants with a shared base parse against full reparses."""
+	def __init__(self, path, numVariants):
+		self.path = path
+		self.numVariants = numVariants
+		self.importFile = os.path.join(SRC_DIR, "_import.gm")
+
+	# Create variants that each duplicate one of the DESC lines in the file.
+	def createVariants(self, scorer):
+		lineInfo = scorer.parser.lineInfo
+		rows = [i for i in range(len(lineInfo)) if lineInfo[i].lineType == LineType.DESC]
+		step = max(1, len(rows) // self.numVariants)
+		variants = {}
+		for row in rows[::step][:self.numVariants]:
+			line = scorer.parser.lines[row]
+			variants[f"row{row}"] = [VariantPatch.addLines(row, [line])]
+		return variants
+
+	def scoreFull(self, scorer, variants):
+		results = {}
+		with tempfile.TemporaryDirectory() as tmpDir:
+			path = os.path.join(tmpDir, os.path.basename(self.path))
+			for (name, patches) in variants.items():
+				lines = list(scorer.parser.lines)
+				for (start, end, newLines) in reversed(scorer.resolvePatches(patches)):
+					lines[start:end] = newLines
+				with open(path, 'w') as file:
+					file.write("\n".join(lines) + "\n")
+				parser = GambitParser({})
+				parser.loadImportableTerms(self.importFile)
+				parser.process(SRC_DIR, path)
+				results[name] = parser.calc.getSummary()
+		return results
+
+	def run(self):
+		start = time.perf_counter()
+		scorer = GambitVariantScorer(SRC_DIR, self.path, self.importFile)
+		baseTime = time.perf_counter() - start
+		variants = self.createVariants(scorer)
+
+		start = time.perf_counter()
+		full = self.scoreFull(scorer, variants)
+		fullTime = time.perf_counter() - start
+
+		start = time.perf_counter()
+		patched = scorer.scoreAll(variants)
+		patchedTime = time.perf_counter() - start
+
+		if patched != full:
+			print("ERROR: Patched and full results are different")
+		print(f"{os.path.basename(self.path)}: {len(scorer.parser.lines)} lines, {len(variants)} variants")
+		print(f"  Base parse:     {1000 * baseTime:>10.1f} ms")
+		print(f"  Full reparse:   {1000 * fullTime:>10.1f} ms")
+		print(f"  Shared base:    {1000 * patchedTime:>10.1f} ms")
+		print(f"  Speedup:        {fullTime / patchedTime:>10.2f}x")
+
+def usage():
+	print("Usage: %s [<options>] [<gm-file>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --variants <n> [-n]")  # number of variants to score
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'n:',
+			['variants='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	numVariants = 50
+	for opt, arg in opts:
+		if opt in ('-n', '--variants'):
+			numVariants = int(arg)
+
+	path = os.path.join(SRC_DIR, "1", "1830.gm")
+	if len(args) == 1:
+		path = args[0]
+	elif len(args) > 1:
+		usage()
+		exit()
+
+	VariantBenchmark(path, numVariants).run()
+
+if __name__ == '__main__':
+	main()
@@ -7,11 +7,14 @@ import re
 import sys
 
 from game_list_manager import GameListManager
+from log import GambitError
+from profiler import profiler
 
 SRC_DIR = "../src"
 HTML_OUTPUT_FILE = "../index.html"
 HTML_FULL_OUTPUT_FILE = "../index_full.html"
 CSV_OUTPUT_FILE = "../data.csv"
+PROFILE_FILE = "../.cache/profile-index.json"
 
 def error(msg):
 	print(f"ERROR: {msg}")
@@ -147,15 +150,21 @@ class IndexBuilder:
 		out.write('</html>\n')
 
 	def build(self):
-		# Write public index file.
-		self.loadGames()
-		self.writeHtml(HTML_OUTPUT_FILE)
-
-		# Write full (all games) index file.
-		self.loadGames(True)
-		self.writeHtml(HTML_FULL_OUTPUT_FILE)
-
-		self.writeCsvData()
+		with profiler.span("index"):
+			# Write public index file.
+			with profiler.span("index-load"):
+				self.loadGames()
+			with profiler.span("index-html"):
+				self.writeHtml(HTML_OUTPUT_FILE)
+
+			# Write full (all games) index file.
+			with profiler.span("index-load"):
+				self.loadGames(True)
+			with profiler.span("index-html"):
+				self.writeHtml(HTML_FULL_OUTPUT_FILE)
+
+			with profiler.span("index-csv"):
+				self.writeCsvData()
 
 def htmlify(str):
 	str = str.replace("&", "&amp;")
@@ -164,25 +173,43 @@ def htmlify(str):
 def usage():
 	print("Usage: %s <options>" % sys.argv[0])
 	print("where <options> are:")
+	print("  --cprofile <file>")  # also write cProfile stats to <file> (with --profile)
+	print("  --profile")  # write the time spent in each phase to ../.cache/profile-index.json
 	print("  --verbose")  # verbose debug output
 
 def main():
 	try:
 		opts, args = getopt.getopt(sys.argv[1:],
 			'v',
-			['verbose'])
+			['cprofile=', 'profile', 'verbose'])
 	except getopt.GetoptError:
 		usage()
 		exit()
 
 	verbose = False
+	profile = False
+	cprofilePath = None
 	
 	for opt, arg in opts:
+		if opt == '--cprofile':
+			cprofilePath = arg
+		if opt == '--profile':
+			profile = True
 		if opt in ('-v', '--verbose'):
 			verbose = True
 
+	if profile:
+		profiler.enable(cprofilePath is not None)
+
 	builder = IndexBuilder()
-	builder.build()
+	try:
+		builder.build()
+	except GambitError:
+		# The error has already been reported.
+		sys.exit(0)
+	finally:
+		if profile:
+			profiler.save(PROFILE_FILE, cprofilePath)
 
 if __name__ == '__main__':
 	main()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import sys
+
+import numpy as np
+
+from game_list_manager import GameListManager
+from log import GambitError
+
+from typing import Dict, List, Optional, Tuple
+
+CSV_FILE = "../data.csv"
+
+DEFAULT_PERCENTILES = [10, 25, 50, 75, 90]
+
+class CorpusAnalytics:
+	"""Corpus-wide statistics over the score summaries of all games."""
+	def __init__(self, ids: List[str], summaries: List[list], weights: List[Optional[float]]):
+		# |summaries| are in the format returned by GambitCalc.getSummary:
+		# [total, [[section, cost, subsections], ...]].
+		self.ids = list(ids)
+
+		# Section names, in the order they are first seen.
+		self.sectionNames: List[str] = []
+		# Dict of section name -> column in |costs|.
+		self.sectionIndex: Dict[str, int] = {}
+
+		rows = []
+		cols = []
+		values = []
+		for (row, (total, sections)) in enumerate(summaries):
+			for (name, cost, subs) in sections:
+				if not name in self.sectionIndex:
+					self.sectionIndex[name] = len(self.sectionNames)
+					self.sectionNames.append(name)
+				rows.append(row)
+				cols.append(self.sectionIndex[name])
+				values.append(int(cost))
+
+		# Game x section cost matrix.
+		self.costs = np.zeros((len(self.ids), len(self.sectionNames)), dtype=np.int64)
+		np.add.at(self.costs, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)),
+				np.array(values, dtype=np.int64))
+		self.totals = np.array([int(s[0]) for s in summaries], dtype=np.int64)
+		# BGG weight for each game, or NaN if unknown.
+		self.weights = np.array([np.nan if w is None else float(w) for w in weights], dtype=np.float64)
+
+	# Load the summaries for all of the games in the game list.
+	@staticmethod
+	def fromGameList(gameMgr: Optional[GameListManager] = None) -> "CorpusAnalytics":
+		if gameMgr is None:
+			gameMgr = GameListManager()
+		ids = []
+		summaries = []
+		weights = []
+		for (id, info) in gameMgr.nextGame():
+			if not info.score_data:
+				continue
+			ids.append(id)
+			summaries.append(info.score_data)
+			weights.append(parseWeight(info.bgg_weight))
+		return CorpusAnalytics(ids, summaries, weights)
+
+	# Load the games from the CSV file written by build_index.py. The file
+	# only has the Vocabulary cost, so the rest of the cost is put in an
+	# "Other" section.
+	@staticmethod
+	def fromCsv(path: str = CSV_FILE) -> "CorpusAnalytics":
+		ids = []
+		summaries = []
+		weights = []
+		with open(path, 'r') as file:
+			for line in file:
+				line = line.strip()
+				if not line:
+					continue
+				# The title may contain commas.
+				(title, weight, vocab, score) = line.rsplit(',', 3)
+				ids.append(title)
+				summaries.append([score, [["Vocabulary", vocab, []], ["Other", int(score) - int(vocab), []]]])
+				weights.append(parseWeight(weight))
+		return CorpusAnalytics(ids, summaries, weights)
+
+	# Return the column of |costs| for |section|, or the totals if None.
+	def getColumn(self, section: Optional[str] = None) -> np.ndarray:
+		if section is None:
+			return self.totals
+		return self.costs[:, self.sectionIndex[section]]
+
+	# ==========
+	# Distributions
+	# ==========
+
+	# Return a histogram of the total scores as (counts, bin edges).
+	def histogram(self, bins=10, section: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+		return np.histogram(self.getColumn(section), bins=bins)
+
+	# Return the percentiles |qs| of the total scores.
+	def percentiles(self, qs: List[float] = DEFAULT_PERCENTILES, section: Optional[str] = None) -> np.ndarray:
+		return np.percentile(self.getColumn(section), qs)
+
+	# Return a (percentile x section) matrix of the percentiles |qs| of the
+	# cost of each section.
+	def sectionPercentiles(self, qs: List[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+		return np.percentile(self.costs, qs, axis=0)
+
+	# Return the (game x section) matrix of the fraction of each game's
+	# total score that comes from each section.
+	def sectionShare(self) -> np.ndarray:
+		totals = self.totals[:, np.newaxis].astype(np.float64)
+		return np.divide(self.costs, totals, out=np.zeros(self.costs.shape), where=totals != 0)
+
+	# Return the mean share of each section across all games.
+	def meanSectionShare(self) -> np.ndarray:
+		return self.sectionShare().mean(axis=0)
+
+	# ==========
+	# BGG weight
+	# ==========
+
+	# Return a mask of the games that have a BGG weight.
+	def hasWeight(self) -> np.ndarray:
+		return ~np.isnan(self.weights)
+
+	# Return the Pearson correlation between the BGG weight and the total
+	# score (the first entry) and the cost of each section.
+	def correlation(self) -> np.ndarray:
+		mask = self.hasWeight()
+		x = np.column_stack([self.totals, self.costs])[mask].astype(np.float64)
+		y = self.weights[mask]
+		x = x - x.mean(axis=0)
+		y = y - y.mean()
+		denom = np.sqrt((x * x).sum(axis=0) * (y * y).sum())
+		return np.divide(x.T @ y, denom, out=np.full(x.shape[1], np.nan), where=denom != 0)
+
+	# Fit BGG weight = slope * x + intercept by least squares, where x is the
+	# total score (or the cost of |section|), optionally on a log scale.
+	# Return (slope, intercept, r2).
+	def regression(self, section: Optional[str] = None, log: bool = False) -> Tuple[float, float, float]:
+		mask = self.hasWeight()
+		x = self.getColumn(section)[mask].astype(np.float64)
+		if log:
+			x = np.log1p(x)
+		y = self.weights[mask]
+		a = np.column_stack([x, np.ones_like(x)])
+		((slope, intercept), residuals, rank, sv) = np.linalg.lstsq(a, y, rcond=None)
+		ssTotal = ((y - y.mean()) ** 2).sum()
+		ssResidual = ((y - a @ np.array([slope, intercept])) ** 2).sum()
+		r2 = 1.0 - ssResidual / ssTotal if ssTotal != 0 else 0.0
+		return (float(slope), float(intercept), float(r2))
+
+	# ==========
+	# Report
+	# ==========
+
+	def report(self, qs: List[float] = DEFAULT_PERCENTILES) -> None:
+		print(f"Games: {len(self.ids)} ({int(self.hasWeight().sum())} with BGG weight)")
+		header = ''.join([f"{'p' + format(q, 'g'):>8}" for q in qs])
+		print(f"{'':24}{header}{'share':>8}{'r':>8}")
+		corr = self.correlation()
+		pcts = self.sectionPercentiles(qs)
+		share = self.meanSectionShare()
+		print(f"{'Total':24}{formatRow(self.percentiles(qs))}{1:>8.2f}{corr[0]:>8.2f}")
+		for i in range(len(self.sectionNames)):
+			print(f"{self.sectionNames[i][:24]:24}{formatRow(pcts[:, i])}{share[i]:>8.2f}{corr[i + 1]:>8.2f}")
+		for log in [False, True]:
+			(slope, intercept, r2) = self.regression(log=log)
+			x = "log(1 + score)" if log else "score"
+			print(f"BGG weight = {slope:.4f} * {x} + {intercept:.4f}  (r2 = {r2:.3f})")
+
+def formatRow(values) -> str:
+	return ''.join([f"{v:>8.1f}" for v in values])
+
+def parseWeight(weight) -> Optional[float]:
+	try:
+		w = float(weight)
+	except (TypeError, ValueError):
+		return None
+	# A weight of 0 means that it hasn't been set.
+	if w <= 0:
+		return None
+	return w
+
+def usage():
+	print("Usage: %s [<options>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --csv [-c]")  # use data.csv instead of the game .xml files
+	print("  --percentiles <list> [-p]")  # comma-separated list of percentiles
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'cp:',
+			['csv', 'percentiles='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	useCsv = False
+	qs = DEFAULT_PERCENTILES
+	for opt, arg in opts:
+		if opt in ('-c', '--csv'):
+			useCsv = True
+		elif opt in ('-p', '--percentiles'):
+			qs = [float(q) for q in arg.split(',')]
+
+	try:
+		if useCsv:
+			analytics = CorpusAnalytics.fromCsv()
+		else:
+			analytics = CorpusAnalytics.fromGameList()
+	except GambitError:
+		# The error has already been reported.
+		sys.exit(0)
+	analytics.report(qs)
+
+if __name__ == '__main__':
+	main()
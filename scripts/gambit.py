@@ -1,6 +1,8 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from enum import IntEnum
+
 TAB_SIZE = 4
 
 # Special section names.
@@ -33,23 +35,58 @@ class RegEx:
 	TEMPLATE_KEYWORD = "(" + KEYWORD + ")\<(" + KEYWORD + ")\>"
 
 # Vocabulary types.
-class VocabType:
-	BASE = "BASE"
-	LOCAL = "LOCAL"
-	IMPORT = "IMPORT"
-	GAME_IMPORT = "GAME-IMPORT"
+class VocabType(IntEnum):
+	BASE = 0
+	LOCAL = 1
+	IMPORT = 2
+	GAME_IMPORT = 3
 
 # Parser line types.
-class LineType:
-	COMMENT = "COMMENT"
-	BLANK = "BLANK"
-	NAME = "NAME"
-	IMPORT = "IMPORT"
-	GAME_IMPORT = "GAME-IMPORT"
-	SECTION = "SECTION"
-	SUBSECTION = "SUBSECTION"
-	DEF = "DEF"
-	TEMPLATE = "TEMPLATE"
-	CONSTRAINT = "CONSTRAINT"
-	DESC = "DESC"
-	VALUES = "VALUES"
+# These are used as indices into LineTable columns, so they must be 0..N-1.
+class LineType(IntEnum):
+	COMMENT = 0
+	BLANK = 1
+	NAME = 2
+	IMPORT = 3
+	GAME_IMPORT = 4
+	SECTION = 5
+	SUBSECTION = 6
+	DEF = 7
+	TEMPLATE = 8
+	CONSTRAINT = 9
+	DESC = 10
+	VALUES = 11
+
+# Groups of line types, for quick membership tests.
+class LineCategory:
+	# Lines that define a new term.
+	DEFINITION = frozenset([LineType.DEF, LineType.TEMPLATE])
+	# Lines whose cost depends on their description text.
+	DESCRIPTION = frozenset([LineType.DESC, LineType.CONSTRAINT])
+	# Lines with description text that can reference terms.
+	TEXT = frozenset([LineType.DESC, LineType.CONSTRAINT, LineType.VALUES])
+	# Lines that can have a cost.
+	COSTED = frozenset([
+		LineType.DEF, LineType.TEMPLATE, LineType.DESC, LineType.CONSTRAINT,
+		LineType.VALUES])
+	# Lines that never have a cost.
+	UNCOSTED = frozenset([
+		LineType.COMMENT, LineType.IMPORT, LineType.GAME_IMPORT, LineType.NAME,
+		LineType.SECTION, LineType.SUBSECTION, LineType.BLANK])
+
+	# Lines that end the search for the DESCs of a DEF.
+	DEF_END = frozenset([LineType.DEF, LineType.BLANK, LineType.TEMPLATE])
+	# Lines that give a DEF a description when indented under it.
+	DEF_BODY = frozenset([LineType.DESC, LineType.VALUES])
+	# Lines that may appear between a DEF and its description.
+	DEF_SKIP = frozenset([
+		LineType.COMMENT, LineType.SECTION, LineType.SUBSECTION, LineType.CONSTRAINT])
+
+# Classification of the words in a line, for the zero-cost rules.
+class WordClass(IntEnum):
+	UNDEFINED = 0
+	DEFINED = 1
+	TEMPLATE = 2
+	ARTICLE = 3
+	SUFFIX = 4
+	STRING = 5
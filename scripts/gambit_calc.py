@@ -1,59 +1,47 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+import bisect
 import os
 import re
 import sys
 import traceback
 
-from gambit import LineType, SectionName, RegEx
+from gambit import LineCategory, LineType, SectionName, RegEx, WordClass
+from gambit_def_index import GambitDefIndex
+from gambit_free_actions import FreeActionMatcher
 from gambit_line_processor import GambitLineProcessor
+from gambit_token import TokenType
 from gambit_tokenizer import GambitTokenizer
 from gambit_vocab import GambitVocab
 from log import Log
 
 from typing import Optional, List, Union
 
-FREE_ACTIONS = [
-	"Then:",
-	"Otherwise:",
-	"Do the following:",
-	"If you do:",
-	"If you don't:",
-	"If any of:",
-	"If all of:",
-	"Choose one:",
-	"Choose one of:",
-	"As many times as you like:",
-	"You may optionally:",
-	"Repeat:",
-	# Conditions
-	"Any of:",
-]
-
-FREE_ACTION_KEYWORD_PATTERNS = [
-	f"For each ({RegEx.KEYWORD}):",
-	f"For each ({RegEx.KEYWORD}),? starting with(?: the)? ({RegEx.KEYWORD}):",
-	f"For each ({RegEx.KEYWORD}) in(?: the)? ({RegEx.KEYWORD}):",
-	f"Repeat until ({RegEx.KEYWORD}):",
-	f"Repeat until ({RegEx.KEYWORD}),? starting with(?: the)? ({RegEx.KEYWORD}):",
-	f"Based on(?: the)? ({RegEx.KEYWORD}):",
-]
-
-FREE_ACTION_PATTERNS = [
-	f"Repeat ([0-9]+) times:",
-]
-
 # Handle suffix words like "Discard it" or "Shuffle them"
 FREE_SUFFIX_WORDS = [
 	"it",
 	"them",
 ]
 
+# Words that are ignored when checking if a line contains only defined terms.
+ARTICLES = frozenset(["the", "a", "an"])
+
+# Word classes for defined terms.
+DEFINED_WORD_CLASSES = frozenset([WordClass.DEFINED, WordClass.TEMPLATE])
+
 STANDARD_TERMS = [
 	"Setup", "PlayGame", "CalculateScore", "DetermineWinner"
 ]
 
+class CostState:
+	"""State for costing the lines of a file in order (see GambitCalc.costLine)."""
+	def __init__(self, isVocabSection: bool = False):
+		self.isVocabSection = isVocabSection
+		# The current DEF and the cost of its description.
+		self.currDef = None
+		self.currDefCost = 0
+
 class GambitCalc:
 	"""Cost calculations for Gambit (.gm) files."""
 	def __init__(self, vocab):
@@ -63,185 +51,369 @@ class GambitCalc:
 		self.sectionCosts = []
 		self.subsectionCosts = {}
 
+		# Rows of the SECTION and SUBSECTION lines, and the [name, cost] entry
+		# (in sectionCosts or subsectionCosts) for each one, so that the
+		# totals can be updated for a few lines (see addCosts).
+		self.bucketRows: List[int] = []
+		self.buckets: List[list] = []
+
+		# Index of the lines for each DEF, built by updateCosts or processLines.
+		# This is None after the lines are edited (see getDefIndex).
+		self.defIndex: Optional[GambitDefIndex] = None
+
 		# Special actions with 0 cost.
-		self.freeActions = {}
-		for a in FREE_ACTIONS:
-			self.freeActions[a] = True
-		self.freeActionPatterns = {}
-		for a in FREE_ACTION_PATTERNS:
-			self.freeActionPatterns[a] = True
-		self.freeActionKeywordPatterns = {}
-		for a in FREE_ACTION_KEYWORD_PATTERNS:
-			self.freeActionKeywordPatterns[a] = True
+		self.freeActionMatcher = FreeActionMatcher()
 	
 	# ==========
 	# Calculating costs.
 	# ==========
 	
+	# Update the cost of the line |r| given the |state| of the lines before it.
+	# |hasDesc| is true if |r| is a DEF with DESCs indented under it (see
+	# GambitDefIndex). costStage resolves this itself after the DEF.
+	# |words| is from GambitTokenizer.split, if available.
+	# Return the change in the cost of the previous DEF (see chargeDef).
+	def costLine(self, state, r, hasDesc=False, words=None) -> int:
+		type = r.lineType
+		delta = 0
+
+		if type == LineType.SECTION:
+			state.isVocabSection = r.name == "Vocabulary"
+
+		elif type in LineCategory.DEFINITION:
+			delta = self.chargeDef(state)
+			state.currDef = r
+			state.currDefCost = 0
+
+			# If a DEF has DESC indented under it, then the cost is
+			# determined by the associated DESCs and the DEF itself is 0.
+			# Otherwise (with no indented DESCs) the cost of the DEF is 1.
+			if hasDesc:
+				# Set to None instead of 0 so that the cost column is left blank.
+				r.cost = None
+
+		elif type == LineType.VALUES:
+			state.currDefCost += 1
+
+		elif type in LineCategory.DESCRIPTION:
+			classes = None
+			if words is not None:
+				classes = self.classifyWords(words, r.tokens)
+			if self.isZeroCost(r, words, classes):
+				r.cost = 0
+			else:
+				state.currDefCost += 1
+
+		elif not type in LineCategory.UNCOSTED:
+			Log.errorInternal(f"Unhandled type in costLine: {type.name}")
+
+		return delta
+
+	# DEF must always cost at least one in the Vocabulary section.
+	# Update the current DEF in |state| if it doesn't have any cost and
+	# return the change in its cost.
+	def chargeDef(self, state) -> int:
+		r = state.currDef
+		if r is None or not state.isVocabSection or state.currDefCost != 0:
+			return 0
+		delta = 1 - (r.cost or 0)
+		r.cost = 1
+		return delta
+
+	# Return the index of the DEFs in |lineInfo|, building it again if it was
+	# cleared after an edit.
+	def getDefIndex(self, lineInfo) -> GambitDefIndex:
+		if self.defIndex is None:
+			self.defIndex = GambitDefIndex(lineInfo)
+		return self.defIndex
+
 	# Update the costs of the individual lines.
-	def updateCosts(self, lineInfo):
-		isVocabSection = False
-		currDef = -1
-		currDefCost = 0
-		for r in lineInfo:
+	# |descWords| has the words for each line, if available (see processLines).
+	def updateCosts(self, lineInfo, descWords=None):
+		self.defIndex = GambitDefIndex(lineInfo)
+		hasDescs = self.defIndex.hasDescs
+		state = CostState()
+		if descWords is None:
+			for i in range(len(lineInfo)):
+				self.costLine(state, lineInfo[i], hasDescs.get(i, False))
+		else:
+			for i in range(len(lineInfo)):
+				self.costLine(state, lineInfo[i], hasDescs.get(i, False), descWords[i])
+
+	# Update the costs of the lines from |start| up to (but not including)
+	# |end|. Both must be the start of a definition (or the start/end of the
+	# file) and the lines must have their initial costs. This is the same as
+	# updateCosts for the definitions in the range, so that a few
+	# definitions can be updated after an edit. |bucketRows| must be current.
+	def updateCostRange(self, lineInfo, start, end):
+		# A DEF's description ends before the next DEF, so the index only
+		# needs the lines in the range.
+		hasDescs = GambitDefIndex(lineInfo[start:end]).hasDescs
+		state = CostState(self.isInVocabSection(lineInfo, start))
+		for i in range(start, end):
+			self.costLine(state, lineInfo[i], hasDescs.get(i - start, False))
+
+		# The last DEF in the range is charged when the next DEF is reached.
+		if end < len(lineInfo):
+			self.chargeDef(state)
+
+	# Return true if the line at |row| is in the Vocabulary section.
+	def isInVocabSection(self, lineInfo, row) -> bool:
+		i = bisect.bisect_left(self.bucketRows, row) - 1
+		while i >= 0:
+			r = lineInfo[self.bucketRows[i]]
+			if r.lineType == LineType.SECTION:
+				return r.name == "Vocabulary"
+			i -= 1
+		return False
+
+	# Add |sign| times the costs of |lineInfos| to the totals, where |row| is
+	# the row of the first line. This is used to update the totals when a
+	# few lines are costed again (by removing their old costs first).
+	def addCosts(self, lineInfos, row, sign):
+		iBucket = bisect.bisect_left(self.bucketRows, row) - 1
+		bucket = self.buckets[iBucket] if iBucket >= 0 else None
+		for r in lineInfos:
 			type = r.lineType
+			if type == LineType.SECTION or type == LineType.SUBSECTION:
+				iBucket += 1
+				bucket = self.buckets[iBucket]
+			elif r.cost and type in LineCategory.COSTED:
+				self.costTotal += sign * r.cost
+				if bucket:
+					bucket[1] += sign * r.cost
 
-			if type == LineType.SECTION:
-				isVocabSection = False
-				if r.name == "Vocabulary":
-					isVocabSection = True
+	# Update bucketRows after |delta| lines were added (or removed, if
+	# negative) before |row|. There must not be any SECTION or SUBSECTION
+	# lines in the lines that were changed.
+	def shiftRows(self, row, delta):
+		for i in range(bisect.bisect_left(self.bucketRows, row), len(self.bucketRows)):
+			self.bucketRows[i] += delta
 
-			elif type == LineType.DEF or type == LineType.TEMPLATE:
-				# DEF must always cost at least one in the Vocabulary section.
-				if currDef != -1 and isVocabSection and currDefCost == 0:
-					# Update previous Vocab def if doesn't have any cost.
-					lineInfo[currDef].cost = 1
+	# Extract the references, update the line costs and calculate the totals.
+	# Each TEXT line is split into words only once, and the words of the DESC
+	# and CONSTRAINT lines are kept for the zero-cost checks in updateCosts.
+	# Each step runs over all of the lines before the next one starts, since
+	# that is faster than doing all of the steps for each line in turn.
+	def processLines(self, lineInfo):
+		vocab = self.vocab
+		descWords = [None] * len(lineInfo)
+		refDef = None
+		for i in range(len(lineInfo)):
+			r = lineInfo[i]
+			type = r.lineType
+			words = None
+			if type in LineCategory.TEXT:
+				words = GambitTokenizer.split(r.line)
+				if type in LineCategory.DESCRIPTION:
+					descWords[i] = words
+			refDef = r.extractReferences(refDef, vocab, words)
 
-				currDef = r.lineNum - 1  # "-1" for 0-based index.
-				currDefCost = 0
+		self.updateCosts(lineInfo, descWords)
+		self.calcTotalCost(lineInfo)
 
-				# If a DEF has DESC indented under it, then the cost is
-				# determined by the associated DESCs and the DEF itself is 0.
-				# Otherwise (with no indented DESCs) the cost of the DEF is 1.
-				if self.defHasDesc(lineInfo, currDef):
-					# Set to None instead of 0 so that the cost column is left blank.
-					r.cost = None
-
-			elif type == LineType.VALUES:
-				currDefCost += 1
-
-			elif type in [LineType.DESC, LineType.CONSTRAINT]:
-				zeroCost = False
-				line = r.line
-
-				# Free actions are free.
-				if line in self.freeActions:
-					zeroCost = True
-				for freePattern in self.freeActionPatterns:
-					if re.match(freePattern, line):
-						zeroCost = True
-				for freePattern in self.freeActionKeywordPatterns:
-					m = re.match(freePattern, line)
-					if m:
-						# Make sure each match group is a valid Keyword
-						numGroups = len(m.groups())
-						for i in range(1, numGroups+1):
-							if self.vocab.isDefinedTerm(m.group(i)):
-								zeroCost = True
-
-				# Lines that consist entirely of a single defined term are free.
-				# The cost comes from the definition.
-				if self.vocab.isDefinedTerm(line):
-					zeroCost = True
-
-				# TODO: Better detection of possible missing imports.
-				# This will only catch it if the import is the only thing on the line.
-				if (not zeroCost) and self.vocab.isImportable(line):
-					Log.warning(f"Possibly missing import for {line}", r.lineNum)
-
-				# Handle special cases with Vocab
-				words = GambitTokenizer.split(line)
-
-				# Lines that consist entirely of a defined terms are free.
-				allDefined = True
-				for w in words:
-					if w in ["the", "a", "an"]:
-						continue
-					if not self.vocab.isDefinedTerm(w):
-						allDefined = False
-				if allDefined:
-					zeroCost = True
-
-				# Handle "Discard xxx"
-				if len(words) == 2 and self.vocab.isDefinedTerm(words[0]):
-					# Handle: "Discard it"
-					if words[1] in FREE_SUFFIX_WORDS:
-						zeroCost = True
-					# Handle: "Discard x2"
-					if re.match(r'x\-?\d+$', words[1]):
-						zeroCost = True
-
-				# Handle "Success:" and "Success: DrawCard"
-				if words[0][-1] == ':' and self.vocab.isDefinedTerm(words[0][0:-1]):
-					if len(words) == 1 or  self.vocab.isDefinedTerm(words[1]):
-						zeroCost = True
-				
-				if zeroCost:
-					r.cost = 0
+	# Return true if the DESC or CONSTRAINT line has no cost because it is a
+	# free action or consists only of defined terms.
+	# |words| and |classes| are from GambitTokenizer.split and classifyWords,
+	# and are calculated here if they are not provided.
+	def isZeroCost(self, r, words=None, classes=None) -> bool:
+		zeroCost = False
+		line = r.line
+
+		# Free actions are free.
+		if self.freeActionMatcher.isFree(line, self.vocab):
+			zeroCost = True
+
+		# Lines that consist entirely of a single defined term are free.
+		# The cost comes from the definition.
+		if self.vocab.isDefinedTerm(line):
+			zeroCost = True
+
+		# TODO: Better detection of possible missing imports.
+		# This will only catch it if the import is the only thing on the line.
+		if (not zeroCost) and self.vocab.isImportable(line):
+			Log.warning(f"Possibly missing import for {line}", r.lineNum)
+
+		# Handle special cases with Vocab
+		if words is None:
+			words = GambitTokenizer.split(line)
+		if classes is None:
+			classes = self.classifyWords(words)
+
+		# Lines that consist entirely of a defined terms are free.
+		allDefined = True
+		for c in classes:
+			if not c in DEFINED_WORD_CLASSES and c != WordClass.ARTICLE:
+				allDefined = False
+		if allDefined:
+			zeroCost = True
+
+		# Handle "Discard xxx"
+		if len(words) == 2 and classes[0] in DEFINED_WORD_CLASSES:
+			# Handle: "Discard it"
+			if classes[1] == WordClass.SUFFIX:
+				zeroCost = True
+			# Handle: "Discard x2"
+			if re.match(r'x\-?\d+$', words[1]):
+				zeroCost = True
+
+		# Handle "Success:" and "Success: DrawCard"
+		if words[0][-1] == ':' and self.vocab.isDefinedTerm(words[0][0:-1]):
+			if len(words) == 1 or classes[1] in DEFINED_WORD_CLASSES:
+				zeroCost = True
+
+		return zeroCost
+
+	# Return the WordClass of each of the |words| in a line.
+	# If the reference |tokens| for the words are provided (from
+	# extractReferences), then the words that were found in the vocabulary
+	# don't need to be looked up again.
+	def classifyWords(self, words, tokens=None) -> List[WordClass]:
+		classes = []
+		for i in range(len(words)):
+			w = words[i]
+			if tokens:
+				t = tokens[i]
+				# A REF token without a prefix/postfix is the term itself.
+				if type(t) == list and t[0] == TokenType.REF and t[2] == "" and t[4] == "":
+					classes.append(WordClass.DEFINED)
+					continue
+			if self.vocab.isDefinedTerm(w):
+				if GambitTokenizer.isTemplate(w):
+					classes.append(WordClass.TEMPLATE)
 				else:
-					currDefCost += 1
-			
-			elif not type in [LineType.COMMENT, LineType.IMPORT, LineType.GAME_IMPORT, LineType.NAME, LineType.SUBSECTION, LineType.BLANK]:
-				Log.errorInternal(f"Unhandled type in updateCosts: {type}")
+					classes.append(WordClass.DEFINED)
+			elif w[0] == '"' and w[-1] == '"':
+				classes.append(WordClass.STRING)
+			elif w in ARTICLES:
+				classes.append(WordClass.ARTICLE)
+			elif w in FREE_SUFFIX_WORDS:
+				classes.append(WordClass.SUFFIX)
+			else:
+				classes.append(WordClass.UNDEFINED)
+		return classes
 
 	# Return true if the DEF at the given index has at least one DESC
 	# associated with it.
+	# This scans forward from the DEF, so updateCosts uses the GambitDefIndex
+	# instead to avoid rescanning long descriptions.
 	def defHasDesc(self, lineInfo, iDef):
-		if not lineInfo[iDef].lineType in [LineType.DEF, LineType.TEMPLATE]:
-			Log.errorInternal(f"Not a DEF on line {iDef}: {lineInfo[iDef].lineType}")
+		if not lineInfo[iDef].lineType in LineCategory.DEFINITION:
+			Log.errorInternal(f"Not a DEF on line {iDef}: {lineInfo[iDef].lineType.name}")
 		maxLines = len(lineInfo)
 		i = iDef + 1
 		# Look ahead to search for DESC lines that follow the DEF.
 		while i < maxLines:
 			r = lineInfo[i]
 			type = r.lineType
-			if type in [LineType.DEF, LineType.BLANK, LineType.TEMPLATE]:
+			if type in LineCategory.DEF_END:
 				return False
-			if type in [LineType.DESC, LineType.VALUES] and r.indent == 1:
+			if type in LineCategory.DEF_BODY and r.indent == 1:
 				return True
-			if not type in [LineType.COMMENT, LineType.SECTION, LineType.SUBSECTION, LineType.CONSTRAINT]:
-				Log.errorInternal(f"Unhandled type in defHasDesc: {type}")
+			if not type in LineCategory.DEF_SKIP:
+				Log.errorInternal(f"Unhandled type in defHasDesc: {type.name}")
 			i += 1
 		return False
-	
+
+	# Streaming version of updateCosts that yields each line once its cost is
+	# final. The only lines held back are those following a DEF whose cost
+	# is still unknown: until we know whether it has any DESCs (see
+	# defHasDesc) and, if it does, until one of them has a cost (otherwise
+	# the DEF may need to be charged when the next DEF is reached).
+	def costStage(self, lineInfos):
+		state = CostState()
+		# Lines starting with the unresolved DEF.
+		window = []
+		descPending = False
+		for r in lineInfos:
+			type = r.lineType
+
+			# Resolve defHasDesc for the DEF at the start of the window.
+			if descPending:
+				if type in LineCategory.DEF_END:
+					descPending = False
+				elif type in LineCategory.DEF_BODY and r.indent == 1:
+					descPending = False
+					# Set to None instead of 0 so that the cost column is left blank.
+					window[0].cost = None
+				elif not type in LineCategory.DEF_SKIP:
+					Log.errorInternal(f"Unhandled type in defHasDesc: {type.name}")
+
+			# This charges the DEF at the start of the window (if needed) when
+			# the next DEF is reached.
+			self.costLine(state, r)
+
+			if type in LineCategory.DEFINITION:
+				yield from window
+				window = [r]
+				descPending = True
+				continue
+
+			if not window:
+				yield r
+				continue
+			window.append(r)
+			# The DEF cost is final once it is known to be 1 (no DESCs) or
+			# once one of its DESCs has a cost.
+			if not descPending and (window[0].cost != None or state.currDefCost != 0):
+				yield from window
+				window = []
+
+		yield from window
+
 	# Calculate the total cost for the game.
 	def calcTotalCost(self, lineInfo):
 		self.costTotal = 0
 		self.sectionCosts = []
 		self.subsectionCosts = {}
+		self.bucketRows = []
+		self.buckets = []
 		currentSection = None
 		currentSubsection = None
-		cost = 0
+		# [name, cost] for the current section or subsection.
+		bucket = [None, 0]
+		row = 0
 		for r in lineInfo:
 			type = r.lineType
 
-			if type in [
-					LineType.DEF, LineType.TEMPLATE, LineType.DESC, LineType.CONSTRAINT,
-					LineType.VALUES]:
+			if type in LineCategory.COSTED:
 				if r.cost:
 					self.costTotal += r.cost
-					cost += r.cost
+					bucket[1] += r.cost
 
 			elif type == LineType.SECTION:
 				if currentSubsection:
-					self.subsectionCosts[currentSection].append([currentSubsection, cost])
+					self.subsectionCosts[currentSection].append(bucket)
 				elif currentSection:
-					self.sectionCosts.append([currentSection, cost])
+					self.sectionCosts.append(bucket)
 				currentSection = r.name
 				currentSubsection = None
-				cost = 0
+				bucket = [r.name, 0]
+				self.bucketRows.append(row)
+				self.buckets.append(bucket)
 
 			elif type == LineType.SUBSECTION:
 				if currentSubsection:
-					self.subsectionCosts[currentSection].append([currentSubsection, cost])
+					self.subsectionCosts[currentSection].append(bucket)
 				else:
-					self.sectionCosts.append([currentSection, cost])
+					self.sectionCosts.append(bucket)
 				currentSubsection = r.name
 				if not currentSection in self.subsectionCosts:
 					self.subsectionCosts[currentSection] = []
-				cost = 0
+				bucket = [r.name, 0]
+				self.bucketRows.append(row)
+				self.buckets.append(bucket)
 
-			elif not type in [
-					LineType.COMMENT, LineType.IMPORT, LineType.GAME_IMPORT, LineType.NAME,
-					LineType.SECTION, LineType.SUBSECTION, LineType.BLANK]:
-				Log.errorInternal(f"Unhandled type in calcTotalCost: {type}")
+			elif not type in LineCategory.UNCOSTED:
+				Log.errorInternal(f"Unhandled type in calcTotalCost: {type.name}")
+			row += 1
 		
 		# Record cost for last section.
 		if currentSection:
 			if currentSubsection:
-				self.subsectionCosts[currentSection].append([currentSubsection, cost])
+				self.subsectionCosts[currentSection].append(bucket)
 			else:
-				self.sectionCosts.append([currentSection, cost])
+				self.sectionCosts.append(bucket)
 	
 	def getSummary(self):
 		summary = []
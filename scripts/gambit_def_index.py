@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from gambit import LineCategory
+from log import Log
+
+from typing import Dict, Optional
+
+class GambitDefIndex:
+	"""Index of the lines that belong to each DEF/TEMPLATE in a file."""
+	def __init__(self, lineInfo):
+		# Dict of DEF row -> True if it has DESCs indented under it.
+		self.hasDescs: Dict[int, bool] = {}
+		# Dict of DEF row -> row after the last line of the definition.
+		self.ends: Dict[int, int] = {}
+		# Dict of keyword -> DEF row.
+		self.keywords: Dict[str, int] = {}
+
+		self.build(lineInfo)
+
+	# Build the index with a single backward pass over the lines.
+	# While scanning, |found| is the result that defHasDesc would return if
+	# the DEF were on the previous row, and |foundRow| is the row that
+	# determined that result.
+	def build(self, lineInfo) -> None:
+		numLines = len(lineInfo)
+		end = numLines
+		found = False
+		foundRow = numLines
+		types = [r.lineType for r in lineInfo]
+		for i in range(numLines - 1, -1, -1):
+			type = types[i]
+			if type in LineCategory.DEFINITION:
+				if found is None:
+					r = lineInfo[foundRow]
+					Log.errorInternal(f"Unhandled type in defHasDesc: {r.lineType.name}")
+				self.hasDescs[i] = found
+				self.ends[i] = end
+				# Scanning backwards, so this keeps the first DEF of each keyword.
+				self.keywords[lineInfo[i].keyword] = i
+
+			if type in LineCategory.DEF_END:
+				end = i
+				found = False
+				foundRow = i
+			elif type in LineCategory.DEF_BODY and lineInfo[i].indent == 1:
+				found = True
+				foundRow = i
+			elif not type in LineCategory.DEF_SKIP:
+				# Only an error if a DEF scans into this line.
+				found = None
+				foundRow = i
+
+	# Return true if the DEF at row |iDef| has at least one DESC.
+	def hasDesc(self, iDef: int) -> bool:
+		return self.hasDescs[iDef]
+
+	# Return the rows that belong to the DEF at row |iDef|, starting with the
+	# DEF itself and ending before the next DEF, TEMPLATE or BLANK line.
+	def getDefRows(self, iDef: int) -> range:
+		return range(iDef, self.ends[iDef])
+
+	# Return the rows for the definition of |keyword|, or None.
+	def findDef(self, keyword: str) -> Optional[range]:
+		if not keyword in self.keywords:
+			return None
+		return self.getDefRows(self.keywords[keyword])
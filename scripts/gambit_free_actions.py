@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+from gambit import RegEx
+
+from typing import List, Optional, Tuple
+
+FREE_ACTIONS = [
+	"Then:",
+	"Otherwise:",
+	"Do the following:",
+	"If you do:",
+	"If you don't:",
+	"If any of:",
+	"If all of:",
+	"Choose one:",
+	"Choose one of:",
+	"As many times as you like:",
+	"You may optionally:",
+	"Repeat:",
+	# Conditions
+	"Any of:",
+]
+
+FREE_ACTION_KEYWORD_PATTERNS = [
+	f"For each ({RegEx.KEYWORD}):",
+	f"For each ({RegEx.KEYWORD}),? starting with(?: the)? ({RegEx.KEYWORD}):",
+	f"For each ({RegEx.KEYWORD}) in(?: the)? ({RegEx.KEYWORD}):",
+	f"Repeat until ({RegEx.KEYWORD}):",
+	f"Repeat until ({RegEx.KEYWORD}),? starting with(?: the)? ({RegEx.KEYWORD}):",
+	f"Based on(?: the)? ({RegEx.KEYWORD}):",
+]
+
+FREE_ACTION_PATTERNS = [
+	f"Repeat ([0-9]+) times:",
+]
+
+class FreeActionMatcher:
+	"""Match a line against all of the free action rules in one call."""
+	def __init__(self):
+		self.freeActions = frozenset(FREE_ACTIONS)
+
+		# Each rule is (pattern, isKeywordPattern).
+		self.rules = [(p, False) for p in FREE_ACTION_PATTERNS]
+		self.rules += [(p, True) for p in FREE_ACTION_KEYWORD_PATTERNS]
+
+		# Combine the rules into a single regex with a group around each rule.
+		# |ruleGroups| maps the group number for each rule to the rule and the
+		# number of groups within the rule. The matching rule is found from
+		# |lastindex|, which is the outermost group that matched.
+		self.ruleGroups = {}
+		alternatives = []
+		group = 1
+		for (pattern, isKeyword) in self.rules:
+			numGroups = re.compile(pattern).groups
+			self.ruleGroups[group] = (pattern, isKeyword, numGroups)
+			alternatives.append(f"({pattern})")
+			group += 1 + numGroups
+		self.regex = re.compile("|".join(alternatives))
+
+		# The first word of each pattern, so that most lines can be rejected
+		# without running the regex.
+		self.firstWords = frozenset([p.split(' ', 1)[0] for (p, k) in self.rules])
+
+	# Return (rule, keywords) if |line| is a free action, where |keywords| are
+	# the terms captured by the rule that must be defined for the line to be
+	# free. Return None if the line doesn't match any rule.
+	def match(self, line: str) -> Optional[Tuple[str, List[str]]]:
+		if line in self.freeActions:
+			return (line, [])
+		if not line.split(' ', 1)[0] in self.firstWords:
+			return None
+		m = self.regex.match(line)
+		if not m:
+			return None
+		group = m.lastindex
+		(pattern, isKeyword, numGroups) = self.ruleGroups[group]
+		if not isKeyword:
+			return (pattern, [])
+		return (pattern, list(m.groups()[group:group + numGroups]))
+
+	# Return true if |line| is a free action.
+	def isFree(self, line: str, vocab) -> bool:
+		match = self.match(line)
+		if not match:
+			return False
+		(rule, keywords) = match
+		if not keywords:
+			return True
+		# At least one of the captured keywords must be a defined term.
+		for k in keywords:
+			if vocab.isDefinedTerm(k):
+				return True
+		return False
+
+# Original implementation of the free action check, kept as a reference for
+# tests and benchmarks.
+def isFreeActionReference(line: str, vocab) -> bool:
+	zeroCost = False
+	if line in FREE_ACTIONS:
+		zeroCost = True
+	for freePattern in FREE_ACTION_PATTERNS:
+		if re.match(freePattern, line):
+			zeroCost = True
+	for freePattern in FREE_ACTION_KEYWORD_PATTERNS:
+		m = re.match(freePattern, line)
+		if m:
+			# Make sure each match group is a valid Keyword
+			numGroups = len(m.groups())
+			for i in range(1, numGroups+1):
+				if vocab.isDefinedTerm(m.group(i)):
+					zeroCost = True
+	return zeroCost
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+
+from gambit import Keyword, LineType
+from gambit_lexer import GambitLexer
+from log import Log
+
+from typing import Dict, List, Optional, Tuple
+
+# Resolver for each source directory, shared by all parsers in the process.
+sharedResolvers: dict[str, "GambitGameImports"] = {}
+
+class GameExports:
+	"""Terms exported by a single game for GAME-IMPORT."""
+	__slots__ = ('path', 'stat', 'terms', 'imports')
+
+	def __init__(self, path: str, stat: Tuple[int, int]):
+		self.path = path
+		self.stat = stat
+		# (keyword, plural) for each DEF and VALUES item, in file order.
+		self.terms: List[Tuple[str, Optional[str]]] = []
+		# (index into |terms|, name) for each GAME-IMPORT in the game.
+		self.imports: List[Tuple[int, str]] = []
+
+class GambitGameImports:
+	"""Resolves GAME-IMPORT names to the terms exported by each game."""
+	def __init__(self, srcDir: str):
+		self.srcDir = srcDir
+
+		# GameExports for each game, keyed by path.
+		self.exports: Dict[str, GameExports] = {}
+
+		# Fully resolved (transitive) terms for each game, keyed by path.
+		# Each value is (stats of all files used, list of terms).
+		self.resolved: Dict[str, tuple] = {}
+
+	# Return the path of the .gm file for a GAME-IMPORT name like "Carcassonne".
+	def calcPath(self, name: str) -> str:
+		basename = os.path.basename(name)
+		dirname = os.path.dirname(name)
+		basename = convertInitialCapsToHyphenated(basename) + ".gm"
+		return os.path.join(self.srcDir, dirname, basename[0], basename)
+
+	def loadExports(self, path: str) -> GameExports:
+		stat = statFile(path)
+		if path in self.exports and self.exports[path].stat == stat:
+			return self.exports[path]
+
+		exports = GameExports(path, stat)
+		with open(path, 'r') as file:
+			lineNum = 0
+			for line in file:
+				lineNum += 1
+				lineinfo = GambitLexer.processLine(lineNum, line)
+				type = lineinfo.lineType
+				if type == LineType.DEF:
+					exports.terms.append((lineinfo.keyword, lineinfo.altKeyword))
+				elif type == LineType.VALUES:
+					items = [x.strip() for x in lineinfo.line.split(',')]
+					for i in items:
+						exports.terms.append((i, None))
+				elif type == LineType.GAME_IMPORT:
+					exports.imports.append((len(exports.terms), lineinfo.data))
+		self.exports[path] = exports
+		return exports
+
+	# Return (keyword, plural, source) for each term made available by
+	# importing the game |name|, including terms that it imports from other
+	# games. |source| is the name of the game that defines the term.
+	def resolve(self, name: str) -> List[Tuple[str, Optional[str], str]]:
+		return self.resolvePath(name, self.calcPath(name), [])
+
+	def resolvePath(self, name: str, path: str, stack: List[str]) -> list:
+		if path in stack:
+			cycle = [os.path.basename(p) for p in stack[stack.index(path):] + [path]]
+			Log.error(f"{Keyword.GAME_IMPORT} cycle: {' -> '.join(cycle)}")
+
+		if path in self.resolved:
+			(stats, terms) = self.resolved[path]
+			if all(statFile(p) == s for (p, s) in stats.items()):
+				return terms
+
+		exports = self.loadExports(path)
+		stack = stack + [path]
+		terms = []
+		stats = {path: exports.stat}
+		iTerm = 0
+		for (index, importName) in exports.imports:
+			terms.extend([(k, p, name) for (k, p) in exports.terms[iTerm:index]])
+			importPath = self.calcPath(importName)
+			terms.extend(self.resolvePath(importName, importPath, stack))
+			stats.update(self.resolved[importPath][0])
+			iTerm = index
+		terms.extend([(k, p, name) for (k, p) in exports.terms[iTerm:]])
+
+		self.resolved[path] = (stats, terms)
+		return terms
+
+	# ================
+	# Dependency graph
+	# ================
+
+	# Return the games imported directly by the game at |path|.
+	def getImports(self, path: str) -> List[str]:
+		exports = self.loadExports(path)
+		return [self.calcPath(name) for (index, name) in exports.imports]
+
+	# Return all of the games that the game at |path| depends on.
+	def getDependencies(self, path: str) -> List[str]:
+		deps = []
+		todo = self.getImports(path)
+		while todo:
+			p = todo.pop(0)
+			if p in deps or p == path:
+				continue
+			deps.append(p)
+			if os.path.isfile(p):
+				todo.extend(self.getImports(p))
+		return deps
+
+	# Return the games in |paths| that depend (directly or indirectly) on
+	# the game at |path|.
+	def getDependents(self, path: str, paths: List[str]) -> List[str]:
+		return [p for p in paths if p != path and path in self.getDependencies(p)]
+
+	# Return each GAME-IMPORT cycle among the games in |paths|, as a list of
+	# paths that starts and ends with the same game.
+	def findCycles(self, paths: List[str]) -> List[List[str]]:
+		cycles = []
+		done = set()
+		for start in paths:
+			# Iterative DFS that tracks the current path.
+			stack = [(start, iter(self.getImports(start)))]
+			onPath = [start]
+			while stack:
+				(node, children) = stack[-1]
+				child = next(children, None)
+				if child is None:
+					stack.pop()
+					onPath.pop()
+					done.add(node)
+				elif child in onPath:
+					cycle = onPath[onPath.index(child):] + [child]
+					if not any(set(cycle) == set(c) for c in cycles):
+						cycles.append(cycle)
+				elif not child in done and os.path.isfile(child):
+					stack.append((child, iter(self.getImports(child))))
+					onPath.append(child)
+		return cycles
+
+# Return the resolver for |srcDir| that is shared by all parsers.
+def getGameImports(srcDir: str) -> GambitGameImports:
+	key = os.path.abspath(srcDir)
+	if not key in sharedResolvers:
+		sharedResolvers[key] = GambitGameImports(srcDir)
+	return sharedResolvers[key]
+
+def statFile(path: str) -> Tuple[int, int]:
+	stat = os.stat(path)
+	return (stat.st_mtime_ns, stat.st_size)
+
+def convertInitialCapsToHyphenated(name: str) -> str:
+	matches = [m.start(0) for m in re.finditer("[A-Z]", name)]
+	if not matches:
+		return name
+	newName = ""
+	iName = 0
+	for iCap in matches:
+		for i in range(iName, iCap):
+			newName += name[i]
+		if iCap != 0:
+			newName += '-'
+		newName += name[iCap].lower()
+		iName = iCap + 1
+	newName += name[iName:]
+	return newName
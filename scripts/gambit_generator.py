@@ -0,0 +1,255 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import random
+import shutil
+
+from gambit_game_imports import convertInitialCapsToHyphenated
+
+from typing import Dict, Iterator, List
+
+# Terms from _import.gm that are used by the generated games.
+IMPORTED_TERMS = ["Player", "Card", "Deck", "Token", "Gameboard"]
+
+# Name of the game that is imported (with GAME-IMPORT) by generated games.
+BASE_GAME = "SyntheticBase"
+BASE_GAME_TERMS = ["BaseTile", "BaseMarker"]
+
+FILLER_WORDS = [
+	"the", "a", "each", "any", "one", "two", "all", "other", "your", "next",
+	"move", "place", "take", "return", "discard", "reveal", "choose", "put",
+	"from", "into", "onto", "with", "without", "until", "and", "or", "to",
+]
+
+# Maximum indent for the DESC lines in verbs.
+MAX_INDENT = 6
+
+class GambitGenerator:
+	"""Generate valid Gambit (.gm) files of a given size for benchmarks."""
+	def __init__(self, numLines: int, seed: int = 1, gameImport: bool = True):
+		self.numLines = numLines
+		self.random = random.Random(seed)
+		self.gameImport = gameImport
+
+		# Terms that can be referenced in DESC lines.
+		self.nouns: List[str] = list(IMPORTED_TERMS)
+		if gameImport:
+			self.nouns.extend(BASE_GAME_TERMS)
+		self.verbs: List[str] = []
+		self.templates: List[str] = []
+		# Dict of term -> plural, for terms with an explicit plural.
+		self.plurals: Dict[str, str] = {}
+		self.numTerms = 0
+
+	def newTerm(self, prefix: str) -> str:
+		self.numTerms += 1
+		return f"{prefix}{self.numTerms}"
+
+	# ==========
+	# Lines
+	# ==========
+
+	# Return a DESC line (without indent) that refers to some of the terms.
+	def desc(self) -> str:
+		r = self.random
+		words = [r.choice(["Move", "Place", "Take", "Return", "Reveal", "Discard"])]
+		for i in range(r.randint(3, 10)):
+			choice = r.random()
+			if choice < 0.3:
+				noun = r.choice(self.nouns)
+				# Sometimes use the plural or a possessive.
+				choice = r.random()
+				if choice < 0.25:
+					noun = self.plural(noun)
+				elif choice < 0.5:
+					noun += "'s"
+				words.append(noun)
+			elif choice < 0.4 and self.verbs:
+				words.append(r.choice(self.verbs))
+			elif choice < 0.45 and self.templates:
+				words.append(f"{r.choice(self.templates)}<{r.choice(self.nouns)}>")
+			elif choice < 0.5:
+				words.append('"text"')
+			else:
+				words.append(r.choice(FILLER_WORDS))
+		return ' '.join(words)
+
+	def plural(self, term: str) -> str:
+		return self.plurals.get(term, term + "s")
+
+	def condition(self) -> str:
+		return f"If the {self.random.choice(self.nouns)} is empty:"
+
+	# Generate the body of a verb, with nested conditions up to MAX_INDENT.
+	def verbBody(self, numLines: int) -> Iterator[str]:
+		r = self.random
+		indent = 1
+		for i in range(numLines):
+			choice = r.random()
+			if choice < 0.2 and indent < MAX_INDENT:
+				yield '\t' * indent + self.condition()
+				indent += 1
+			elif choice < 0.25:
+				yield '\t' * indent + f"! No more than {r.randint(2, 9)} {self.plural(r.choice(self.nouns))}"
+			elif choice < 0.3:
+				yield '\t' * indent + "// " + self.desc()
+			else:
+				yield '\t' * indent + self.desc()
+				if indent > 1 and choice > 0.8:
+					indent -= 1
+
+	def header(self, name: str) -> Iterator[str]:
+		yield f"NAME: {name}"
+		yield ""
+		yield "SECTION: Assumptions"
+		yield ""
+		yield f"IMPORT: {', '.join(IMPORTED_TERMS)}"
+		if self.gameImport:
+			yield f"GAME-IMPORT: {BASE_GAME}"
+		yield ""
+
+	# Generate the lines for the Vocabulary section, using about
+	# |numLines| lines.
+	def vocabulary(self, numLines: int) -> Iterator[str]:
+		r = self.random
+		yield "SECTION: Vocabulary"
+		yield ""
+		count = 2
+		while count < numLines:
+			choice = r.random()
+			parent = r.choice(self.nouns)
+			if choice < 0.2:
+				term = self.newTerm("Attr")
+				yield f"{term}: Attribute of {parent}"
+				values = [self.newTerm("Value") for v in range(r.randint(2, 5))]
+				yield f"\tValues: {', '.join(values)}"
+				self.nouns.extend(values)
+			elif choice < 0.3:
+				term = self.newTerm("Term")
+				self.plurals[term] = term + "Group"
+				yield f"{term}|{self.plurals[term]}: Noun"
+				yield '\t' + self.desc()
+			else:
+				term = self.newTerm("Term")
+				yield f"{term}: {r.choice(['Noun', parent])}"
+				yield '\t' + self.desc()
+			self.nouns.append(term)
+			yield ""
+			count += 3
+
+	# Generate the verbs, templates and SUBSECTIONs in a section, using
+	# about |numLines| lines.
+	def rules(self, section: str, firstVerb: str, numLines: int) -> Iterator[str]:
+		r = self.random
+		yield f"SECTION: {section}"
+		yield ""
+		count = 0
+		verb = firstVerb
+		while count < numLines:
+			if count > 0 and r.random() < 0.05:
+				yield f"SUBSECTION: {section} Part {self.newTerm('')}"
+				yield ""
+				count += 2
+			size = min(r.randint(3, 30), max(1, numLines - count - 2))
+			if verb is None and r.random() < 0.1:
+				name = self.newTerm("Produce")
+				param = self.newTerm("Item")
+				yield f"{name}<{param}>: Verb"
+				for line in self.verbBody(size):
+					yield line
+				self.templates.append(name)
+			else:
+				name = verb or self.newTerm("Action")
+				yield f"{name}: Verb"
+				for line in self.verbBody(size):
+					yield line
+				self.verbs.append(name)
+			yield ""
+			verb = None
+			count += size + 2
+
+	# Generate the lines for a game.
+	def lines(self, name: str = "Synthetic Game") -> Iterator[str]:
+		numVocab = self.numLines // 4
+		numSetup = self.numLines // 8
+		numGameplay = self.numLines - numVocab - numSetup
+		for lines in [
+				self.header(name),
+				self.vocabulary(numVocab),
+				self.rules("Setup", "Setup", numSetup),
+				self.rules("Gameplay", "PlayGame", numGameplay)]:
+			for line in lines:
+				yield line
+		yield "SECTION: Endgame Scoring"
+		yield ""
+		yield "CalculateScore: Verb"
+		yield "\tThe Player with the most Cards wins"
+
+	# ==========
+	# Files
+	# ==========
+
+	# Write the game |id| (and the game that it imports) into |srcDir|.
+	# Return the path of the .gm file.
+	def writeGame(self, srcDir: str, id: str) -> str:
+		path = calcGamePath(srcDir, id)
+		writeLines(path, self.lines(id))
+		writeGameInfo(srcDir, id, id)
+		if self.gameImport:
+			writeBaseGame(srcDir)
+		return path
+
+# Write a corpus of |numGames| games (and the files that they need) into
+# |srcDir|, for benchmarks that need a full source directory.
+def writeCorpus(srcDir: str, importFile: str, numGames: int, numLines: int, seed: int = 1) -> List[str]:
+	shutil.copyfile(importFile, os.path.join(srcDir, "_import.gm"))
+	ids = []
+	for i in range(numGames):
+		id = f"synthetic-{i}"
+		GambitGenerator(numLines, seed + i).writeGame(srcDir, id)
+		ids.append(id)
+	with open(os.path.join(srcDir, "_list.txt"), 'w') as file:
+		file.write("# Synthetic games\n")
+		for id in ids:
+			file.write(id + "\n")
+	return ids
+
+def writeBaseGame(srcDir: str) -> None:
+	path = calcGamePath(srcDir, convertInitialCapsToHyphenated(BASE_GAME))
+	if os.path.isfile(path):
+		return
+	writeLines(path, [
+		f"NAME: {BASE_GAME}",
+		"",
+		"SECTION: Vocabulary",
+		"",
+		"BaseTile: Noun",
+		"\tA square tile",
+		"BaseMarker: Noun",
+		"",
+	])
+
+def writeGameInfo(srcDir: str, id: str, title: str) -> None:
+	path = calcGamePath(srcDir, id)[:-3] + ".xml"
+	writeLines(path, [
+		'<?xml version="1.0" encoding="UTF-8"?>',
+		f'<game id="{id}">',
+		f'<name>\n\t<title>{title}</title>\n</name>',
+		'<bgg id="0">\n\t<weight date="" avg="2.00" />\n</bgg>',
+		'<export index="true" csv="true" />',
+		'<complexity>\n\t<score cost="1">\n\t\t<section name="Vocabulary" cost="1" />\n\t</score>\n</complexity>',
+		'</game>',
+	])
+
+def calcGamePath(srcDir: str, id: str) -> str:
+	return os.path.join(srcDir, id[0], id + ".gm")
+
+def writeLines(path: str, lines) -> None:
+	dir = os.path.dirname(path)
+	if not os.path.isdir(dir):
+		os.makedirs(dir)
+	with open(path, 'w') as file:
+		for line in lines:
+			file.write(line)
+			file.write('\n')
@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import json
+import os
+import sys
+
+from array import array
+
+from gambit import VocabType
+from gambit_parser import GambitParser
+from gambit_vocab import GambitVocab, STANDARD_TERMS
+from log import Log
+
+from typing import Dict, Iterable, List, Optional
+
+SRC_DIR = "../src"
+
+class GambitGraph:
+	"""Dependency graph of the terms in a GambitVocab."""
+	def __init__(self, vocab: GambitVocab):
+		self.vocab = vocab
+		# The nodes are the symbol ids in the vocab, so node 0 is the None
+		# referrer (for references made before the first DEF).
+		self.names: List[Optional[str]] = list(vocab.names)
+		numNodes = len(self.names)
+
+		# A term depends on each of the terms that it references. The edges
+		# are stored in CSR form: the dependencies of node n are
+		# forwardEdges[forwardOffsets[n]:forwardOffsets[n+1]], and the
+		# dependents are in reverseEdges (using reverseOffsets).
+		entries = [(e.id, e.getRefIds()) for e in vocab.vocab.values() if e.refs is not None]
+		outDegree = [0] * numNodes
+		inDegree = [0] * numNodes
+		for (term, refs) in entries:
+			inDegree[term] = len(refs)
+			for id in refs:
+				outDegree[id] += 1
+		self.forwardOffsets = calcOffsets(outDegree)
+		self.reverseOffsets = calcOffsets(inDegree)
+
+		numEdges = self.forwardOffsets[-1]
+		self.forwardEdges = array('I', bytes(4 * numEdges))
+		self.reverseEdges = array('I', bytes(4 * numEdges))
+		fill = array('I', self.forwardOffsets[:-1])
+		for (term, refs) in entries:
+			start = self.reverseOffsets[term]
+			self.reverseEdges[start:start + len(refs)] = refs
+			for id in refs:
+				self.forwardEdges[fill[id]] = term
+				fill[id] += 1
+
+	def getNumNodes(self) -> int:
+		return len(self.names)
+
+	def getNumEdges(self) -> int:
+		return len(self.forwardEdges)
+
+	def hasTerm(self, term: Optional[str]) -> bool:
+		return term in self.vocab.symbols
+
+	def getId(self, term: Optional[str]) -> int:
+		if not self.hasTerm(term):
+			Log.error(f"Unknown term: {term}")
+		return self.vocab.symbols[term]
+
+	def getNames(self, ids: Iterable[int]) -> List[Optional[str]]:
+		names = self.names
+		return [names[id] for id in ids]
+
+	# ==========
+	# Queries
+	# ==========
+
+	# Return the terms that |term| references directly.
+	def getDirectDependencies(self, term: str) -> List[str]:
+		id = self.getId(term)
+		return self.getNames(self.forwardEdges[self.forwardOffsets[id]:self.forwardOffsets[id + 1]])
+
+	# Return the terms that reference |term| directly.
+	def getDirectDependents(self, term: str) -> List[str]:
+		id = self.getId(term)
+		return self.getNames(self.reverseEdges[self.reverseOffsets[id]:self.reverseOffsets[id + 1]])
+
+	# Return all of the terms that |term| depends on (directly or
+	# indirectly), sorted.
+	def getDependencies(self, term: str) -> List[str]:
+		id = self.getId(term)
+		ids = self.reach([id], self.forwardOffsets, self.forwardEdges)
+		return sorted(self.getNames(n for n in ids if n != id))
+
+	# Return all of the terms that depend on |term| (directly or
+	# indirectly), sorted.
+	def getDependents(self, term: str) -> List[str]:
+		id = self.getId(term)
+		ids = self.reach([id], self.reverseOffsets, self.reverseEdges)
+		return sorted([n for n in self.getNames(ids) if n != term and n is not None])
+
+	# Return the ids of the nodes reachable from |start| (including the
+	# start nodes), in the order that they were visited.
+	def reach(self, start: List[int], offsets: array, edges: array) -> List[int]:
+		visited = bytearray(len(self.names))
+		for id in start:
+			visited[id] = 1
+		found = list(start)
+		stack = list(start)
+		while stack:
+			id = stack.pop()
+			for next in edges[offsets[id]:offsets[id + 1]]:
+				if not visited[next]:
+					visited[next] = 1
+					found.append(next)
+					stack.append(next)
+		return found
+
+	# Return the LOCAL terms that can't be reached from the entry points
+	# (the standard terms like "Setup" and "PlayGame", and the references
+	# made before the first DEF).
+	def getUnreachable(self, roots: Optional[List[str]] = None) -> List[str]:
+		if roots is None:
+			roots = [None] + STANDARD_TERMS
+		start = [self.getId(t) for t in roots if self.hasTerm(t)]
+		reached = set(self.reach(start, self.forwardOffsets, self.forwardEdges))
+		unreachable = []
+		for (term, entry) in self.vocab.vocab.items():
+			if entry.scope == VocabType.LOCAL and not entry.id in reached and not term in roots:
+				unreachable.append(term)
+		return sorted(unreachable)
+
+	# Return the strongly connected component of each node (using Tarjan's
+	# algorithm). The components are numbered so that each component comes
+	# after every component that it depends on. The result is an array
+	# rather than a list of lists to avoid allocating an object for each
+	# component (which makes the GC slow for large graphs).
+	def getComponents(self) -> array:
+		offsets = self.forwardOffsets
+		edges = self.forwardEdges
+		numNodes = len(self.names)
+		index = [-1] * numNodes
+		lowLink = [0] * numNodes
+		onStack = bytearray(numNodes)
+		stack: List[int] = []
+		components = array('I', bytes(4 * numNodes))
+		numComponents = 0
+		nextIndex = 0
+		for root in range(numNodes):
+			if index[root] != -1:
+				continue
+			index[root] = lowLink[root] = nextIndex
+			nextIndex += 1
+			stack.append(root)
+			onStack[root] = 1
+			# The DFS frames are kept in two lists of ints (the node and the
+			# position of the next edge to visit) rather than tuples, so that
+			# a deep search doesn't allocate objects that the GC tracks.
+			frameNodes = [root]
+			frameEdges = [offsets[root]]
+			while frameNodes:
+				id = frameNodes[-1]
+				edge = frameEdges[-1]
+				if edge < offsets[id + 1]:
+					frameEdges[-1] = edge + 1
+					next = edges[edge]
+					if index[next] == -1:
+						index[next] = lowLink[next] = nextIndex
+						nextIndex += 1
+						stack.append(next)
+						onStack[next] = 1
+						frameNodes.append(next)
+						frameEdges.append(offsets[next])
+					elif onStack[next] and index[next] < lowLink[id]:
+						lowLink[id] = index[next]
+					continue
+				frameNodes.pop()
+				frameEdges.pop()
+				if frameNodes:
+					parent = frameNodes[-1]
+					if lowLink[id] < lowLink[parent]:
+						lowLink[parent] = lowLink[id]
+				if lowLink[id] == index[id]:
+					while True:
+						member = stack.pop()
+						onStack[member] = 0
+						components[member] = numComponents
+						if member == id:
+							break
+					numComponents += 1
+		return components
+
+	# Return the groups of terms that depend on each other (components
+	# with more than one term), each sorted.
+	def getCycles(self) -> List[List[str]]:
+		components = self.getComponents()
+		sizes = array('I', bytes(4 * len(components)))
+		for component in components:
+			sizes[component] += 1
+		members: Dict[int, List[str]] = {}
+		for (id, component) in enumerate(components):
+			if sizes[component] > 1:
+				members.setdefault(component, []).append(self.names[id])
+		return sorted([sorted(m) for m in members.values()])
+
+	# ==========
+	# Export
+	# ==========
+
+	# The terms are stored as parallel lists (indexed by id) to keep the
+	# output small for large rulebooks.
+	def toJson(self) -> dict:
+		scopes = []
+		for name in self.names:
+			entry = self.vocab.vocab.get(name) if name is not None else None
+			scopes.append(entry.scope.name if entry else None)
+		return {
+			'names': self.names,
+			'scopes': scopes,
+			'dependencies': {
+				'offsets': self.forwardOffsets.tolist(),
+				'edges': self.forwardEdges.tolist(),
+			},
+			'dependents': {
+				'offsets': self.reverseOffsets.tolist(),
+				'edges': self.reverseEdges.tolist(),
+			},
+			'cycles': self.getCycles(),
+			'unreachable': self.getUnreachable(),
+		}
+
+	def writeJson(self, path: str) -> None:
+		with open(path, 'w') as file:
+			json.dump(self.toJson(), file, separators=(',', ':'))
+
+# Return the CSR offsets for nodes with the given |degrees|.
+def calcOffsets(degrees: List[int]) -> array:
+	offsets = array('I', bytes(4 * (len(degrees) + 1)))
+	total = 0
+	for (i, degree) in enumerate(degrees):
+		total += degree
+		offsets[i + 1] = total
+	return offsets
+
+def usage():
+	print("Usage: %s [<options>] <game-id>" % sys.argv[0])
+	print("where <options> are:")
+	print("  --dependencies <term> [-d]")  # print everything that <term> depends on
+	print("  --dependents <term> [-r]")  # print everything that depends on <term>
+	print("  --json <file> [-j]")  # write the graph as JSON
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'd:j:r:',
+			['dependencies=', 'dependents=', 'json='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	if len(args) != 1:
+		usage()
+		exit()
+	id = args[0]
+
+	parser = GambitParser({})
+	parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+	parser.process(SRC_DIR, os.path.join(SRC_DIR, id[0], id + ".gm"))
+	graph = GambitGraph(parser.vocab)
+
+	for opt, arg in opts:
+		if opt in ('-d', '--dependencies', '-r', '--dependents') and not graph.hasTerm(arg):
+			print(f"Unknown term: {arg}")
+			exit(1)
+		if opt in ('-d', '--dependencies'):
+			print(' '.join(graph.getDependencies(arg)))
+			return
+		elif opt in ('-r', '--dependents'):
+			print(' '.join(graph.getDependents(arg)))
+			return
+		elif opt in ('-j', '--json'):
+			graph.writeJson(arg)
+			return
+
+	print(f"{graph.getNumNodes()} terms, {graph.getNumEdges()} references")
+	for cycle in graph.getCycles():
+		print(f"Cycle: {', '.join(cycle)}")
+	for term in graph.getUnreachable():
+		print(f"Unreachable: {term}")
+
+if __name__ == '__main__':
+	main()
@@ -13,6 +13,10 @@ from log import Log
 
 GM_CSS_PATH = "gm.css"
 
+# Line and token types that are written without any special formatting.
+PLAIN_LINE_TYPES = frozenset([LineType.COMMENT, LineType.CONSTRAINT, LineType.DESC])
+PLAIN_TOKEN_TYPES = frozenset([TokenType.WORD, TokenType.STRING])
+
 class GambitHtmlExporter:
 	"""HTML exporter for Gambit (.gm) files."""
 	def __init__(self, parser, gameInfo):
@@ -272,8 +276,8 @@ class GambitHtmlExporter:
 				continue
 			elif type == LineType.VALUES:
 				prefix = "Values: "
-			elif not type in [LineType.COMMENT, LineType.CONSTRAINT, LineType.DESC]:
-				Log.errorInternal(f"Unrecognized type in writeTableRows: {type}")
+			elif not type in PLAIN_LINE_TYPES:
+				Log.errorInternal(f"Unrecognized type in writeTableRows: {type.name}")
 
 			if rowclass:
 				row = f'<tr class="{rowclass}">'
@@ -359,7 +363,7 @@ class GambitHtmlExporter:
 			if isinstance(t, list):
 				ttype = t[0]
 
-				if ttype in [TokenType.WORD, TokenType.STRING]:
+				if ttype in PLAIN_TOKEN_TYPES:
 					newWords.append(t.value)
 				elif ttype == TokenType.TEMPLATE_REF:
 					(ttype, keyword, param) = t
@@ -369,12 +373,12 @@ class GambitHtmlExporter:
 
 				elif ttype == TokenType.REF:
 					(ttype, canonicalForm, prefix, word, postfix) = t
-					info = self.parser.vocab.lookup(canonicalForm)
-					scope = info[0]
+					entry = self.parser.vocab.lookup(canonicalForm)
+					scope = entry.scope
 					if scope == VocabType.BASE:
 						newWords.append(f'{prefix}{word}{postfix}')
 					elif scope == VocabType.GAME_IMPORT:
-						newWords.append(f'{prefix}<abbr title="Imported from {info[1]}">{word}</abbr>{postfix}')
+						newWords.append(f'{prefix}<abbr title="Imported from {entry.origin}">{word}</abbr>{postfix}')
 					elif scope == VocabType.IMPORT:
 						newWords.append(f'{prefix}<abbr title="Imported term">{word}</abbr>{postfix}')
 					else:
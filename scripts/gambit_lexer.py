@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import re
+
+from gambit import Keyword, LinePrefix, RegEx, TAB_SIZE
+from gambit_line_info import GambitLineInfo
+from gambit_line_processor import GambitLineProcessor
+
+# Lines that start with a special keyword, indexed by the first character of
+# the line so that most lines can be ruled out with a single dict lookup.
+KEYWORD_LINES = {}
+for (keyword, factory) in [
+		(Keyword.GAME_IMPORT, GambitLineInfo.importGame),
+		(Keyword.IMPORT, GambitLineInfo.importTerm),
+		(Keyword.NAME, GambitLineInfo.name),
+		(Keyword.SECTION, GambitLineInfo.section),
+		(Keyword.SUBSECTION, GambitLineInfo.subsection)]:
+	KEYWORD_LINES.setdefault(keyword[0], []).append((keyword + ':', factory))
+
+# Definitions always start in the first column with a capitalized keyword.
+TEMPLATE_DEF_PATTERN = re.compile(RegEx.TEMPLATE_KEYWORD + r":\s*Verb")
+DEF_PATTERN = re.compile("(" + RegEx.MULTI_KEYWORDS + r"):\s*(.*)")
+
+class GambitLexer:
+	"""Single-pass lexer for lines in a Gambit (.gm) file."""
+	def __init__(self):
+		pass
+
+	@staticmethod
+	def calcIndent(lineNum: int, line: str) -> int:
+		numTabs = len(line) - len(line.lstrip('\t'))
+		if numTabs != 0:
+			return numTabs
+		if line[:1] == ' ':
+			numSpaces = len(line) - len(line.lstrip(' '))
+			if numSpaces % TAB_SIZE == 0:
+				return numSpaces // TAB_SIZE
+			# Invalid whitespace is rare, so let the reference implementation
+			# report the error.
+			return GambitLineProcessor.calcIndent(lineNum, line)
+		return 0
+
+	# Same result as GambitLineProcessor.processLine, but dispatches on the
+	# first character of the line and only uses precompiled patterns.
+	@staticmethod
+	def processLine(lineNum: int, line: str) -> GambitLineInfo:
+		first = line[:1]
+
+		# NAME, SECTION, SUBSECTION, IMPORT and GAME-IMPORT.
+		keywordLines = KEYWORD_LINES.get(first)
+		if keywordLines:
+			for (prefix, factory) in keywordLines:
+				if line.startswith(prefix):
+					return factory(lineNum, line[len(prefix):].strip())
+
+		# Separate out comments (which end at an embedded newline).
+		comment = ""
+		iComment = line.find("//")
+		if iComment != -1 and line.rfind('\n', 0, iComment) == -1:
+			comment = line[iComment+2:].partition('\n')[0].strip()
+			line = line[:iComment]
+
+		# Handle empty lines.
+		stripped = line.strip()
+		if stripped == "":
+			indent = GambitLexer.calcIndent(lineNum, line)
+			return GambitLineInfo.comment(lineNum, indent, comment)
+
+		if 'A' <= first <= 'Z':
+			line = line.rstrip()
+
+			# TEMPLATE_TYPE: Verb
+			m = TEMPLATE_DEF_PATTERN.match(line)
+			if m:
+				return GambitLineInfo.templateDefinition(lineNum, m.group(1), m.group(2), comment)
+
+			# NEW_TYPE: TYPE
+			# NEW_TYPE|PLURAL: TYPE
+			# NEW_ATTRIBUTE: Attribute of TYPE
+			# NEW_TYPE: TYPE1, TYPE2
+			m = DEF_PATTERN.match(line)
+			if m:
+				return GambitLineInfo.definition(lineNum, m.group(1).split('|'), m.group(2), comment)
+
+		indent = GambitLexer.calcIndent(lineNum, line)
+
+		first = stripped[0]
+		if first == LinePrefix.CONSTRAINT:
+			return GambitLineInfo.constraintDescription(lineNum, indent, stripped, comment)
+		if first == LinePrefix.VALUES[0] and stripped.startswith(LinePrefix.VALUES):
+			return GambitLineInfo.valuesDescription(lineNum, indent, stripped, comment)
+
+		return GambitLineInfo.description(lineNum, indent, stripped, comment)
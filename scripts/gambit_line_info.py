@@ -5,7 +5,7 @@ from __future__ import annotations
 
 import re
 
-from gambit import LinePrefix, LineType, RegEx
+from gambit import LineCategory, LinePrefix, LineType, RegEx
 from gambit_token import TokenType
 from gambit_tokenizer import GambitTokenizer
 from log import Log
@@ -15,9 +15,9 @@ from typing import Optional
 
 class GambitLineInfo:
 	"""Process a single line from a Gambit (.gm) file."""
-	def __init__(self, lineNum: int, type: str):
+	def __init__(self, lineNum: int, type: LineType):
 		self.lineNum: int = lineNum
-		self.lineType: str = type
+		self.lineType: LineType = type
 		self.cost: Optional[int] = None
 		self.indent: int = 0
 		self.line: str  = ""
@@ -72,7 +72,7 @@ class GambitLineInfo:
 
 	@staticmethod
 	def comment(lineNum: int, indent: int, comment: str) -> GambitLineInfo:
-		type: str = LineType.COMMENT
+		type: LineType = LineType.COMMENT
 		if comment == "":
 			type = LineType.BLANK
 			indent = 0
@@ -150,7 +150,9 @@ class GambitLineInfo:
 		info.lineComment = comment
 		return info
 
-	def extractReferences(self, currDef, vocab):
+	# |words| is the (optional) result of GambitTokenizer.split for a TEXT
+	# line, so that the line is only split once when it is also costed.
+	def extractReferences(self, currDef, vocab, words=None):
 		type = self.lineType
 
 		if type == LineType.DEF:
@@ -171,25 +173,25 @@ class GambitLineInfo:
 			self.tokens = ["Verb"]
 			self.extractReference(self.lineComment, currDef, vocab, True)
 
-		elif type in [LineType.DESC, LineType.CONSTRAINT, LineType.VALUES]:
-			self.tokens = self.extractReference(self.line, currDef, vocab)
+		elif type in LineCategory.TEXT:
+			self.tokens = self.extractReference(self.line, currDef, vocab, words=words)
 			self.extractReference(self.lineComment, currDef, vocab, True)
 		
-		elif not type in [
-				LineType.COMMENT, LineType.IMPORT, LineType.GAME_IMPORT, LineType.NAME,
-				LineType.SECTION, LineType.SUBSECTION, LineType.BLANK]:
-			Log.errorInternal(f"Unhandled type in extractAllReferences: {type}", self.lineNum)
+		elif not type in LineCategory.UNCOSTED:
+			Log.errorInternal(f"Unhandled type in extractAllReferences: {type.name}", self.lineNum)
 
 		return currDef
 	
-	def extractReference(self, line: str, currDef: str, vocab, inComment=False):
+	def extractReference(self, line: str, currDef: str, vocab, inComment=False, words=None):
 		lineNum = self.lineNum
 		
 		if line == "":
 			return
+		if words is None:
+			words = GambitTokenizer.split(line)
 		newWords: List[Union[str, List[str]]] = []
 		firstWord = True
-		for word in GambitTokenizer.split(line):
+		for word in words:
 			# Skip over special initial characters.
 			if firstWord and word == LinePrefix.LOOKUP_TABLE:
 				newWords.append(LinePrefix.LOOKUP_TABLE)
@@ -210,14 +212,11 @@ class GambitLineInfo:
 				newWords.append([TokenType.TEMPLATE_REF, keyword, param])
 				continue
 
-			# Strip non-alphanumeric from beginning/end of token.
-			# Also remove contraction endings like "'s".
-			(prefix, word0, postfix) = GambitTokenizer.extractKeyword(word)
-
-			# Normalize plural forms.
-			canonicalForm = vocab.normalize(word0)
+			# Strip non-alphanumeric from beginning/end of token, remove
+			# contraction endings like "'s" and normalize plural forms.
+			(prefix, word0, postfix, canonicalForm) = vocab.resolveWord(word)
 			
-			if vocab.contains(canonicalForm):
+			if canonicalForm is not None:
 				vocab.addReference(canonicalForm, currDef)
 				newWords.append([TokenType.REF, canonicalForm, prefix, word0, postfix])
 			elif inComment:
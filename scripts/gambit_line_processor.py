@@ -5,6 +5,7 @@ import re
 
 from gambit import Keyword, LinePrefix, RegEx, TAB_SIZE
 from gambit_line_info import GambitLineInfo
+from log import Log
 
 class GambitLineProcessor:
 	"""Process a single line from a Gambit (.gm) file."""
@@ -26,6 +27,8 @@ class GambitLineProcessor:
 				Log.error(f"Invalid leading whitespace. Use tabs or {TAB_SIZE} spaces.", lineNum)
 		return 0
 
+	# Reference implementation. The parser uses GambitLexer.processLine, which
+	# must produce identical results.
 	@staticmethod
 	def processLine(lineNum, line):
 		comment = ""
@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import copy
+
+from array import array
+
+from gambit import LineType
+from gambit_line_info import GambitLineInfo
+
+from typing import Any, List
+
+# LineType for each value stored in the lineTypes column.
+LINE_TYPES = list(LineType)
+
+# Value stored in the cost column when the cost is None.
+NO_COST = -1
+
+# GambitLineInfo attributes that are only used by a few line types, with
+# their default values. These are kept in side tables keyed by row.
+# Rows without an entry return a copy of the default, so a value must be
+# assigned (e.g., view.tokens = tokens) rather than modified in place.
+SIDE_FIELDS = {
+	'name': "",
+	'data': None,
+	'keyword': None,
+	'altKeyword': None,
+	'types': [],
+	'parent': None,
+	'param': None,
+	'tokens': [],
+}
+
+class LineTable:
+	"""Columnar storage for the GambitLineInfo of each line in a file."""
+	def __init__(self):
+		self.lineTypes = array('B')
+		self.lineNums = array('L')
+		self.indents = array('H')
+		self.costs = array('i')
+		self.lines: List[str] = []
+		self.lineComments: List[str] = []
+
+		# Dict of row -> value for each of the SIDE_FIELDS.
+		self.sideTables: dict[str, dict[int, Any]] = {}
+		for name in SIDE_FIELDS:
+			self.sideTables[name] = {}
+
+	@staticmethod
+	def fromLineInfo(lineInfo: List[GambitLineInfo]) -> LineTable:
+		table = LineTable()
+		for r in lineInfo:
+			table.append(r)
+		return table
+
+	def append(self, lineInfo: GambitLineInfo) -> None:
+		row = len(self.lineTypes)
+		self.lineTypes.append(lineInfo.lineType)
+		self.lineNums.append(lineInfo.lineNum)
+		self.indents.append(lineInfo.indent)
+		self.costs.append(NO_COST if lineInfo.cost is None else lineInfo.cost)
+		self.lines.append(lineInfo.line)
+		self.lineComments.append(lineInfo.lineComment)
+		for (name, default) in SIDE_FIELDS.items():
+			setSideValue(self.sideTables[name], row, getattr(lineInfo, name), default)
+
+	def __len__(self) -> int:
+		return len(self.lineTypes)
+
+	def __getitem__(self, row: int) -> LineView:
+		if row < 0 or row >= len(self.lineTypes):
+			raise IndexError(f"LineTable row out of range: {row}")
+		return LineView(self, row)
+
+	# Views are created as needed and are not retained by the table.
+	def __iter__(self):
+		for row in range(len(self.lineTypes)):
+			yield LineView(self, row)
+
+class LineView:
+	"""A row of a LineTable that can be used in place of a GambitLineInfo."""
+	__slots__ = ('table', 'row')
+
+	def __init__(self, table: LineTable, row: int):
+		self.table = table
+		self.row = row
+
+	@property
+	def lineType(self) -> LineType:
+		return LINE_TYPES[self.table.lineTypes[self.row]]
+
+	@lineType.setter
+	def lineType(self, value: LineType) -> None:
+		self.table.lineTypes[self.row] = value
+
+	@property
+	def lineNum(self) -> int:
+		return self.table.lineNums[self.row]
+
+	@lineNum.setter
+	def lineNum(self, value: int) -> None:
+		self.table.lineNums[self.row] = value
+
+	@property
+	def indent(self) -> int:
+		return self.table.indents[self.row]
+
+	@indent.setter
+	def indent(self, value: int) -> None:
+		self.table.indents[self.row] = value
+
+	@property
+	def cost(self):
+		cost = self.table.costs[self.row]
+		return None if cost == NO_COST else cost
+
+	@cost.setter
+	def cost(self, value) -> None:
+		self.table.costs[self.row] = NO_COST if value is None else value
+
+	@property
+	def line(self) -> str:
+		return self.table.lines[self.row]
+
+	@line.setter
+	def line(self, value: str) -> None:
+		self.table.lines[self.row] = value
+
+	@property
+	def lineComment(self) -> str:
+		return self.table.lineComments[self.row]
+
+	@lineComment.setter
+	def lineComment(self, value: str) -> None:
+		self.table.lineComments[self.row] = value
+
+	extractReferences = GambitLineInfo.extractReferences
+	extractReference = GambitLineInfo.extractReference
+
+	def toLineInfo(self) -> GambitLineInfo:
+		info = GambitLineInfo(self.lineNum, self.lineType)
+		for name in ['cost', 'indent', 'line', 'lineComment'] + list(SIDE_FIELDS):
+			setattr(info, name, getattr(self, name))
+		return info
+
+def setSideValue(side: dict, row: int, value, default) -> None:
+	if value == default and type(value) == type(default):
+		side.pop(row, None)
+	else:
+		side[row] = value
+
+# Return a property for the side table |name|. For a row that has the
+# default value, a new copy of the default is returned each time, so
+# changes to it (like view.tokens.append(x)) are not stored in the table.
+def sideProperty(name: str, default) -> property:
+	def get(self):
+		side = self.table.sideTables[name]
+		if self.row in side:
+			return side[self.row]
+		return copy.copy(default)
+
+	def set(self, value) -> None:
+		setSideValue(self.table.sideTables[name], self.row, value, default)
+
+	return property(get, set)
+
+for (name, default) in SIDE_FIELDS.items():
+	setattr(LineView, name, sideProperty(name, default))
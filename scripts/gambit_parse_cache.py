@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import glob
+import hashlib
+import io
+import os
+import pickle
+import re
+import sys
+
+from typing import Optional
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Increment when the format of the cache entries changes.
+CACHE_FORMAT = 2
+
+# Parser attributes that are saved in the cache.
+PARSER_STATE = ['lines', 'lineInfo', 'lineNum', 'maxIndent', 'gameTitle', 'gameImports', 'vocab']
+
+# GambitCalc attributes that are saved in the cache.
+# The buckets are the same lists as in sectionCosts/subsectionCosts, which
+# pickle keeps since the entry is saved in one piece.
+CALC_STATE = ['costTotal', 'sectionCosts', 'subsectionCosts', 'bucketRows', 'buckets', 'defIndex']
+
+class GambitParseCache:
+	"""On-disk cache of parsed Gambit (.gm) files."""
+	def __init__(self, cacheDir: str, importFile: str):
+		self.cacheDir = cacheDir
+		self.importHash = hashFile(importFile)
+		self.parserVersion = calcParserVersion()
+
+		self.hits = 0
+		self.misses = 0
+
+	# Process |filepath| with |parser|, using the cached result if the file
+	# (and everything it depends on) is unchanged.
+	def process(self, parser, srcDir: str, filepath: str) -> None:
+		key = self.calcKey(parser, filepath)
+		entry = self.load(filepath, key)
+		if entry:
+			self.hits += 1
+			self.restore(parser, entry)
+			# Repeat any warnings from the original parse.
+			print(entry['output'], end='')
+			return
+
+		self.misses += 1
+		output = io.StringIO()
+		with contextlib.redirect_stdout(TeeWriter(sys.stdout, output)):
+			parser.process(srcDir, filepath)
+		self.save(parser, filepath, key, output.getvalue())
+
+	def calcKey(self, parser, filepath: str) -> str:
+		h = hashlib.sha256()
+		h.update(self.parserVersion.encode())
+		h.update(self.importHash.encode())
+		h.update(hashFile(filepath).encode())
+		h.update(str(parser.compact).encode())
+		return h.hexdigest()
+
+	def calcEntryPath(self, filepath: str, key: str) -> str:
+		name = os.path.splitext(os.path.basename(filepath))[0]
+		return os.path.join(self.cacheDir, f"{name}-{key[:16]}.pickle")
+
+	def load(self, filepath: str, key: str) -> Optional[dict]:
+		path = self.calcEntryPath(filepath, key)
+		if not os.path.isfile(path):
+			return None
+		try:
+			with open(path, 'rb') as file:
+				entry = pickle.load(file)
+		except (OSError, EOFError, pickle.UnpicklingError):
+			return None
+		if entry['key'] != key:
+			return None
+
+		# GAME-IMPORT files are only known after parsing, so they are
+		# validated here rather than being part of the key.
+		for (importPath, importHash) in entry['gameImports'].items():
+			if not os.path.isfile(importPath) or hashFile(importPath) != importHash:
+				return None
+		return entry
+
+	def save(self, parser, filepath: str, key: str, output: str) -> None:
+		entry = {
+			'key': key,
+			'gameImports': {},
+			'output': output,
+			'parser': {},
+			'calc': {},
+		}
+		for path in parser.gameImports:
+			entry['gameImports'][path] = hashFile(path)
+		for name in PARSER_STATE:
+			entry['parser'][name] = getattr(parser, name)
+		for name in CALC_STATE:
+			entry['calc'][name] = getattr(parser.calc, name)
+
+		os.makedirs(self.cacheDir, exist_ok=True)
+
+		# Remove old entries for this file. The glob also matches other files
+		# whose name starts with this one (like "carcassonne-river"), so only
+		# the names from calcEntryPath are removed. Another worker may have
+		# removed the same entry already.
+		name = os.path.splitext(os.path.basename(filepath))[0]
+		entryName = re.compile(re.escape(name) + r"-[0-9a-f]{16}\.pickle")
+		for oldPath in glob.glob(os.path.join(self.cacheDir, f"{name}-*.pickle")):
+			if not entryName.fullmatch(os.path.basename(oldPath)):
+				continue
+			try:
+				os.remove(oldPath)
+			except FileNotFoundError:
+				pass
+
+		path = self.calcEntryPath(filepath, key)
+		tmpPath = path + ".tmp"
+		with open(tmpPath, 'wb') as file:
+			pickle.dump(entry, file, pickle.HIGHEST_PROTOCOL)
+		os.replace(tmpPath, path)
+
+	def restore(self, parser, entry: dict) -> None:
+		for (name, value) in entry['parser'].items():
+			setattr(parser, name, value)
+		parser.calc.vocab = parser.vocab
+		for (name, value) in entry['calc'].items():
+			setattr(parser.calc, name, value)
+
+class TeeWriter:
+	"""Write output to multiple streams."""
+	def __init__(self, *streams):
+		self.streams = streams
+
+	def write(self, s: str) -> None:
+		for stream in self.streams:
+			stream.write(s)
+
+	def flush(self) -> None:
+		for stream in self.streams:
+			stream.flush()
+
+def hashFile(path: str) -> str:
+	with open(path, 'rb') as file:
+		return hashlib.sha256(file.read()).hexdigest()
+
+# The parser version is derived from the source of the scripts so that the
+# cache is invalidated whenever the parser changes.
+def calcParserVersion() -> str:
+	h = hashlib.sha256()
+	h.update(str(CACHE_FORMAT).encode())
+	sources = glob.glob(os.path.join(SCRIPT_DIR, "gambit*.py"))
+	sources.append(os.path.join(SCRIPT_DIR, "log.py"))
+	for path in sorted(sources):
+		h.update(os.path.basename(path).encode())
+		h.update(hashFile(path).encode())
+	return h.hexdigest()
@@ -2,15 +2,18 @@
 # -*- coding: utf-8 -*-
 
 import os
-import re
 import sys
 import traceback
 
-from gambit import LineType
+from gambit import LineCategory, LineType
 from gambit_calc import GambitCalc
-from gambit_line_processor import GambitLineProcessor
+from gambit_def_index import GambitDefIndex
+from gambit_game_imports import getGameImports
+from gambit_lexer import GambitLexer
+from gambit_line_table import LineTable
 from gambit_vocab import GambitVocab
 from log import Log
+from profiler import profiler
 
 from typing import Optional, List, Union
 
@@ -18,6 +21,14 @@ STANDARD_TERMS = [
 	"Setup", "PlayGame", "CalculateScore", "DetermineWinner"
 ]
 
+# Line types that start a new section in the cost totals.
+SECTION_LINE_TYPES = frozenset([LineType.SECTION, LineType.SUBSECTION])
+
+# Line types that don't add anything to the vocabulary.
+NON_VOCAB_LINE_TYPES = frozenset([
+	LineType.COMMENT, LineType.CONSTRAINT, LineType.DESC, LineType.SECTION,
+	LineType.SUBSECTION, LineType.BLANK])
+
 class GambitParser:
 	"""Parser for Gambit (.gm) files."""
 	def __init__(self, options):
@@ -25,20 +36,35 @@ class GambitParser:
 		self.verbose: bool = False
 		self.useWarnings: bool = False
 		self.warnOnTodo: bool = False
+		self.compact: bool = False
 
 		if 'warnings' in options:
 			self.useWarnings = options['warnings']
 		if 'verbose' in options:
 			self.verbose = options['verbose']
+		if 'compact' in options:
+			self.compact = options['compact']
 
 		self.lines: List[str] = []
-		self.lineInfo: List[GambitLineInfo] = []
+		# Store lines in a LineTable to reduce memory for large files.
+		self.lineInfo: Union[List[GambitLineInfo], LineTable] = []
+		if self.compact:
+			self.lineInfo = LineTable()
 		self.lineNum: int = 0
+		# The most recent line (the only one kept in streaming mode).
+		self.currentLine: str = ""
 		self.maxIndent: int = 0
 
+		# Keywords with more than one DEF (or TEMPLATE) line, which is needed
+		# by replaceLines. Calculated when first needed.
+		self.duplicateDefs: Optional[set] = None
+
 		self.gameTitle: str = "Unknown"
 
 		self.currentDir: Optional[str] = None
+
+		# Paths of the .gm files that were read for GAME-IMPORT.
+		self.gameImports: List[str] = []
 	
 		self.vocab = GambitVocab()
 		self.calc = GambitCalc(self.vocab)
@@ -57,7 +83,7 @@ class GambitParser:
 		elif self.lineNum > 0:
 			num = self.lineNum
 		if num > 0:
-			Log.line(num, self.lines[num-1])
+			Log.line(num, self.getLine(num))
 		self.error(msg)
 
 	def error(self, msg: str) -> None:
@@ -70,13 +96,21 @@ class GambitParser:
 
 	def warningLine(self, msg: str) -> None:
 		num = self.lineNum
-		Log.line(num, self.lines[num-1])
+		Log.line(num, self.getLine(num))
 		Log.warning(msg, num)
 
+	def getLine(self, lineNum: int) -> str:
+		if lineNum <= len(self.lines):
+			return self.lines[lineNum-1]
+		return self.currentLine
+
 	# ==========
 	# Calculating costs.
 	# ==========
 	
+	# Update the costs and totals as separate passes. process uses
+	# GambitCalc.processLines instead, so this (with extractAllReferences) is
+	# only used by the tests and benchmarks to check it.
 	def updateCosts(self):
 		# Update the costs of the individual lines.
 		self.calc.updateCosts(self.lineInfo)
@@ -90,25 +124,34 @@ class GambitParser:
 	
 	def process(self, src_dir, filepath):
 		self.currentDir = src_dir
-		with open(filepath, 'r') as file:
-			self.lineNum = 0
-			for line in file:
-				self.processLine(line)
-				if self.warnOnTodo and line.find("TODO") != -1:
-					self.warningLine(f"Unresolved TODO {line.strip()}")
+		# Lex the lines and build the vocabulary. The vocabulary is built as
+		# each line is lexed (and the references are extracted in the same
+		# pass as the costs), so these can't be timed separately.
+		with profiler.span("lex+vocab"):
+			with open(filepath, 'r') as file:
+				self.lineNum = 0
+				for line in file:
+					self.processLine(line)
+					if self.warnOnTodo and line.find("TODO") != -1:
+						self.warningLine(f"Unresolved TODO {line.strip()}")
 		
-		self.extractAllReferences()
-
-		self.updateCosts()
+		# Extract references, update costs and calculate the totals.
+		with profiler.span("refs+costs"):
+			self.calc.processLines(self.lineInfo)
 		
 	def processLine(self, line):
 		self.lineNum += 1
-		self.lines.append(line.rstrip())
+		self.currentLine = line.rstrip()
+		self.lines.append(self.currentLine)
 
-		lineinfo = GambitLineProcessor.processLine(self.lineNum, line)
+		lineinfo = GambitLexer.processLine(self.lineNum, line)
 		
 		# |lineinfo| is GambitLineInfo.
 		self.lineInfo.append(lineinfo)
+		self.classifyLine(lineinfo)
+
+	# Update the vocabulary and game info with the contents of a line.
+	def classifyLine(self, lineinfo):
 		type = lineinfo.lineType
 		if type == LineType.GAME_IMPORT:
 			self.importGameFile(lineinfo.data)
@@ -131,52 +174,253 @@ class GambitParser:
 			self.vocab.addTemplate(lineinfo.keyword, lineinfo.param)
 		elif type == LineType.NAME:
 			self.gameTitle = lineinfo.name
-		elif type == "ERROR":
-			self.errorLine(lineinfo.lineComment)
-		elif not type in [
-				LineType.COMMENT, LineType.CONSTRAINT, LineType.DESC, LineType.SECTION,
-				LineType.SUBSECTION, LineType.BLANK]:
-			self.error(f"Unhandled type in processLine: {type}")
+		elif not type in NON_VOCAB_LINE_TYPES:
+			self.error(f"Unhandled type in processLine: {type.name}")
 
 		# Record the max indent level so that we can format the HTML table correctly.
 		if lineinfo.indent > self.maxIndent:
 			self.maxIndent = lineinfo.indent
 
-	def importGameFile(self, name):
-		basename = os.path.basename(name)
-		dirname = os.path.dirname(name)
-		basename = self.convertInitialCapsToHyphenated(basename) + ".gm"
-		with open(os.path.join(self.currentDir, dirname, basename[0], basename), 'r') as file:
+	# ==========
+	# Streaming mode.
+	# ==========
+
+	# Process a Gambit file without keeping all of its lines in memory.
+	# The file is read twice: once to collect the vocabulary (so that forward
+	# references can be resolved) and then to stream each line through
+	# reference extraction and costing. Only the costs are recorded, so the
+	# result cannot be exported to HTML.
+	def processStream(self, src_dir, filepath):
+		self.currentDir = src_dir
+		for lineinfo in self.lexStage(filepath):
+			self.classifyLine(lineinfo)
+			if self.warnOnTodo and self.currentLine.find("TODO") != -1:
+				self.warningLine(f"Unresolved TODO {self.currentLine.strip()}")
+
+		# Calculate the total cost for the game.
+		self.calc.calcTotalCost(self.streamLines(filepath))
+
+	# Generate each (fully costed) GambitLineInfo in the file.
+	# The vocabulary must already be complete.
+	def streamLines(self, filepath):
+		return self.calc.costStage(self.referenceStage(self.lexStage(filepath)))
+
+	def lexStage(self, filepath):
+		with open(filepath, 'r') as file:
+			self.lineNum = 0
 			for line in file:
-				lineinfo: GambitLineInfo = GambitLineProcessor.processLine(self.lineNum, line)
-
-				if lineinfo:
-					type = lineinfo.lineType
-					if type == LineType.DEF:
-						keyword = lineinfo.keyword
-						plural = lineinfo.altKeyword
-						self.vocab.addGameImport(keyword, plural, name)
-					elif type == LineType.VALUES:
-						items = [x.strip() for x in lineinfo.line.split(',')]
-						for i in items:
-							self.vocab.addGameImport(i, None, name)
-	
-	def convertInitialCapsToHyphenated(self, name):
-		matches = [m.start(0) for m in re.finditer("[A-Z]", name)]
-		if not matches:
-			return name
-		newName = ""
-		iName = 0
-		for iCap in matches:
-			for i in range(iName, iCap):
-				newName += name[i]
-			if iCap != 0:
-				newName += '-'
-			newName += name[iCap].lower()
-			iName = iCap + 1
-		newName += name[iName:]
-		return newName
-		
+				self.lineNum += 1
+				self.currentLine = line.rstrip()
+				yield GambitLexer.processLine(self.lineNum, line)
+
+	def referenceStage(self, lineInfos):
+		currDef = None
+		for lineInfo in lineInfos:
+			currDef = lineInfo.extractReferences(currDef, self.vocab)
+			yield lineInfo
+
+	# Add the terms exported by the game |name| (and any games that it
+	# imports) to the vocabulary. The exports are cached across games.
+	def importGameFile(self, name):
+		gameImports = getGameImports(self.currentDir)
+		for (keyword, plural, source) in gameImports.resolve(name):
+			self.vocab.addGameImport(keyword, plural, source)
+
+		path = gameImports.calcPath(name)
+		for p in [path] + gameImports.getDependencies(path):
+			if not p in self.gameImports:
+				self.gameImports.append(p)
+
+	# ==========
+	# Incremental updates.
+	# ==========
+
+	# Replace the lines from |start| up to (but not including) |end| (0-based)
+	# with |newLines| and update the costs, references and totals to match.
+	# Only the definitions that contain the edit (or that use a term whose
+	# definition was changed by the edit) are processed again, and the totals
+	# are updated with the change in cost of those lines.
+	def replaceLines(self, start: int, end: int, newLines: List[str]) -> None:
+		if self.compact:
+			Log.errorInternal("replaceLines is not supported for a LineTable")
+		calc = self.calc
+		oldInfos = self.lineInfo[start:end]
+		newInfos = []
+		for i in range(len(newLines)):
+			newInfos.append(GambitLexer.processLine(start + i + 1, newLines[i]))
+		newEnd = start + len(newInfos)
+		sectionsChanged = any([r.lineType in SECTION_LINE_TYPES for r in oldInfos + newInfos])
+
+		if not sectionsChanged:
+			calc.addCosts(oldInfos, start, -1)
+			calc.shiftRows(end, newEnd - end)
+		self.lines[start:end] = [line.rstrip() for line in newLines]
+		self.lineInfo[start:end] = newInfos
+		if newEnd != end:
+			for i in range(newEnd, len(self.lineInfo)):
+				self.lineInfo[i].lineNum = i + 1
+		self.lineNum = len(self.lineInfo)
+		self.updateMaxIndent(oldInfos, newInfos)
+		# The totals always match the current line costs, so that the lines
+		# that are costed again can be removed and added back.
+		if sectionsChanged:
+			calc.calcTotalCost(self.lineInfo)
+		else:
+			calc.addCosts(newInfos, start, 1)
+		# Rebuilding the index for every edit would be slow, so it is rebuilt
+		# the next time it is needed (see getDefIndex).
+		calc.defIndex = None
+
+		# Rows that need to have their references and costs updated.
+		# This includes the lines on either side of the edit, since they are in
+		# the definitions that had lines removed.
+		rows = set(range(start, newEnd))
+		rows.add(start - 1)
+		rows.add(newEnd)
+		names = set([r.keyword for r in oldInfos if r.lineType in LineCategory.DEFINITION])
+
+		defRows = None
+		if calcVocabSignature(oldInfos) != calcVocabSignature(newInfos):
+			oldVocab = self.vocab
+			changedTerms = self.rebuildVocab()
+			(names, addedTerms) = findReferrers(oldVocab, changedTerms, names)
+			rows.update(self.findRowsUsingTerms(addedTerms))
+			defRows = self.findDefRows()
+
+		# A new or removed SECTION can change whether the following lines are
+		# in the Vocabulary section.
+		if any([r.lineType == LineType.SECTION for r in oldInfos + newInfos]):
+			i = newEnd
+			while i < len(self.lineInfo) and self.lineInfo[i].lineType != LineType.SECTION:
+				rows.add(i)
+				i += 1
+
+		# Dict of scope start -> end for the scopes to process again.
+		scopes = {}
+		for row in rows:
+			if row >= 0 and row < len(self.lineInfo):
+				(scopeStart, scopeEnd) = self.findScope(row)
+				scopes[scopeStart] = scopeEnd
+		for scopeStart in list(scopes):
+			names.add(self.getScopeName(scopeStart))
+
+		# Update every scope for the affected definitions, since the references
+		# for a definition are collected from all of its scopes.
+		if defRows is None and not names.isdisjoint(self.getDuplicateDefs()):
+			defRows = self.findDefRows()
+		if defRows is not None:
+			for name in names:
+				for row in defRows.get(name, []):
+					if not row in scopes:
+						scopes[row] = self.findScope(row)[1]
+		self.vocab.removeReferencesBy(names)
+
+		for (scopeStart, scopeEnd) in sorted(scopes.items()):
+			name = self.getScopeName(scopeStart)
+			calc.addCosts(self.lineInfo[scopeStart:scopeEnd], scopeStart, -1)
+			for i in range(scopeStart, scopeEnd):
+				if i < start or i >= newEnd:
+					# Re-lex to restore the initial cost.
+					self.lineInfo[i] = GambitLexer.processLine(i + 1, self.lines[i])
+				self.lineInfo[i].extractReferences(name, self.vocab)
+			calc.updateCostRange(self.lineInfo, scopeStart, scopeEnd)
+			calc.addCosts(self.lineInfo[scopeStart:scopeEnd], scopeStart, 1)
+
+	# Return the (start, end) rows of the range of lines whose references
+	# are attributed to the same definition as the line at |row|. A range
+	# starts with a DEF (or the start of the file) and ends before the next
+	# DEF (or the end of the file).
+	def findScope(self, row: int) -> tuple:
+		lineInfo = self.lineInfo
+		start = row
+		while start > 0 and not lineInfo[start].lineType in LineCategory.DEFINITION:
+			start -= 1
+		end = row + 1
+		while end < len(lineInfo) and not lineInfo[end].lineType in LineCategory.DEFINITION:
+			end += 1
+		return (start, end)
+
+	# Return the keyword for the range of lines starting at |row| (from
+	# findScope), or None for the lines before the first definition.
+	def getScopeName(self, row: int) -> Optional[str]:
+		r = self.lineInfo[row]
+		if r.lineType in LineCategory.DEFINITION:
+			return r.keyword
+		return None
+
+	# Return a dict of keyword -> rows of its DEF (or TEMPLATE) lines. The
+	# lines before the first definition are under None.
+	def findDefRows(self) -> dict:
+		defRows = {None: [0]}
+		for i in range(len(self.lineInfo)):
+			r = self.lineInfo[i]
+			if r.lineType in LineCategory.DEFINITION:
+				defRows.setdefault(r.keyword, []).append(i)
+		self.duplicateDefs = set([k for (k, v) in defRows.items() if len(v) > 1])
+		return defRows
+
+	# Return the GambitDefIndex for the current lines.
+	def getDefIndex(self) -> GambitDefIndex:
+		return self.calc.getDefIndex(self.lineInfo)
+
+	# Return the keywords with more than one definition. This only changes
+	# when the vocabulary does (see replaceLines).
+	def getDuplicateDefs(self) -> set:
+		if self.duplicateDefs is None:
+			self.findDefRows()
+		return self.duplicateDefs
+
+	# Update the max indent after |oldInfos| were replaced with |newInfos|.
+	# The lines only need to be scanned if a line with the max indent was
+	# removed.
+	def updateMaxIndent(self, oldInfos, newInfos) -> None:
+		oldIndent = max([r.indent for r in oldInfos], default=0)
+		newIndent = max([r.indent for r in newInfos], default=0)
+		if newIndent >= self.maxIndent:
+			self.maxIndent = newIndent
+		elif oldIndent >= self.maxIndent:
+			self.maxIndent = max([r.indent for r in self.lineInfo], default=0)
+
+	# Rebuild the vocabulary from the current lines, keeping the existing
+	# references. Return the terms that were added, removed or changed.
+	def rebuildVocab(self) -> set:
+		oldVocab = self.vocab
+		self.vocab = GambitVocab()
+		if oldVocab.importFile:
+			self.vocab.loadImportableTerms(oldVocab.importFile)
+		self.calc.vocab = self.vocab
+		for i in range(len(self.lineInfo)):
+			# So that errors are reported for the correct line.
+			self.lineNum = i + 1
+			self.currentLine = self.lines[i]
+			self.classifyLine(self.lineInfo[i])
+		self.lineNum = len(self.lineInfo)
+
+		changed = set()
+		for (old, new) in [(oldVocab.vocab, self.vocab.vocab), (oldVocab.vocabPlural, self.vocab.vocabPlural)]:
+			for k in set(old) | set(new):
+				if old.get(k) != new.get(k):
+					changed.add(k)
+		self.vocab.copyReferences(oldVocab)
+		return changed
+
+	# Return the rows with a line or comment that may refer to one of |terms|.
+	def findRowsUsingTerms(self, terms) -> List[int]:
+		rows = []
+		if not terms:
+			return rows
+		for i in range(len(self.lineInfo)):
+			r = self.lineInfo[i]
+			text = f"{r.line} {r.lineComment}"
+			if r.lineType in LineCategory.DEFINITION:
+				text += f" {r.types} {r.parent}"
+			for t in terms:
+				if t in text:
+					rows.append(i)
+					break
+		return rows
+
+	# Only used by the tests and benchmarks (see updateCosts).
 	def extractAllReferences(self):
 		currDef = None
 		for lineInfo in self.lineInfo:
@@ -185,3 +429,28 @@ class GambitParser:
 	def checkReferences(self):
 		self.vocab.checkReferences()
 	
+
+# Return (|names| plus the terms that reference one of |terms| in |vocab|,
+# the terms that weren't in |vocab|). The references for the new terms
+# aren't known, so the lines that use them need to be found some other way.
+def findReferrers(vocab, terms, names) -> tuple:
+	names = set(names)
+	added = []
+	for t in terms:
+		canonical = t if t in vocab.vocab else vocab.vocabPlural.get(t)
+		if canonical is None or not canonical in vocab.vocab:
+			added.append(t)
+			continue
+		names.update(vocab.getReferenceNames(vocab.vocab[canonical]))
+	return (names, added)
+
+# Return the parts of the lines in |lineInfo| that affect the vocabulary.
+def calcVocabSignature(lineInfo) -> list:
+	signature = []
+	for r in lineInfo:
+		type = r.lineType
+		if type in NON_VOCAB_LINE_TYPES:
+			continue
+		signature.append((type, r.keyword, r.altKeyword, r.types, r.parent, r.param, r.data, r.name,
+			r.line if type == LineType.VALUES else None))
+	return signature
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from gambit_tokenizer import GambitTokenizer
+from gambit_vocab import GambitVocab
+
+from typing import Dict, List, Tuple
+
+WORD_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_")
+UPPER_CHARS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+# Key in a trie node for the id of the term that ends at the node.
+TERMINAL = ''
+
+class GambitScanner:
+	"""Find the term references in a line with a trie of the vocab's surface forms."""
+	def __init__(self, vocab: GambitVocab):
+		self.vocab = vocab
+		# Vocab version that the trie was built for.
+		self.version = -1
+		# Trie of the keywords in the vocab's inflection index. Each node is a
+		# dict of char -> child node, with TERMINAL -> canonical term id if a
+		# keyword ends at the node.
+		self.root: Dict[str, dict] = {}
+		# Terms (and plurals) that aren't keywords (like "$100" or "2-10").
+		# These are only found as whole words.
+		self.wholeWords: Dict[str, int] = {}
+
+	# Rebuild the trie if terms have been added to the vocab.
+	def update(self) -> None:
+		vocab = self.vocab
+		if self.version == vocab.version:
+			return
+		self.version = vocab.version
+		self.root = {}
+		for (surface, (keyword, id)) in vocab.inflections.items():
+			if surface != keyword:
+				continue
+			node = self.root
+			for c in keyword:
+				child = node.get(c)
+				if child is None:
+					child = node[c] = {}
+				node = child
+			node[TERMINAL] = id
+		self.wholeWords = {}
+		for term in list(vocab.vocab) + list(vocab.vocabPlural):
+			if not GambitTokenizer.isKeyword(term):
+				self.wholeWords[term] = vocab.symbols[vocab.normalize(term)]
+
+	# Return the references in |line| as a list of (start, end, term),
+	# where line[start:end] is the text of the reference and |term| is the
+	# canonical term.
+	# This finds the same references as GambitLineInfo.extractReference
+	# (in a single pass over the line): a reference is a keyword at the
+	# start of a word (after any punctuation), ignoring the text in
+	# strings. Template references like "Produce<Stone>" are two
+	# references.
+	def scan(self, line: str) -> List[Tuple[int, int, str]]:
+		self.update()
+		refs = []
+		names = self.vocab.names
+		root = self.root
+		wordChars = WORD_CHARS
+		n = len(line)
+		# Start of the current (whitespace-separated) word.
+		wordStart = 0
+		atWordStart = True
+		i = 0
+		while i < n:
+			c = line[i]
+			if c in WORD_CHARS:
+				# Walk the trie along the run of word chars. Only a run at the
+				# start of a word can be a reference.
+				node = root if atWordStart else None
+				j = i
+				while node is not None and j < n:
+					c = line[j]
+					if not c in wordChars:
+						break
+					node = node.get(c)
+					j += 1
+				# Skip the rest of the run (if it isn't a term).
+				while j < n and line[j] in wordChars:
+					j += 1
+				if node is not None and TERMINAL in node:
+					refs.append((i, j, names[node[TERMINAL]]))
+					# Look for the parameter of a template reference.
+					atWordStart = i == wordStart and j < n and line[j] == '<'
+				elif atWordStart and not line[i] in UPPER_CHARS and self.wholeWords:
+					word = line[wordStart:].split('"', 1)[0].split(None, 1)
+					id = self.wholeWords.get(word[0]) if word else None
+					if id is not None:
+						refs.append((wordStart, wordStart + len(word[0]), names[id]))
+					atWordStart = False
+				else:
+					atWordStart = False
+				i = j
+			elif c == '"':
+				# Skip to the end of the string (the rest of the line for an
+				# unterminated string). A new word starts after the string.
+				end = line.find('"', i + 1)
+				i = n if end == -1 else end + 1
+				wordStart = i
+				atWordStart = True
+			elif c.isspace():
+				i += 1
+				wordStart = i
+				atWordStart = True
+			else:
+				i += 1
+		return refs
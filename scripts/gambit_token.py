@@ -1,16 +1,18 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
+from enum import IntEnum
+
 # Token types.
-class TokenType:
-	WORD = "WORD"
-	STRING = "STRING"
-	REF = "REF"
-	TEMPLATE_REF = "TREF"
+class TokenType(IntEnum):
+	WORD = 0
+	STRING = 1
+	REF = 2
+	TEMPLATE_REF = 3
 
 class GambitToken:
 	"""Basic token and metadata."""
-	def __init__(self, type: str, value: str):
+	def __init__(self, type: TokenType, value: str):
 		self.type = type
 		self.value = value
 
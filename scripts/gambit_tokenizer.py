@@ -5,6 +5,15 @@ import re
 
 from gambit import RegEx
 
+TEMPLATE_PATTERN = re.compile(RegEx.TEMPLATE_KEYWORD)
+KEYWORD_PATTERN = re.compile("([^A-Za-z0-9_]*)(" + RegEx.KEYWORD + ")([^A-Za-z0-9_]*.*)")
+FULL_KEYWORD_PATTERN = re.compile(RegEx.KEYWORD + r"\Z")
+
+# ASCII characters that can be stripped from the start/end of a word
+# before looking it up (all of the ASCII non-word characters).
+PUNCTUATION = ''.join([c for c in map(chr, range(33, 127)) if not (c.isalnum() or c == '_')])
+LOWER_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789_")
+
 class GambitTokenizer:
 	"""Simple tokenizer."""
 	def __init__(self, vocab):
@@ -27,7 +36,10 @@ class GambitTokenizer:
 
 	@staticmethod
 	def isTemplate(term):
-		m = re.match(RegEx.TEMPLATE_KEYWORD, term)
+		# All templates have a '<', so most words can skip the regex.
+		if not '<' in term:
+			return None
+		m = TEMPLATE_PATTERN.match(term)
 		if m:
 			keyword = m.group(1)
 			param = m.group(2)
@@ -38,8 +50,13 @@ class GambitTokenizer:
 	# Also remove contraction endings like "'s".
 	@staticmethod
 	def extractKeyword(word):
-		m = re.match("([^A-Za-z0-9_]*)(" + RegEx.KEYWORD + ")([^A-Za-z0-9_]*.*)", word)
+		m = KEYWORD_PATTERN.match(word)
 		if m:
 			return (m.group(1), m.group(2), m.group(3))
 		return ("", word, "")
 
+	# Return True if |word| is a single keyword (with no prefix or postfix).
+	@staticmethod
+	def isKeyword(word):
+		return FULL_KEYWORD_PATTERN.match(word) is not None
+
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from gambit import LineType
+from gambit_parser import GambitParser
+from log import GambitError, Log
+
+from typing import Dict, List, Optional, Tuple
+
+class VariantPatch:
+	"""A single change to the lines of a base .gm file."""
+	__slots__ = ('start', 'end', 'lines', 'subsection')
+
+	def __init__(self, start: int, end: int, lines: List[str], subsection: Optional[str] = None):
+		# Rows (0-based, |end| exclusive) in the base file that are replaced.
+		# Ignored if |subsection| is set.
+		self.start = start
+		self.end = end
+		self.lines = lines
+		# Name of the SUBSECTION whose contents are replaced.
+		self.subsection = subsection
+
+	@staticmethod
+	def addLines(row: int, lines: List[str]) -> "VariantPatch":
+		return VariantPatch(row, row, lines)
+
+	@staticmethod
+	def removeLines(start: int, end: int) -> "VariantPatch":
+		return VariantPatch(start, end, [])
+
+	@staticmethod
+	def replaceLines(start: int, end: int, lines: List[str]) -> "VariantPatch":
+		return VariantPatch(start, end, lines)
+
+	# Replace the lines in a SUBSECTION, keeping the SUBSECTION line itself.
+	@staticmethod
+	def replaceSubsection(name: str, lines: List[str]) -> "VariantPatch":
+		return VariantPatch(0, 0, lines, name)
+
+	# Remove a SUBSECTION, including the SUBSECTION line.
+	@staticmethod
+	def removeSubsection(name: str) -> "VariantPatch":
+		return VariantPatch(0, 0, None, name)
+
+class GambitVariantScorer:
+	"""Score variants of a .gm file by patching a single parse of the base file."""
+	def __init__(self, srcDir: str, path: str, importFile: Optional[str] = None):
+		self.srcDir = srcDir
+		self.path = path
+		self.importFile = importFile
+		self.parser = None
+		self.baseSummary = None
+		self.reset()
+
+	# Parse the base file. This is also used to recover after a variant
+	# fails, since the parser may have been left with a partial edit.
+	def reset(self) -> None:
+		self.parser = GambitParser({})
+		if self.importFile:
+			self.parser.loadImportableTerms(self.importFile)
+		self.parser.process(self.srcDir, self.path)
+		self.baseSummary = self.parser.calc.getSummary()
+
+	# Return the rows (start, end) of the lines in the SUBSECTION |name|,
+	# not including the SUBSECTION line.
+	def findSubsection(self, name: str) -> Tuple[int, int]:
+		lineInfo = self.parser.lineInfo
+		rows = [i for i in range(len(lineInfo))
+				if lineInfo[i].lineType == LineType.SUBSECTION and lineInfo[i].name == name]
+		if len(rows) != 1:
+			if not rows:
+				Log.error(f"Unable to find SUBSECTION {name}")
+			Log.error(f"Multiple SUBSECTIONs named {name}")
+		end = rows[0] + 1
+		while end < len(lineInfo) and not lineInfo[end].lineType in [LineType.SECTION, LineType.SUBSECTION]:
+			end += 1
+		return (rows[0] + 1, end)
+
+	# Convert |patches| into (start, end, lines) edits in the base file,
+	# sorted by row.
+	def resolvePatches(self, patches: List[VariantPatch]) -> List[Tuple[int, int, List[str]]]:
+		edits = []
+		for p in patches:
+			if p.subsection is None:
+				(start, end, lines) = (p.start, p.end, p.lines)
+			else:
+				(start, end) = self.findSubsection(p.subsection)
+				lines = p.lines
+				if lines is None:
+					start -= 1
+					lines = []
+			if start < 0 or start > end or end > len(self.parser.lines):
+				Log.error(f"Invalid patch range {start}-{end}")
+			edits.append((start, end, lines))
+		# Stable sort, so that lines added at the same row stay in order.
+		edits.sort(key=lambda e: (e[0], e[1]))
+		for i in range(1, len(edits)):
+			if edits[i][0] < edits[i-1][1]:
+				Log.error(f"Overlapping patches at row {edits[i][0]}")
+		return edits
+
+	# Apply |patches| to the base file and return the undo edits.
+	def apply(self, patches: List[VariantPatch]) -> List[Tuple[int, int, List[str]]]:
+		undo = []
+		# Apply the edits from the end of the file so that the rows of the
+		# remaining edits are not affected.
+		for (start, end, lines) in reversed(self.resolvePatches(patches)):
+			oldLines = self.parser.lines[start:end]
+			self.parser.replaceLines(start, end, lines)
+			undo.append((start, start + len(lines), oldLines))
+		return undo
+
+	def revert(self, undo: List[Tuple[int, int, List[str]]]) -> None:
+		for (start, end, lines) in reversed(undo):
+			self.parser.replaceLines(start, end, lines)
+
+	# Return the summary (see GambitCalc.getSummary) for the base file with
+	# |patches| applied. The parser is restored to the base file afterwards.
+	def score(self, patches: List[VariantPatch]) -> list:
+		if not patches:
+			return self.baseSummary
+		try:
+			undo = self.apply(patches)
+			summary = self.parser.calc.getSummary()
+			self.revert(undo)
+		except GambitError:
+			self.reset()
+			raise
+		return summary
+
+	# Return the summary for each of the |variants|, or None for variants
+	# that could not be scored. The error has already been reported.
+	def scoreAll(self, variants: Dict[str, List[VariantPatch]]) -> Dict[str, Optional[list]]:
+		results = {}
+		for (name, patches) in variants.items():
+			try:
+				results[name] = self.score(patches)
+			except GambitError:
+				results[name] = None
+		return results
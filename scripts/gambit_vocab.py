@@ -6,12 +6,16 @@ import re
 import sys
 import traceback
 
+from array import array
+from collections import ChainMap
+from types import MappingProxyType
+
 from gambit import LineType, VocabType
-from gambit_line_processor import GambitLineProcessor
-from gambit_tokenizer import GambitTokenizer
+from gambit_lexer import GambitLexer
+from gambit_tokenizer import GambitTokenizer, LOWER_CHARS, PUNCTUATION
 from log import Log
 
-from typing import Optional, List, Union
+from typing import Dict, Mapping, Optional, List, Tuple, Union
 
 BASE_TYPES = [
 	"Noun", "Verb", "Attribute", "Part", "Condition", "Constraint", "Exit",
@@ -21,48 +25,129 @@ STANDARD_TERMS = [
 	"Setup", "PlayGame", "CalculateScore", "DetermineWinner"
 ]
 
+# Importable terms for each import file, shared by all GambitVocabs in the
+# process. Maps the absolute path to (mtime, size, terms).
+sharedImportables: dict[str, tuple] = {}
+
+class VocabEntry:
+	"""A term in the vocabulary."""
+	__slots__ = ('id', 'name', 'scope', 'types', 'parent', 'param', 'origin', 'refs')
+
+	def __init__(self, id: int, name: str, scope: VocabType, types: Optional[List[str]] = None,
+			parent: Optional[str] = None, param: Optional[str] = None, origin: Optional[str] = None):
+		# Id of the term in the vocab's symbol table.
+		self.id = id
+		self.name = name
+		self.scope = scope
+		self.types = types
+		self.parent = parent
+		# Parameter for TEMPLATEs.
+		self.param = param
+		# File that the term was imported from.
+		self.origin = origin
+		# Array of the symbol ids of the terms that reference this term, or
+		# None if there are no references. Ids are appended as references are
+		# found, so this can have duplicates until getRefIds is called.
+		self.refs: Optional[array] = None
+
+	# Return the ids in |refs| as a sorted array without duplicates (which is
+	# the order that the referring terms were added to the symbol table).
+	# The array is also kept as |refs|, so it must not be modified.
+	def getRefIds(self) -> array:
+		if self.refs is None:
+			return array('I')
+		if len(self.refs) > 1:
+			self.refs = array('I', sorted(set(self.refs)))
+		return self.refs
+
+	# Entries are equal if they define the term the same way.
+	def __eq__(self, other) -> bool:
+		if not isinstance(other, VocabEntry):
+			return NotImplemented
+		return (self.name == other.name and self.scope == other.scope and self.types == other.types
+				and self.parent == other.parent and self.param == other.param and self.origin == other.origin)
+
+	def __repr__(self) -> str:
+		return f"VocabEntry({self.name}, {self.scope.name}, {self.types}, {self.parent}, {self.param}, {self.origin})"
+
 class GambitVocab:
 	"""Vocabulary manager for a GambitParser."""
 	def __init__(self):
-		self.vocab: dict[str, list] = {}
+		# Dict of term -> VocabEntry.
+		self.vocab: Dict[str, VocabEntry] = {}
+
+		# Symbol table for the terms and the names that make references to
+		# them (which includes None for references before the first DEF).
+		self.symbols: Dict[Optional[str], int] = {}
+		self.names: List[Optional[str]] = []
+		# The most recent term to make a reference, and its id.
+		self.lastRefBy: Optional[str] = None
+		self.lastRefId = self.intern(None)
 		
 		# Dictionary that maps plurals to the normalized form.
 		self.vocabPlural: dict[str, str] = {}
+		# Dict of surface form -> (keyword, id of the canonical term) for
+		# each form that a term can take in the text: the term, its plural
+		# and the possessive of each ("Card's", "Cards'"). The keyword is
+		# the form without the possessive ending.
+		self.inflections: Dict[str, Tuple[str, int]] = {}
 		
 		# Definitions that were imported (and possibly overwritten).
 		self.old_imports = {}
 		self.imports = {}
 		
 		# Term that are defined in the import file.
-		self.importable = {}
+		# Additions for this vocab are made to the first map so that the
+		# shared terms from the import file are never modified.
+		self.importFile: Optional[str] = None
+		self.importable: ChainMap = ChainMap({})
 		
-		# Dict of defs that reference this def.
-		self.referencedBy = {}
+		# Incremented whenever a term is added, to invalidate the cached
+		# results of isDefinedTerm.
+		self.version = 0
+		self.definedTermCache: dict[str, bool] = {}
+		self.definedTermCacheVersion = 0
+		self.cacheHits = 0
+		self.cacheMisses = 0
 
 		for key in BASE_TYPES:
-			self._addVocab(key, None, [VocabType.BASE])
+			self._addVocab(key, None, VocabType.BASE)
 
 	def contains(self, term) -> bool:
 		return term in self.vocab
 		
-	def lookup(self, term) -> list:
+	def lookup(self, term) -> VocabEntry:
 		return self.vocab[term]
 
+	# Return the symbol id for |name|, adding it to the table if needed.
+	def intern(self, name: Optional[str]) -> int:
+		id = self.symbols.get(name)
+		if id is None:
+			id = len(self.names)
+			self.symbols[name] = id
+			self.names.append(name)
+		return id
+
 	def loadImportableTerms(self, import_file) -> None:
-		with open(import_file, 'r') as file:
-			for line in file:
-				lineinfo = GambitLineProcessor.processLine(0, line)
-
-				if lineinfo:
-					type = lineinfo.lineType
-					if type == LineType.DEF:
-						keyword = lineinfo.keyword
-						plural = lineinfo.altKeyword
-						self.importable[keyword] = plural
-					elif type == LineType.VALUES:
-						items = [x.strip() for x in lineinfo.line.split(',')]
-						for i in items:
-							self.importable[i] = None
+		self.importFile = import_file
+		self.importable = ChainMap({}, loadSharedImportables(import_file))
+
+	def addImportable(self, keyword, plural) -> None:
+		self.importable[keyword] = plural
+
+	# The shared importable terms are reloaded (from the process-wide cache)
+	# rather than being pickled with each vocab.
+	def __getstate__(self) -> dict:
+		state = self.__dict__.copy()
+		state['importable'] = self.importable.maps[0]
+		state['definedTermCache'] = {}
+		return state
+
+	def __setstate__(self, state: dict) -> None:
+		self.__dict__.update(state)
+		self.importable = ChainMap(state['importable'])
+		if self.importFile:
+			self.importable.maps.append(loadSharedImportables(self.importFile))
 
 	# ==========
 	# Vocabulary
@@ -78,53 +163,88 @@ class GambitVocab:
 		return self.normalize(word) in self.vocab
 	
 	def addDef(self, key, keyPlural, types, parent):
-		info = [VocabType.LOCAL, types]
-		if parent:
-			info.append(parent)
-		self._addVocab(key, keyPlural, info)
+		self._addVocab(key, keyPlural, VocabType.LOCAL, types, parent or None)
 	
 	def addEnumValue(self, key):
-		info = [VocabType.LOCAL, "Value"]
-		self._addVocab(key, None, info)
+		self._addVocab(key, None, VocabType.LOCAL, ["Value"])
 	
 	def addTemplate(self, key, param):
-		info = [VocabType.LOCAL, "Verb", param]
-		self._addVocab(key, None, info)
+		self._addVocab(key, None, VocabType.LOCAL, ["Verb"], param=param)
 
 	def addImport(self, key, plural):
-		info = [VocabType.IMPORT, "_import.gm"]
-		self._addVocab(key, plural, info)
+		self._addVocab(key, plural, VocabType.IMPORT, origin="_import.gm")
 		self.imports[key] = True
 
 	def addGameImport(self, key, plural, filename):
-		info = [VocabType.GAME_IMPORT, filename]
-		self._addVocab(key, plural, info)
+		self._addVocab(key, plural, VocabType.GAME_IMPORT, origin=filename)
 		self.old_imports[key] = True
 
-	def _addVocab(self, key: str, keyPlural: Optional[str], info: list) -> None:
-		self.vocab[key] = info
-		self.referencedBy[key] = set()
+	def _addVocab(self, key: str, keyPlural: Optional[str], scope: VocabType, types: Optional[List[str]] = None,
+			parent: Optional[str] = None, param: Optional[str] = None, origin: Optional[str] = None) -> None:
+		self.version += 1
+		# A term that is defined again (e.g., to replace an imported term)
+		# keeps its id but loses its references.
+		self.vocab[key] = VocabEntry(self.intern(key), key, scope, types, parent, param, origin)
 
-		# Simple default plurals.
 		if keyPlural is None:
-			# "Bonus"
-			if key[-2:] in ['us', 'ex']:
-				keyPlural = key + "es"
-			elif key[-1] == 's':
-				keyPlural = key
-			# "Factory", "Quarry", "City", but not "Donkey"
-			elif key[-2:] in ['ry', 'ty']:
-				keyPlural = key[0:-1] + "ies"
-			# "Domino"
-			elif key[-1:] == 'o':
-				keyPlural = key + "es"
-			else:
-				keyPlural = key + "s"
+			keyPlural = calcPlural(key)
 
 		# Mapping from plural to canonical form.
 		self.vocabPlural[keyPlural] = key
+		self.addInflections(key)
+		self.addInflections(keyPlural)
+
+	# Add the surface forms for |keyword| (a term or a plural) to the
+	# inflection index. Keywords with non-word characters (like "$100")
+	# can't be found by stripping punctuation, so they are left for the
+	# slow path in resolveWord.
+	def addInflections(self, keyword: str) -> None:
+		if not GambitTokenizer.isKeyword(keyword):
+			return
+		inflection = (keyword, self.symbols[self.normalize(keyword)])
+		self.inflections[keyword] = inflection
+		self.inflections[keyword + "'s"] = inflection
 
+	# Split |word| into (prefix, keyword, postfix), like
+	# GambitTokenizer.extractKeyword, and return these with the canonical
+	# term for the keyword (or None if it isn't a term).
+	# Words that are a form of a term are resolved by stripping the
+	# punctuation and looking up the inflection index.
+	def resolveWord(self, word: str) -> Tuple[str, str, str, Optional[str]]:
+		stripped = word.lstrip(PUNCTUATION)
+		inflection = self.inflections.get(stripped.rstrip(PUNCTUATION))
+		if inflection is not None:
+			(keyword, id) = inflection
+			prefixLen = len(word) - len(stripped)
+			return (word[:prefixLen], keyword, stripped[len(keyword):], self.names[id])
+
+		# A word that doesn't start with a capital (after the punctuation)
+		# is never split.
+		if stripped == "" or stripped[0] in LOWER_CHARS:
+			(prefix, keyword, postfix) = ("", word, "")
+		else:
+			(prefix, keyword, postfix) = GambitTokenizer.extractKeyword(word)
+		canonicalForm = self.normalize(keyword)
+		if not canonicalForm in self.vocab:
+			canonicalForm = None
+		return (prefix, keyword, postfix, canonicalForm)
+
+	# Cached version of _isDefinedTerm. Most lines repeat the same words
+	# ("the", "Player", "Card"), so these are resolved with one lookup.
 	def isDefinedTerm(self, term: str) -> bool:
+		if self.definedTermCacheVersion != self.version:
+			self.definedTermCache = {}
+			self.definedTermCacheVersion = self.version
+		cache = self.definedTermCache
+		if term in cache:
+			self.cacheHits += 1
+			return cache[term]
+		self.cacheMisses += 1
+		result = self._isDefinedTerm(term)
+		cache[term] = result
+		return result
+
+	def _isDefinedTerm(self, term: str) -> bool:
 		if self.isVocab(term):
 			return True
 
@@ -136,6 +256,15 @@ class GambitVocab:
 
 		return False
 	
+	def clearCache(self) -> None:
+		self.definedTermCache = {}
+
+	# Return (hits, misses, hit rate) for the isDefinedTerm cache.
+	def getCacheStats(self) -> tuple:
+		total = self.cacheHits + self.cacheMisses
+		rate = self.cacheHits / total if total else 0.0
+		return (self.cacheHits, self.cacheMisses, rate)
+
 	def importTerms(self, terms):
 		for t in terms:
 			if not t in self.importable:
@@ -156,25 +285,109 @@ class GambitVocab:
 	def addReference(self, refTerm, refBy) -> None:
 		if refTerm == refBy:
 			return
-		#if not refTerm in self.referencedBy:
-		#	self.referencedBy[refTerm] = set()
-		self.referencedBy[refTerm].add(refBy)
+		entry = self.vocab[refTerm]
+		if refBy is self.lastRefBy:
+			id = self.lastRefId
+		else:
+			id = self.intern(refBy)
+			self.lastRefBy = refBy
+			self.lastRefId = id
+		# The references made by a definition are all found before the next
+		# definition, so only a repeat of the last id needs to be skipped to
+		# keep |refs| small. Any other duplicates are removed by getRefIds.
+		refs = entry.refs
+		if refs is None:
+			entry.refs = array('I', [id])
+		elif refs[-1] != id:
+			refs.append(id)
 
 	def getReferencesTo(self, term) -> List[str]:
 		refs = []
-		if term in self.referencedBy:
-			refs = sorted(self.referencedBy[term])
+		if term in self.vocab:
+			refs = sorted(self.getReferenceNames(self.vocab[term]))
 		return refs
 
+	def getReferenceNames(self, entry: VocabEntry) -> List[Optional[str]]:
+		if entry.refs is None:
+			return []
+		names = self.names
+		return [names[id] for id in entry.getRefIds()]
+
+	# Return a dict of term -> set of the terms that reference it.
+	@property
+	def referencedBy(self) -> Dict[str, set]:
+		return {k: set(self.getReferenceNames(e)) for (k, e) in self.vocab.items()}
+
+	# Remove the references made by each of |names|.
+	def removeReferencesBy(self, names) -> None:
+		ids = set([self.symbols[n] for n in names if n in self.symbols])
+		for entry in self.vocab.values():
+			refs = entry.refs
+			if refs is not None and not ids.isdisjoint(refs):
+				refs = array('I', [id for id in refs if not id in ids])
+				entry.refs = refs if refs else None
+
+	# Copy the references for each term from |other| (another GambitVocab).
+	def copyReferences(self, other: "GambitVocab") -> None:
+		for (k, entry) in self.vocab.items():
+			if k in other.vocab:
+				names = other.getReferenceNames(other.vocab[k])
+				entry.refs = array('I', [self.intern(n) for n in names]) if names else None
+
 	def checkReferences(self):
-		for k,v in self.referencedBy.items():
+		for (k, entry) in self.vocab.items():
 			# Ignore standard terms (entry points like "Setup").
 			if k in STANDARD_TERMS:
 				continue
 			# If defined locally but no references.
-			if self.vocab[k][0] == VocabType.LOCAL and len(v) == 0:
+			if entry.scope == VocabType.LOCAL and entry.refs is None:
 				# Allow local definitions to overwrite imported defs.
 				if not k in self.old_imports:
 					Log.warning(f"Term is defined but never referenced: {k}")
-			if self.vocab[k][0] == VocabType.IMPORT and len(v) == 0:
+			if entry.scope == VocabType.IMPORT and entry.refs is None:
 				Log.warning(f"Term is imported but never referenced: {k}")
+
+# Return the default plural for |key|.
+def calcPlural(key: str) -> str:
+	# "Bonus"
+	if key[-2:] in ['us', 'ex']:
+		return key + "es"
+	if key[-1] == 's':
+		return key
+	# "Factory", "Quarry", "City", but not "Donkey"
+	if key[-2:] in ['ry', 'ty']:
+		return key[0:-1] + "ies"
+	# "Domino"
+	if key[-1:] == 'o':
+		return key + "es"
+	return key + "s"
+
+# Return the (read-only) importable terms defined in |importFile|. The file is
+# only read again if it has been modified.
+def loadSharedImportables(importFile: str) -> Mapping[str, Optional[str]]:
+	path = os.path.abspath(importFile)
+	stat = os.stat(path)
+	if path in sharedImportables:
+		(mtime, size, terms) = sharedImportables[path]
+		if mtime == stat.st_mtime_ns and size == stat.st_size:
+			return terms
+
+	terms = {}
+	with open(path, 'r') as file:
+		for line in file:
+			lineinfo = GambitLexer.processLine(0, line)
+
+			if lineinfo:
+				type = lineinfo.lineType
+				if type == LineType.DEF:
+					keyword = lineinfo.keyword
+					plural = lineinfo.altKeyword
+					terms[keyword] = plural
+				elif type == LineType.VALUES:
+					items = [x.strip() for x in lineinfo.line.split(',')]
+					for i in items:
+						terms[i] = None
+
+	terms = MappingProxyType(terms)
+	sharedImportables[path] = (stat.st_mtime_ns, stat.st_size, terms)
+	return terms
@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import glob
+import hashlib
+import json
+import os
+
+from gambit_game_imports import getGameImports
+from gambit_parse_cache import hashFile
+
+from typing import Dict, List
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Increment when the format of the manifest changes.
+MANIFEST_FORMAT = 1
+
+# Scripts that affect the generated output for a game.
+SCRIPT_PATTERNS = ["analyze.py", "gambit*.py", "game_info.py", "log.py", "gm.css"]
+
+class GameManifest:
+	"""Record of the inputs used to build the outputs for each game."""
+	def __init__(self, path: str, srcDir: str, outputDir: str):
+		self.path = path
+		self.srcDir = srcDir
+		self.outputDir = outputDir
+		self.scriptVersion = calcScriptVersion()
+
+		# Dict of game id -> {'inputs': {path: hash}, 'outputs': [path]}
+		self.games: Dict[str, dict] = {}
+		self.load()
+
+	def load(self) -> None:
+		if not os.path.isfile(self.path):
+			return
+		try:
+			with open(self.path, 'r') as file:
+				data = json.load(file)
+		except (OSError, ValueError):
+			return
+		# Everything must be rebuilt when the scripts change.
+		if data.get('format') != MANIFEST_FORMAT or data.get('scriptVersion') != self.scriptVersion:
+			return
+		self.games = data['games']
+
+	def save(self) -> None:
+		data = {
+			'format': MANIFEST_FORMAT,
+			'scriptVersion': self.scriptVersion,
+			'games': self.games,
+		}
+		dir = os.path.dirname(self.path)
+		if dir and not os.path.isdir(dir):
+			os.makedirs(dir)
+		tmpPath = self.path + ".tmp"
+		with open(tmpPath, 'w') as file:
+			json.dump(data, file, indent=1, sort_keys=True)
+		os.replace(tmpPath, self.path)
+
+	# Return the paths of the source files used to build the game |id|.
+	def calcInputs(self, id: str) -> List[str]:
+		basepath = os.path.join(self.srcDir, id[0], id)
+		gmPath = basepath + ".gm"
+		inputs = [gmPath, basepath + ".xml", os.path.join(self.srcDir, "_import.gm")]
+		if os.path.isfile(gmPath):
+			inputs.extend(getGameImports(self.srcDir).getDependencies(gmPath))
+		return inputs
+
+	def calcOutputs(self, id: str) -> List[str]:
+		return [os.path.join(self.outputDir, id[0], id + ".html")]
+
+	# Return True if the game |id| needs to be rebuilt because one of its
+	# inputs has changed (or one of its outputs is missing).
+	def isStale(self, id: str) -> bool:
+		if not id in self.games:
+			return True
+		entry = self.games[id]
+		if sorted(entry['inputs']) != sorted(self.calcInputs(id)):
+			return True
+		for (path, hash) in entry['inputs'].items():
+			if not os.path.isfile(path) or hashFile(path) != hash:
+				return True
+		for path in entry['outputs']:
+			if not os.path.isfile(path):
+				return True
+		return False
+
+	# Record the current inputs for the game |id| after it has been built.
+	def update(self, id: str) -> None:
+		inputs = {}
+		for path in self.calcInputs(id):
+			inputs[path] = hashFile(path)
+		self.games[id] = {
+			'inputs': inputs,
+			'outputs': self.calcOutputs(id),
+		}
+
+# The script version is derived from the source of the scripts (and the
+# stylesheet) so that all games are rebuilt whenever they change.
+def calcScriptVersion() -> str:
+	sources = []
+	for pattern in SCRIPT_PATTERNS:
+		sources.extend(glob.glob(os.path.join(SCRIPT_DIR, pattern)))
+	h = hashlib.sha256()
+	h.update(str(MANIFEST_FORMAT).encode())
+	for path in sorted(set(sources)):
+		h.update(os.path.basename(path).encode())
+		h.update(hashFile(path).encode())
+	return h.hexdigest()
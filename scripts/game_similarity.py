@@ -0,0 +1,193 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import os
+import sys
+import zlib
+
+import numpy as np
+
+from gambit import LineType, VocabType
+from gambit_parser import GambitParser
+from gambit_token import TokenType
+from game_list_manager import GameListManager
+from log import GambitError
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SRC_DIR = "../src"
+
+# Hashes are computed modulo this (Mersenne) prime, so that a * hash fits
+# in 64 bits.
+PRIME = (1 << 31) - 1
+
+DEFAULT_BANDS = 32
+DEFAULT_ROWS = 4
+# This should be above the LSH threshold (~0.42 for 32 bands of 4 rows),
+# otherwise many of the pairs with this similarity won't be candidates.
+DEFAULT_THRESHOLD = 0.5
+
+class MinHasher:
+	"""Compute MinHash signatures for sets of strings."""
+	def __init__(self, numPerm: int, seed: int = 1):
+		self.numPerm = numPerm
+		random = np.random.default_rng(seed)
+		# Each permutation is h(x) = (a * x + b) mod PRIME.
+		self.a = random.integers(1, PRIME, numPerm, dtype=np.uint64)
+		self.b = random.integers(0, PRIME, numPerm, dtype=np.uint64)
+
+	# Return the signature of |features| as an array of |numPerm| hashes.
+	# An empty set has a signature of PRIME (which no hash can equal).
+	def signature(self, features: Iterable[str]) -> np.ndarray:
+		hashes = np.array([zlib.crc32(f.encode()) % PRIME for f in features], dtype=np.uint64)
+		if len(hashes) == 0:
+			return np.full(self.numPerm, PRIME, dtype=np.uint64)
+		# Rows are permutations, columns are features.
+		permuted = (np.outer(self.a, hashes) + self.b[:, np.newaxis]) % PRIME
+		return permuted.min(axis=1)
+
+class SimilarityIndex:
+	"""Locality-sensitive hashing of MinHash signatures to find similar items."""
+	def __init__(self, numBands: int = DEFAULT_BANDS, numRows: int = DEFAULT_ROWS):
+		self.numBands = numBands
+		self.numRows = numRows
+		self.ids: List[str] = []
+		self.signatures: List[np.ndarray] = []
+		# For each band, a dict of band hash -> indices of the items.
+		self.buckets: List[Dict[bytes, List[int]]] = [{} for i in range(numBands)]
+
+	def getNumPerm(self) -> int:
+		return self.numBands * self.numRows
+
+	# The similarity at which a pair has a 50% chance of being a candidate.
+	def getThreshold(self) -> float:
+		return (1 / self.numBands) ** (1 / self.numRows)
+
+	# Add the |signature| for |id|. Signatures of empty sets are skipped
+	# since they are all the same and would match each other.
+	def add(self, id: str, signature: np.ndarray) -> None:
+		if (signature == PRIME).all():
+			return
+		index = len(self.ids)
+		self.ids.append(id)
+		self.signatures.append(signature)
+		for band in range(self.numBands):
+			key = signature[band * self.numRows:(band + 1) * self.numRows].tobytes()
+			self.buckets[band].setdefault(key, []).append(index)
+
+	# Return the pairs of indices (i < j) that share at least one bucket.
+	def findCandidates(self) -> Set[Tuple[int, int]]:
+		candidates = set()
+		for buckets in self.buckets:
+			for indices in buckets.values():
+				for i in range(len(indices)):
+					for j in range(i + 1, len(indices)):
+						candidates.add((indices[i], indices[j]))
+		return candidates
+
+	# Return the fraction of the hashes that are the same in both signatures,
+	# which is an estimate of the Jaccard similarity of the two sets.
+	def estimateSimilarity(self, i: int, j: int) -> float:
+		return float(np.mean(self.signatures[i] == self.signatures[j]))
+
+	# Return a list of (id1, id2, estimated similarity) for the candidate
+	# pairs with an estimated similarity of at least |threshold|, most
+	# similar first.
+	def findSimilar(self, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, str, float]]:
+		pairs = []
+		for (i, j) in self.findCandidates():
+			similarity = self.estimateSimilarity(i, j)
+			if similarity >= threshold:
+				(id1, id2) = sorted([self.ids[i], self.ids[j]])
+				pairs.append((id1, id2, similarity))
+		return sorted(pairs, key=lambda p: (-p[2], p[0], p[1]))
+
+# Return the features of a parsed game: the terms that it uses (prefixed
+# with "term:") and its normalized DESC lines (prefixed with "desc:").
+def calcFeatures(parser: GambitParser) -> Set[str]:
+	features = set()
+	for (term, entry) in parser.vocab.vocab.items():
+		if entry.scope != VocabType.BASE:
+			features.add("term:" + term)
+	for lineinfo in parser.lineInfo:
+		if lineinfo.lineType == LineType.DESC and lineinfo.tokens:
+			desc = normalizeDesc(lineinfo.tokens)
+			if desc:
+				features.add("desc:" + desc)
+	return features
+
+# Return a DESC line (as tokens from extractReference) with the references
+# replaced by their canonical term, the strings removed and the other
+# words lowercased without punctuation. So "Take 2 Cards." and "take 2
+# card" are the same.
+def normalizeDesc(tokens) -> str:
+	words = []
+	for token in tokens:
+		if isinstance(token, list):
+			if token[0] == TokenType.REF:
+				words.append(token[1])
+			elif token[0] == TokenType.TEMPLATE_REF:
+				words.append(f"{token[1]}<{token[2]}>")
+		elif token[0] != '"':
+			word = ''.join([c for c in token.lower() if c.isalnum()])
+			if word:
+				words.append(word)
+	return ' '.join(words)
+
+# Return a dict of game id -> features for each game in the game list.
+def loadGameFeatures(ids: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+	gameMgr = GameListManager()
+	if ids is None:
+		ids = gameMgr.gameOrder
+	features = {}
+	for id in ids:
+		parser = GambitParser({})
+		parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+		try:
+			parser.process(SRC_DIR, os.path.join(SRC_DIR, gameMgr.getGame(id).basepath + ".gm"))
+		except GambitError:
+			print(f"Skipping {id} (unable to parse)")
+			continue
+		features[id] = calcFeatures(parser)
+	return features
+
+def usage():
+	print("Usage: %s [<options>] [<game>...]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --bands <n> [-b]")  # number of LSH bands
+	print("  --rows <n> [-r]")  # number of signature rows in each band
+	print("  --threshold <x> [-t]")  # minimum estimated similarity to report
+	print("if no <game>s are specified, then all games are compared")
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'b:r:t:',
+			['bands=', 'rows=', 'threshold='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	numBands = DEFAULT_BANDS
+	numRows = DEFAULT_ROWS
+	threshold = DEFAULT_THRESHOLD
+	for opt, arg in opts:
+		if opt in ('-b', '--bands'):
+			numBands = int(arg)
+		elif opt in ('-r', '--rows'):
+			numRows = int(arg)
+		elif opt in ('-t', '--threshold'):
+			threshold = float(arg)
+
+	index = SimilarityIndex(numBands, numRows)
+	hasher = MinHasher(index.getNumPerm())
+	for (id, features) in loadGameFeatures(args or None).items():
+		index.add(id, hasher.signature(features))
+
+	print(f"{len(index.ids)} games, LSH threshold ~{index.getThreshold():.2f}")
+	for (id1, id2, similarity) in index.findSimilar(threshold):
+		print(f"{similarity:.2f}  {id1}  {id2}")
+
+if __name__ == '__main__':
+	main()
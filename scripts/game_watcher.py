@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import time
+import traceback
+
+from gambit_game_imports import getGameImports
+from gambit_html_exporter import GM_CSS_PATH
+from log import GambitError
+
+from typing import Dict, List, Optional, Tuple
+
+class GameWatcher:
+	"""Regenerate games when their source files change."""
+	def __init__(self, analyzer, srcDir: str, options, ids: List[str], interval: float = 0.25):
+		self.analyzer = analyzer
+		self.srcDir = srcDir
+		self.options = options
+		self.interval = interval
+		self.importFile = os.path.join(srcDir, "_import.gm")
+		self.gameImports = getGameImports(srcDir)
+
+		# Games to regenerate: the requested games and all games that
+		# import them.
+		self.ids = self.addDependents(ids)
+
+		# Dict of path -> ids of the games that use the file.
+		self.files: Dict[str, List[str]] = {}
+		# Dict of path -> last (mtime, size) of the file.
+		self.stats: Dict[str, Optional[Tuple[int, int]]] = {}
+
+	def calcGamePath(self, id: str) -> str:
+		return os.path.join(self.srcDir, id[0], id + ".gm")
+
+	def addDependents(self, ids: List[str]) -> List[str]:
+		games = {}
+		for id in self.analyzer.gameMgr.gameOrder:
+			path = self.calcGamePath(id)
+			if os.path.isfile(path):
+				games[path] = id
+		result = list(ids)
+		for id in ids:
+			for path in self.gameImports.getDependents(self.calcGamePath(id), list(games)):
+				if not games[path] in result:
+					result.append(games[path])
+		return result
+
+	# Update the set of watched files (which changes if a GAME-IMPORT is
+	# added or removed) and record their current state.
+	def update(self) -> None:
+		files = {}
+		for id in self.ids:
+			gmPath = self.calcGamePath(id)
+			paths = [gmPath, gmPath[:-3] + ".xml"]
+			if os.path.isfile(gmPath):
+				paths.extend(self.gameImports.getDependencies(gmPath))
+			for path in paths:
+				files.setdefault(path, []).append(id)
+		for path in [self.importFile, GM_CSS_PATH]:
+			files[path] = list(self.ids)
+		self.files = files
+		self.stats = {path: statFile(path) for path in files}
+
+	# Return the games that use a file that has changed since the last
+	# call to update().
+	def poll(self) -> List[str]:
+		changed = set()
+		for (path, ids) in self.files.items():
+			if statFile(path) != self.stats[path]:
+				changed.update(ids)
+				if path == self.importFile and self.analyzer.parseCache:
+					# The parse cache keys include the hash of the import file.
+					self.analyzer.enableParseCache()
+		return [id for id in self.ids if id in changed]
+
+	def regenerate(self, ids: List[str]) -> None:
+		start = time.perf_counter()
+		for id in ids:
+			# Reload the game info in case the .xml file was edited.
+			self.analyzer.gameMgr.games[id] = None
+			try:
+				self.analyzer.processOne(id, self.options)
+			except GambitError:
+				# The error has already been reported.
+				pass
+			except Exception:
+				traceback.print_exc()
+		if self.analyzer.termIndex:
+			self.analyzer.termIndex.save()
+		elapsed = 1000 * (time.perf_counter() - start)
+		print(f"Regenerated {', '.join(ids)} in {elapsed:.0f} ms")
+		# Ignore the changes made to the .xml files by the analyzer.
+		self.update()
+
+	def run(self) -> None:
+		self.regenerate(self.ids)
+		print(f"Watching {len(self.files)} files for {len(self.ids)} games (Ctrl-C to stop)...")
+		try:
+			while True:
+				time.sleep(self.interval)
+				ids = self.poll()
+				if ids:
+					self.regenerate(ids)
+		except KeyboardInterrupt:
+			print("Stopped watching")
+
+def statFile(path: str) -> Optional[Tuple[int, int]]:
+	try:
+		stat = os.stat(path)
+	except OSError:
+		return None
+	return (stat.st_mtime_ns, stat.st_size)
@@ -3,7 +3,9 @@
 
 from __future__ import annotations
 
-import sys
+class GambitError(Exception):
+	"""Error in a Gambit (.gm) file or its game info."""
+	pass
 
 class Log:
 	"""Display error."""
@@ -21,10 +23,7 @@ class Log:
 		else:
 			print(f"ERROR: {msg}")
 
-		#traceback.print_exc()
-		#if self.quitOnError:
-		sys.exit(0)
-		#raise Exception(msg)
+		raise GambitError(msg)
 
 	@staticmethod
 	def errorInternal(msg: str, lineNum: int = -1) -> None:
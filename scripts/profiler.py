@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import contextlib
+import cProfile
+import json
+import os
+import time
+
+from typing import Dict, List, Optional
+
+# Separates the names of nested spans, e.g. "parse/lex+vocab" for a
+# "lex+vocab" span inside a "parse" span.
+NESTED_SEP = "/"
+
+class Span:
+	"""Times a named phase and adds it to the profiler."""
+	__slots__ = ('profiler', 'name', 'start')
+
+	def __init__(self, profiler: "Profiler", name: str):
+		self.profiler = profiler
+		self.name = name
+		self.start = 0.0
+
+	def __enter__(self):
+		self.name = self.profiler.openSpan(self.name)
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, excType, excValue, tb):
+		self.profiler.add(self.name, time.perf_counter() - self.start)
+		self.profiler.closeSpan()
+		return False
+
+# Shared no-op context manager used for spans when profiling is disabled.
+NULL_SPAN = contextlib.nullcontext()
+
+class Profiler:
+	"""Named timing spans, aggregated per game and for the entire run."""
+	def __init__(self):
+		self.enabled = False
+		self.cprofile: Optional[cProfile.Profile] = None
+		self.start = 0.0
+
+		# Id of the game being processed, or None.
+		self.game: Optional[str] = None
+		# Dict of game id -> {span name -> [count, seconds]}.
+		self.games: Dict[str, Dict[str, list]] = {}
+		# Dict of span name -> [count, seconds] for the entire run.
+		self.spans: Dict[str, list] = {}
+		# Names of the spans that are currently open, innermost last.
+		self.openSpans: List[str] = []
+
+	def enable(self, useCProfile: bool = False) -> None:
+		self.enabled = True
+		self.start = time.perf_counter()
+		if useCProfile:
+			self.cprofile = cProfile.Profile()
+			self.cprofile.enable()
+
+	# Return a context manager that records the time spent in the phase
+	# |name|. This does nothing if profiling is not enabled.
+	def span(self, name: str):
+		if not self.enabled:
+			return NULL_SPAN
+		return Span(self, name)
+
+	# Start the span |name| and return its full name, which includes the
+	# names of the spans that it is nested in.
+	def openSpan(self, name: str) -> str:
+		if self.openSpans:
+			name = f"{self.openSpans[-1]}{NESTED_SEP}{name}"
+		self.openSpans.append(name)
+		return name
+
+	def closeSpan(self) -> None:
+		self.openSpans.pop()
+
+	def add(self, name: str, seconds: float, count: int = 1) -> None:
+		addSpan(self.spans, name, seconds, count)
+		if self.game is not None:
+			addSpan(self.games.setdefault(self.game, {}), name, seconds, count)
+
+	# Attribute the spans that follow to the game |id| (or to no game if None).
+	def setGame(self, id: Optional[str]) -> None:
+		self.game = id
+
+	# Merge the spans for the game |id| that were recorded in another
+	# process (see getGameSpans).
+	def addGame(self, id: str, spans: Dict[str, list]) -> None:
+		for (name, (count, seconds)) in spans.items():
+			addSpan(self.spans, name, seconds, count)
+			addSpan(self.games.setdefault(id, {}), name, seconds, count)
+
+	def getGameSpans(self, id: str) -> Dict[str, list]:
+		return self.games.get(id, {})
+
+	def getReport(self) -> dict:
+		return {
+			'elapsed_ms': toMs(time.perf_counter() - self.start),
+			'run': formatSpans(self.spans),
+			'games': {id: formatSpans(spans) for (id, spans) in self.games.items()},
+		}
+
+	# Write the JSON report to |path| and (if enabled) the cProfile stats
+	# to |cprofilePath|. Print a summary of the spans for the run.
+	def save(self, path: str, cprofilePath: Optional[str] = None) -> None:
+		if self.cprofile:
+			self.cprofile.disable()
+			if cprofilePath:
+				self.cprofile.dump_stats(cprofilePath)
+		report = self.getReport()
+		dir = os.path.dirname(path)
+		if dir and not os.path.isdir(dir):
+			os.makedirs(dir)
+		with open(path, 'w') as file:
+			json.dump(report, file, indent=1)
+		self.printSummary(report)
+		print(f"Profile written to {path}")
+
+	# Print the spans for the run, with each nested span listed after the
+	# span that contains it. The time for a nested span is already part of
+	# the enclosing span, so only the outermost spans have a percentage
+	# (otherwise they would add up to more than 100%).
+	def printSummary(self, report: dict) -> None:
+		elapsed = report['elapsed_ms']
+		spans = report['run']
+		print(f"{'Span':<20} {'Count':>7} {'Total ms':>10} {'%':>6}")
+		for name in sorted(spans, key=lambda name: nestedSortKey(spans, name)):
+			span = spans[name]
+			percent = ''
+			if not NESTED_SEP in name and elapsed:
+				percent = f"{100 * span['total_ms'] / elapsed:.1f}"
+			print(f"{name:<20} {span['count']:>7} {span['total_ms']:>10.1f} {percent:>6}")
+		print(f"{'Elapsed':<20} {'':>7} {elapsed:>10.1f}")
+
+def addSpan(spans: Dict[str, list], name: str, seconds: float, count: int) -> None:
+	if name in spans:
+		spans[name][0] += count
+		spans[name][1] += seconds
+	else:
+		spans[name] = [count, seconds]
+
+# Return the sort key for the span |name| so that the spans are sorted by
+# decreasing time, with the nested spans sorted under the enclosing span.
+def nestedSortKey(spans: dict, name: str) -> list:
+	key = []
+	parts = name.split(NESTED_SEP)
+	for i in range(len(parts)):
+		path = NESTED_SEP.join(parts[:i+1])
+		key += [-spans.get(path, {}).get('total_ms', 0), path]
+	return key
+
+def formatSpans(spans: Dict[str, list]) -> dict:
+	return {name: {'count': count, 'total_ms': toMs(seconds)} for (name, (count, seconds)) in spans.items()}
+
+def toMs(seconds: float) -> float:
+	return round(1000 * seconds, 3)
+
+# Profiler shared by all of the scripts in the process.
+profiler = Profiler()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import getopt
+import os
+import sqlite3
+import sys
+
+from array import array
+
+from gambit import LineType, VocabType
+from gambit_game_imports import getGameImports
+
+from typing import Dict, List, Optional, Tuple
+
+INDEX_FILE = "../.cache/terms.db"
+
+# Increment when the schema changes.
+INDEX_FORMAT = 1
+
+SCHEMA = [
+	"CREATE TABLE games (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)",
+	"CREATE TABLE terms (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)",
+	# The line numbers are stored as an array('I') blob.
+	"CREATE TABLE postings (term INTEGER, game INTEGER, scope INTEGER, lines BLOB,"
+		" PRIMARY KEY (term, game, scope)) WITHOUT ROWID",
+	"CREATE INDEX postings_game ON postings (game)",
+]
+
+# Names for the scopes in the CLI (and the reverse mapping).
+SCOPE_NAMES = {
+	VocabType.LOCAL: "local",
+	VocabType.IMPORT: "import",
+	VocabType.GAME_IMPORT: "game-import",
+}
+SCOPES = {name: scope for (scope, name) in SCOPE_NAMES.items()}
+
+class TermIndex:
+	"""Index of the games that define or import each term."""
+	def __init__(self, path: str):
+		self.path = path
+		dir = os.path.dirname(path)
+		if dir and not os.path.isdir(dir):
+			os.makedirs(dir)
+		self.db = sqlite3.connect(path)
+		# Dict of term -> id, loaded when the first game is updated.
+		self.termIds: Optional[Dict[str, int]] = None
+		version = self.db.execute("PRAGMA user_version").fetchone()[0]
+		if version != INDEX_FORMAT:
+			self.reset()
+
+	def reset(self) -> None:
+		for table in ["postings", "terms", "games"]:
+			self.db.execute(f"DROP TABLE IF EXISTS {table}")
+		for statement in SCHEMA:
+			self.db.execute(statement)
+		self.db.execute(f"PRAGMA user_version = {INDEX_FORMAT}")
+		self.termIds = None
+		self.db.commit()
+
+	def save(self) -> None:
+		self.db.commit()
+
+	def close(self) -> None:
+		self.db.close()
+
+	def getGameId(self, name: str) -> int:
+		row = self.db.execute("SELECT id FROM games WHERE name = ?", (name,)).fetchone()
+		if row:
+			return row[0]
+		return self.db.execute("INSERT INTO games (name) VALUES (?)", (name,)).lastrowid
+
+	# Return the id for the term |name|, adding it if needed. The term ids
+	# are cached since each game adds hundreds of terms.
+	def getTermId(self, name: str) -> int:
+		if self.termIds is None:
+			self.termIds = {name: id for (id, name) in self.db.execute("SELECT id, name FROM terms")}
+		id = self.termIds.get(name)
+		if id is None:
+			id = self.db.execute("INSERT INTO terms (name) VALUES (?)", (name,)).lastrowid
+			self.termIds[name] = id
+		return id
+
+	# ==========
+	# Updates
+	# ==========
+
+	# Replace the entries for the game |id| with |terms|, the result of
+	# collectTerms for the game.
+	def updateGame(self, id: str, terms: List[Tuple[str, VocabType, int]]) -> None:
+		gameId = self.getGameId(id)
+		self.db.execute("DELETE FROM postings WHERE game = ?", (gameId,))
+		lines: Dict[Tuple[str, VocabType], array] = {}
+		for (term, scope, lineNum) in terms:
+			key = (term, scope)
+			if not key in lines:
+				lines[key] = array('I')
+			lines[key].append(lineNum)
+		self.db.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)",
+			[(self.getTermId(term), gameId, int(scope), lineNums.tobytes())
+				for ((term, scope), lineNums) in lines.items()])
+
+	def removeGame(self, id: str) -> None:
+		self.db.execute("DELETE FROM postings WHERE game IN (SELECT id FROM games WHERE name = ?)", (id,))
+		self.db.execute("DELETE FROM games WHERE name = ?", (id,))
+
+	# Remove the games that aren't in |ids|.
+	def removeOtherGames(self, ids: List[str]) -> None:
+		keep = set(ids)
+		for id in self.getGames():
+			if not id in keep:
+				self.removeGame(id)
+
+	# ==========
+	# Queries
+	# ==========
+
+	def getGames(self) -> List[str]:
+		return [row[0] for row in self.db.execute("SELECT name FROM games ORDER BY name")]
+
+	# Return a list of (term, game, scope, [line numbers]) for the terms that
+	# match |pattern|, which can be a glob pattern (like "Work*").
+	def find(self, pattern: str, scope: Optional[VocabType] = None) -> List[Tuple[str, str, VocabType, List[int]]]:
+		op = "GLOB" if any(c in pattern for c in "*?[") else "="
+		query = ("SELECT terms.name, games.name, scope, lines FROM terms"
+			" JOIN postings ON postings.term = terms.id"
+			" JOIN games ON games.id = postings.game"
+			f" WHERE terms.name {op} ?")
+		params: list = [pattern]
+		if scope is not None:
+			query += " AND scope = ?"
+			params.append(int(scope))
+		query += " ORDER BY terms.name, games.name, scope"
+		return [(term, game, VocabType(scope), array('I', lines).tolist())
+			for (term, game, scope, lines) in self.db.execute(query, params)]
+
+	# Return a list of (term, scope, [line numbers]) for the terms in the
+	# game |id|.
+	def getTerms(self, id: str) -> List[Tuple[str, VocabType, List[int]]]:
+		query = ("SELECT terms.name, scope, lines FROM postings"
+			" JOIN terms ON terms.id = postings.term"
+			" JOIN games ON games.id = postings.game"
+			" WHERE games.name = ? ORDER BY terms.name, scope")
+		return [(term, VocabType(scope), array('I', lines).tolist())
+			for (term, scope, lines) in self.db.execute(query, (id,))]
+
+# Return a list of (term, scope, line number) for each term that is defined
+# or imported by the lines in |parser|.
+def collectTerms(parser, srcDir: str) -> List[Tuple[str, VocabType, int]]:
+	terms = []
+	for lineinfo in parser.lineInfo:
+		type = lineinfo.lineType
+		lineNum = lineinfo.lineNum
+		if type in (LineType.DEF, LineType.TEMPLATE):
+			terms.append((lineinfo.keyword, VocabType.LOCAL, lineNum))
+		elif type == LineType.VALUES:
+			for value in lineinfo.line.split(','):
+				terms.append((value.strip(), VocabType.LOCAL, lineNum))
+		elif type == LineType.IMPORT:
+			for term in lineinfo.data:
+				terms.append((term, VocabType.IMPORT, lineNum))
+		elif type == LineType.GAME_IMPORT:
+			for (term, plural, source) in getGameImports(srcDir).resolve(lineinfo.data):
+				terms.append((term, VocabType.GAME_IMPORT, lineNum))
+	return terms
+
+def usage():
+	print("Usage: %s [<options>] [<term>]" % sys.argv[0])
+	print("where <options> are:")
+	print("  --game <id> [-g]")  # list the terms in the game <id>
+	print("  --index <file>")  # index file (default ../.cache/terms.db)
+	print("  --scope <scope> [-s]")  # only local, import or game-import terms
+	print("<term> can be a glob pattern, like 'Work*'")
+
+def main():
+	try:
+		opts, args = getopt.getopt(sys.argv[1:],
+			'g:s:',
+			['game=', 'index=', 'scope='])
+	except getopt.GetoptError:
+		usage()
+		exit()
+
+	game = None
+	path = INDEX_FILE
+	scope = None
+	for opt, arg in opts:
+		if opt in ('-g', '--game'):
+			game = arg
+		elif opt == '--index':
+			path = arg
+		elif opt in ('-s', '--scope'):
+			if not arg in SCOPES:
+				usage()
+				exit()
+			scope = SCOPES[arg]
+
+	if not os.path.isfile(path):
+		print(f"No term index at {path} (run analyze.py first)")
+		exit()
+	index = TermIndex(path)
+	if game:
+		for (term, termScope, lines) in index.getTerms(game):
+			if scope is None or termScope == scope:
+				print(f"{term:<30} {SCOPE_NAMES[termScope]:<12} {','.join(map(str, lines))}")
+	elif len(args) == 1:
+		for (term, id, termScope, lines) in index.find(args[0], scope):
+			print(f"{term:<30} {id:<30} {SCOPE_NAMES[termScope]:<12} {','.join(map(str, lines))}")
+	else:
+		usage()
+	index.close()
+
+if __name__ == '__main__':
+	main()
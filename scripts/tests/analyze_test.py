@@ -0,0 +1,48 @@
+import os
+import pytest
+
+from analyze import Analyzer, processGame
+from log import GambitError, Log
+
+SCRIPT_DIR = os.path.join(os.path.dirname(__file__), "..")
+OPTIONS = {
+    'compact': False,
+    'verbose': False,
+    'warnings': False,
+}
+
+def test_logError_raises():
+    with pytest.raises(GambitError):
+        Log.error("Bad line", 12)
+
+def test_processGame_error(monkeypatch):
+    monkeypatch.chdir(SCRIPT_DIR)
+    result = processGame("no-such-game", OPTIONS, False)
+    assert result.id == "no-such-game"
+    assert result.error
+    assert result.terms is None
+    assert result.output.startswith("Analyzing no-such-game...")
+
+class FakeManifest:
+    def __init__(self, stale):
+        self.stale = stale
+
+    def isStale(self, id):
+        return id in self.stale
+
+class FakeTermIndex:
+    def __init__(self, games):
+        self.games = games
+
+    def getGames(self):
+        return self.games
+
+def test_isStale_termIndex(monkeypatch):
+    monkeypatch.chdir(SCRIPT_DIR)
+    analyzer = Analyzer()
+    analyzer.manifest = FakeManifest(["a"])
+    assert [id for id in ["a", "b"] if analyzer.isStale(id)] == ["a"]
+
+    # Games that are missing from the term index are rebuilt.
+    analyzer.termIndex = FakeTermIndex(["b"])
+    assert [id for id in ["a", "b", "c"] if analyzer.isStale(id)] == ["a", "c"]
@@ -0,0 +1,62 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from corpus_analytics import CorpusAnalytics, parseWeight
+
+SUMMARIES = [
+    [10, [["Vocabulary", 4, []], ["Gameplay", 6, [["-", 2], ["Cards", 4]]]]],
+    ["20", [["Vocabulary", "5", []], ["Setup", "5", []], ["Gameplay", "10", []]]],
+    [30, [["Setup", 10, []], ["Gameplay", 20, []]]],
+    [0, []],
+]
+WEIGHTS = [1.0, 2.0, 3.0, None]
+
+def createAnalytics():
+    return CorpusAnalytics(["a", "b", "c", "d"], SUMMARIES, WEIGHTS)
+
+def test_costMatrix():
+    analytics = createAnalytics()
+    assert analytics.sectionNames == ["Vocabulary", "Gameplay", "Setup"]
+    assert analytics.costs.tolist() == [[4, 6, 0], [5, 10, 5], [0, 20, 10], [0, 0, 0]]
+    assert analytics.totals.tolist() == [10, 20, 30, 0]
+    assert analytics.hasWeight().tolist() == [True, True, True, False]
+
+def test_distributions():
+    analytics = createAnalytics()
+    assert analytics.percentiles([0, 50, 100]).tolist() == [0, 15, 30]
+    assert analytics.sectionPercentiles([100]).tolist() == [[5, 20, 10]]
+    (counts, edges) = analytics.histogram(bins=3)
+    assert counts.tolist() == [1, 1, 2]
+
+    share = analytics.sectionShare()
+    assert share[0].tolist() == pytest.approx([0.4, 0.6, 0.0])
+    # No division by zero for a game without a score.
+    assert share[3].tolist() == [0, 0, 0]
+    assert share[:3].sum(axis=1).tolist() == pytest.approx([1, 1, 1])
+
+def test_weight():
+    analytics = createAnalytics()
+    corr = analytics.correlation()
+    # The total score is a linear function of the weight.
+    assert corr[0] == pytest.approx(1.0)
+    assert corr[1] == pytest.approx(np.corrcoef([4, 5, 0], [1, 2, 3])[0, 1])
+
+    (slope, intercept, r2) = analytics.regression()
+    assert slope == pytest.approx(0.1)
+    assert intercept == pytest.approx(0.0, abs=1e-9)
+    assert r2 == pytest.approx(1.0)
+
+def test_fromCsv(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text("Catan,2.31,41,111\nGame, With Comma,,10,25\n")
+    analytics = CorpusAnalytics.fromCsv(str(path))
+    assert analytics.ids == ["Catan", "Game, With Comma"]
+    assert analytics.sectionNames == ["Vocabulary", "Other"]
+    assert analytics.costs.tolist() == [[41, 70], [10, 15]]
+    assert analytics.hasWeight().tolist() == [True, False]
+
+def test_parseWeight():
+    assert parseWeight("2.5") == 2.5
+    assert parseWeight("-") is None
+    assert parseWeight(0) is None
@@ -0,0 +1,47 @@
+import glob
+import os
+import pytest
+
+from gambit import LineCategory, LineType
+from gambit_def_index import GambitDefIndex
+from gambit_parser import GambitParser
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_defIndex_corpus():
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        parser = GambitParser({})
+        parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+        parser.process(SRC_DIR, filepath)
+
+        index = GambitDefIndex(parser.lineInfo)
+        for (i, r) in enumerate(parser.lineInfo):
+            if r.lineType in LineCategory.DEFINITION:
+                assert index.hasDesc(i) == parser.calc.defHasDesc(parser.lineInfo, i), (filepath, i)
+
+def test_defIndex_rows():
+    parser = GambitParser({})
+    for line in [
+        "Card: Noun",
+        "\tA card",
+        "\t// Comment",
+        "Deck: Noun",
+        "",
+        "Color: Attribute of Card",
+        "\tValues: Red, Blue",
+    ]:
+        parser.processLine(line)
+
+    index = GambitDefIndex(parser.lineInfo)
+    assert index.getDefRows(0) == range(0, 3)
+    assert index.findDef("Deck") == range(3, 4)
+    assert index.findDef("Color") == range(5, 7)
+    assert index.findDef("Unknown") is None
+    assert [index.hasDesc(i) for i in [0, 3, 5]] == [True, False, True]
+
+def test_defIndex_badIndent():
+    parser = GambitParser({})
+    parser.processLine("Card: Noun")
+    parser.processLine("\t\tA card")
+    with pytest.raises(Exception):
+        GambitDefIndex(parser.lineInfo)
@@ -0,0 +1,44 @@
+import glob
+import os
+import pytest
+
+from gambit import LineCategory
+from gambit_free_actions import FreeActionMatcher, isFreeActionReference
+from gambit_parser import GambitParser
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+class FakeVocab:
+    def __init__(self, terms):
+        self.terms = terms
+
+    def isDefinedTerm(self, term):
+        return term in self.terms
+
+def test_match():
+    matcher = FreeActionMatcher()
+    assert matcher.match("Then:") == ("Then:", [])
+    assert matcher.match("Repeat 3 times:") == ("Repeat ([0-9]+) times:", [])
+    (rule, keywords) = matcher.match("For each Player in the Team:")
+    assert keywords == ["Player", "Team"]
+    assert matcher.match("Repeat until GameEnd:")[1] == ["GameEnd"]
+    assert matcher.match("For each player:") is None
+    assert matcher.match("Draw a Card") is None
+
+def test_isFree():
+    matcher = FreeActionMatcher()
+    vocab = FakeVocab(["Player"])
+    assert matcher.isFree("For each Player:", vocab)
+    assert not matcher.isFree("For each Card:", vocab)
+    assert matcher.isFree("For each Card, starting with Player:", vocab)
+
+def test_isFree_corpus():
+    matcher = FreeActionMatcher()
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        parser = GambitParser({})
+        parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+        parser.process(SRC_DIR, filepath)
+        for r in parser.lineInfo:
+            if r.lineType in LineCategory.DESCRIPTION:
+                expected = isFreeActionReference(r.line, parser.vocab)
+                assert matcher.isFree(r.line, parser.vocab) == expected, (filepath, r.line)
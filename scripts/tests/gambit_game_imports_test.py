@@ -0,0 +1,53 @@
+import os
+import pytest
+
+from gambit_game_imports import GambitGameImports, convertInitialCapsToHyphenated
+
+def test_convertInitialCapsToHyphenated():
+    assert convertInitialCapsToHyphenated("DominionFirst10") == "dominion-first10"
+    assert convertInitialCapsToHyphenated("chess") == "chess"
+
+def test_resolve_transitive(tmp_path):
+    writeGame(tmp_path, "base-game", ["Card: Noun", "Color: Attribute of Card", "\tValues: Red, Blue"])
+    writeGame(tmp_path, "expansion", ["GAME-IMPORT: BaseGame", "Token|Tokenz: Noun"])
+    gameImports = GambitGameImports(str(tmp_path))
+
+    terms = gameImports.resolve("Expansion")
+    assert terms == [
+        ("Card", None, "BaseGame"),
+        ("Color", None, "BaseGame"),
+        ("Red", None, "BaseGame"),
+        ("Blue", None, "BaseGame"),
+        ("Token", "Tokenz", "Expansion"),
+    ]
+
+    path = gameImports.calcPath("Expansion")
+    assert gameImports.getDependencies(path) == [gameImports.calcPath("BaseGame")]
+    assert gameImports.getDependents(gameImports.calcPath("BaseGame"), [path]) == [path]
+
+def test_resolve_memoized(tmp_path):
+    path = writeGame(tmp_path, "base-game", ["Card: Noun"])
+    gameImports = GambitGameImports(str(tmp_path))
+    first = gameImports.resolve("BaseGame")
+    assert gameImports.resolve("BaseGame") is first
+
+    # Modifying the game invalidates the cached exports.
+    with open(path, 'a') as file:
+        file.write("Cube: Noun\n")
+    os.utime(path, ns=(0, 0))
+    assert [t[0] for t in gameImports.resolve("BaseGame")] == ["Card", "Cube"]
+
+def test_findCycles(tmp_path):
+    a = writeGame(tmp_path, "alpha", ["GAME-IMPORT: Beta", "Apple: Noun"])
+    b = writeGame(tmp_path, "beta", ["GAME-IMPORT: Alpha", "Banana: Noun"])
+    c = writeGame(tmp_path, "charlie", ["GAME-IMPORT: Alpha", "Cherry: Noun"])
+    gameImports = GambitGameImports(str(tmp_path))
+    assert gameImports.findCycles([a, b, c]) == [[a, b, a]]
+
+def writeGame(tmp_path, name, lines):
+    dir = tmp_path / name[0]
+    os.makedirs(dir, exist_ok=True)
+    path = dir / (name + ".gm")
+    with open(path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+    return str(path)
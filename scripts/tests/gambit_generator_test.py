@@ -0,0 +1,33 @@
+import os
+import pytest
+
+from gambit import LineType
+from gambit_generator import GambitGenerator, MAX_INDENT, calcGamePath, writeCorpus
+from gambit_parser import GambitParser
+
+IMPORT_FILE = os.path.join(os.path.dirname(__file__), "../../src/_import.gm")
+
+@pytest.mark.parametrize("numLines", [50, 1000, 5000])
+def test_generator_valid(tmp_path, numLines):
+    srcDir = str(tmp_path)
+    ids = writeCorpus(srcDir, IMPORT_FILE, 3, numLines)
+    assert ids == ["synthetic-0", "synthetic-1", "synthetic-2"]
+    for id in ids:
+        parser = GambitParser({})
+        parser.loadImportableTerms(os.path.join(srcDir, "_import.gm"))
+        parser.process(srcDir, calcGamePath(srcDir, id))
+        assert parser.calc.getSummary()[0] > 0
+        if numLines >= 1000:
+            assert abs(len(parser.lines) - numLines) < numLines * 0.05
+
+            types = set([r.lineType for r in parser.lineInfo])
+            for type in [LineType.DEF, LineType.TEMPLATE, LineType.VALUES, LineType.CONSTRAINT,
+                    LineType.GAME_IMPORT, LineType.IMPORT, LineType.SUBSECTION]:
+                assert type in types
+            assert parser.maxIndent == MAX_INDENT
+            assert parser.gameImports
+
+def test_generator_deterministic():
+    lines = list(GambitGenerator(500, seed=7).lines())
+    assert lines == list(GambitGenerator(500, seed=7).lines())
+    assert lines != list(GambitGenerator(500, seed=8).lines())
@@ -0,0 +1,74 @@
+import glob
+import json
+import os
+import pytest
+
+from gambit_graph import GambitGraph
+from gambit_parser import GambitParser
+from log import GambitError
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_graph_queries():
+    graph = createGraph([
+        "Card: Noun",
+        "\tA Card",
+        "Deck: Noun",
+        "\tA stack of Cards",
+        "Pile: Noun",
+        "\tCards from the Deck",
+        "Unused: Noun",
+        "\tA Pile",
+        "Draw: Verb",
+        "\tTake a Card from the Deck",
+        "\tDeal",
+        "Deal: Verb",
+        "\tDraw a Card",
+        "Setup: Verb",
+        "\tDeal",
+    ])
+    assert graph.getDirectDependencies("Deck") == ["Noun", "Card"]
+    assert graph.getDependencies("Pile") == ["Card", "Deck", "Noun"]
+    assert graph.getDependencies("Setup") == ["Card", "Deal", "Deck", "Draw", "Noun", "Verb"]
+    assert graph.getDirectDependents("Deck") == ["Pile", "Draw"]
+    assert graph.getDependents("Deck") == ["Deal", "Draw", "Pile", "Setup", "Unused"]
+    assert graph.getCycles() == [["Deal", "Draw"]]
+    assert graph.getUnreachable() == ["Pile", "Unused"]
+
+    data = json.loads(json.dumps(graph.toJson()))
+    assert data["names"][graph.getId("Deck")] == "Deck"
+    assert data["scopes"][graph.getId("Deck")] == "LOCAL"
+    assert data["cycles"] == [["Deal", "Draw"]]
+
+    assert not graph.hasTerm("Nope")
+    with pytest.raises(GambitError, match="Unknown term: Nope"):
+        graph.getDependencies("Nope")
+
+def test_graph_corpus():
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        parser = createParser()
+        parser.process(SRC_DIR, filepath)
+        graph = GambitGraph(parser.vocab)
+        referencedBy = parser.vocab.referencedBy
+        numEdges = 0
+        for (term, refs) in referencedBy.items():
+            assert set(graph.getDirectDependents(term)) == refs, filepath
+            numEdges += len(refs)
+        assert graph.getNumEdges() == numEdges
+
+        # Terms in a cycle depend on each other.
+        for cycle in graph.getCycles():
+            for term in cycle:
+                assert set(cycle) - set([term]) <= set(graph.getDependencies(term))
+
+def createParser():
+    parser = GambitParser({})
+    parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+    return parser
+
+def createGraph(lines):
+    parser = createParser()
+    for line in lines:
+        parser.processLine(line)
+    parser.extractAllReferences()
+    return GambitGraph(parser.vocab)
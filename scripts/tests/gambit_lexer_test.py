@@ -0,0 +1,66 @@
+import glob
+import os
+import pytest
+
+from gambit_lexer import GambitLexer
+from gambit_line_processor import GambitLineProcessor
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_lexer_empty():
+    checkSameAsProcessor("")
+    checkSameAsProcessor("\t")
+    checkSameAsProcessor("\n")
+    with pytest.raises(Exception):
+        GambitLexer.processLine(1, "  ")
+    with pytest.raises(Exception):
+        GambitLexer.processLine(1, " \t ")
+
+def test_lexer_comment():
+    checkSameAsProcessor("// comment")
+    checkSameAsProcessor("\t\t// comment   ")
+    checkSameAsProcessor("        // comment")
+    checkSameAsProcessor("\tDescription // comment // more\n")
+    with pytest.raises(Exception):
+        GambitLexer.processLine(1, "  // comment")
+
+def test_lexer_keywords():
+    checkSameAsProcessor("NAME: title\n")
+    checkSameAsProcessor("SECTION: title // not a comment")
+    checkSameAsProcessor("SUBSECTION: title")
+    checkSameAsProcessor("IMPORT: Player, Score")
+    checkSameAsProcessor("GAME-IMPORT: Carcassonne")
+    checkSameAsProcessor("Nameless: Noun")
+    checkSameAsProcessor("Sections: Noun")
+
+def test_lexer_defs():
+    checkSameAsProcessor("NewVerb<Type>: Verb  // comment")
+    checkSameAsProcessor("NewVerb|Alt: Noun  // comment")
+    checkSameAsProcessor("Noun3: Noun1,Noun2")
+    checkSameAsProcessor("Thing: Attribute of Noun1\n")
+
+def test_lexer_descriptions():
+    checkSameAsProcessor("! Some constraint  // comment")
+    checkSameAsProcessor("\t\t! Some constraint")
+    checkSameAsProcessor("\tValues: A, B, C")
+    checkSameAsProcessor("\tValue of the Card")
+    checkSameAsProcessor("\t* Lookup entry")
+    checkSameAsProcessor("    Some description  // comment\n")
+
+def test_lexer_corpus():
+    files = glob.glob(os.path.join(SRC_DIR, "*.gm"))
+    files += glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))
+    assert len(files) != 0
+    for path in files:
+        with open(path, 'r') as file:
+            lineNum = 0
+            for line in file:
+                lineNum += 1
+                checkSameAsProcessor(line, lineNum)
+
+# Verify that the lexer and the reference line processor produce the same result.
+def checkSameAsProcessor(line, lineNum=1):
+    expected = GambitLineProcessor.processLine(lineNum, line)
+    out = GambitLexer.processLine(lineNum, line)
+    assert vars(out) == vars(expected), line
+    return out
@@ -1,96 +1,97 @@
 import pytest
 
+from gambit import LineType
 from gambit_line_processor import GambitLineProcessor
 
 def test_processLine_empty():
-    checkLineType("", "BLANK", None, 0, "", "")
+    checkLineType("", LineType.BLANK, None, 0, "", "")
     with pytest.raises(Exception):
-        checkLineType("  ", "BLANK", None, 0, "", "")
-    checkLineType("\t", "BLANK", None, 0, "", "")
+        checkLineType("  ", LineType.BLANK, None, 0, "", "")
+    checkLineType("\t", LineType.BLANK, None, 0, "", "")
     with pytest.raises(Exception):
-        checkLineType(" \t ", "BLANK", None, 0, "", "")
+        checkLineType(" \t ", LineType.BLANK, None, 0, "", "")
 
 #def test_processLine_import():
-#    checkLineType("#import file", "IMPORT", None, 0, "", "file")
+#    checkLineType("#import file", LineType.IMPORT, None, 0, "", "file")
 
 def test_processLine_comment():
-    checkLineType("// comment", "COMMENT", None, 0, "", "comment")
-    checkLineType("\t// comment", "COMMENT", None, 1, "", "comment")
-    checkLineType("\t\t// comment", "COMMENT", None, 2, "", "comment")
+    checkLineType("// comment", LineType.COMMENT, None, 0, "", "comment")
+    checkLineType("\t// comment", LineType.COMMENT, None, 1, "", "comment")
+    checkLineType("\t\t// comment", LineType.COMMENT, None, 2, "", "comment")
     # Check for indenting using spaces.
-    checkLineType("    // comment", "COMMENT", None, 1, "", "comment")
-    checkLineType("        // comment", "COMMENT", None, 2, "", "comment")
+    checkLineType("    // comment", LineType.COMMENT, None, 1, "", "comment")
+    checkLineType("        // comment", LineType.COMMENT, None, 2, "", "comment")
     # Invalid number of spaces.
     with pytest.raises(Exception):
-        checkLineType("  // comment", "COMMENT", None, 0, "", "comment")
+        checkLineType("  // comment", LineType.COMMENT, None, 0, "", "comment")
     # Trailing spaces.
-    checkLineType("\t// comment   ", "COMMENT", None, 1, "", "comment")
+    checkLineType("\t// comment   ", LineType.COMMENT, None, 1, "", "comment")
 
 def test_processLine_commentSpecial():
-    out = checkLineType("SECTION: title", "SECTION", None, 0, "", "")
+    out = checkLineType("SECTION: title", LineType.SECTION, None, 0, "", "")
     assert out.name == "title"
-    out = checkLineType("SUBSECTION: title", "SUBSECTION", None, 0, "", "")
+    out = checkLineType("SUBSECTION: title", LineType.SUBSECTION, None, 0, "", "")
     assert out.name == "title"
-    out = checkLineType("NAME: title", "NAME", None, 0, "", "")
+    out = checkLineType("NAME: title", LineType.NAME, None, 0, "", "")
     assert out.name == "title"
     # Not detected if they are indented.
-    #checkLineType("\tSECTION: title", "COMMENT", None, 1, "", "SECTION: title")
+    #checkLineType("\tSECTION: title", LineType.COMMENT, None, 1, "", "SECTION: title")
 
 def test_processLine_templateDef():
-    out = checkLineType("NewVerb<Type>: Verb", "TEMPLATE", 1, 0, "", "")
+    out = checkLineType("NewVerb<Type>: Verb", LineType.TEMPLATE, 1, 0, "", "")
     assert out.keyword == "NewVerb"
     assert out.param == "Type"
 
-    out = checkLineType("NewVerb<Type>: Verb  // comment", "TEMPLATE", 1, 0, "", "comment")
+    out = checkLineType("NewVerb<Type>: Verb  // comment", LineType.TEMPLATE, 1, 0, "", "comment")
     assert out.keyword == "NewVerb"
     assert out.param == "Type"
     # Not detected if indented.
-    checkLineType("\tNewVerb<Type>: Verb", "DESC", 1, 1, "NewVerb<Type>: Verb", "")
+    checkLineType("\tNewVerb<Type>: Verb", LineType.DESC, 1, 1, "NewVerb<Type>: Verb", "")
 
 def test_processLine_def():
-    out = checkLineType("NewVerb: Noun", "DEF", 1, 0, "", "")
+    out = checkLineType("NewVerb: Noun", LineType.DEF, 1, 0, "", "")
     assert out.keyword == "NewVerb"
     assert out.types == ["Noun"]
     assert out.parent == None
-    out = checkLineType("NewVerb: Noun  // comment", "DEF", 1, 0, "", "comment")
+    out = checkLineType("NewVerb: Noun  // comment", LineType.DEF, 1, 0, "", "comment")
     assert out.keyword == "NewVerb"
     assert out.types == ["Noun"]
     assert out.parent == None
 
-    out = checkLineType("NewVerb|Alt: Noun", "DEF", 1, 0, "", "")
+    out = checkLineType("NewVerb|Alt: Noun", LineType.DEF, 1, 0, "", "")
     assert out.keyword == "NewVerb"
     assert out.altKeyword == "Alt"
     assert out.types == ["Noun"]
     assert out.parent == None
-    out = checkLineType("NewVerb|Alt: Noun  // comment", "DEF", 1, 0, "", "comment")
+    out = checkLineType("NewVerb|Alt: Noun  // comment", LineType.DEF, 1, 0, "", "comment")
     assert out.keyword == "NewVerb"
     assert out.altKeyword == "Alt"
     assert out.types == ["Noun"]
     assert out.parent == None
 
-    out = checkLineType("Noun3: Noun1,Noun2", "DEF", 1, 0, "", "")
+    out = checkLineType("Noun3: Noun1,Noun2", LineType.DEF, 1, 0, "", "")
     assert out.keyword == "Noun3"
     assert out.types == ["Noun1", "Noun2"]
     assert out.parent == None
 
-    out = checkLineType("Thing: Attribute of Noun1", "DEF", 1, 0, "", "")
+    out = checkLineType("Thing: Attribute of Noun1", LineType.DEF, 1, 0, "", "")
     assert out.keyword == "Thing"
     assert out.types == ["Attribute"]
     assert out.parent == "Noun1"
 
 def test_processLine_constraint():
-    checkLineType("! Some constraint", "CONSTRAINT", 1, 0, "Some constraint", "")
-    checkLineType("\t! Some constraint", "CONSTRAINT", 1, 1, "Some constraint", "")
-    checkLineType("\t\t! Some constraint", "CONSTRAINT", 1, 2, "Some constraint", "")
+    checkLineType("! Some constraint", LineType.CONSTRAINT, 1, 0, "Some constraint", "")
+    checkLineType("\t! Some constraint", LineType.CONSTRAINT, 1, 1, "Some constraint", "")
+    checkLineType("\t\t! Some constraint", LineType.CONSTRAINT, 1, 2, "Some constraint", "")
 
-    checkLineType("! Some constraint  // comment", "CONSTRAINT", 1, 0, "Some constraint", "comment")
+    checkLineType("! Some constraint  // comment", LineType.CONSTRAINT, 1, 0, "Some constraint", "comment")
 
 def test_processLine_description():
-    #checkLineType("Some description", "DESC", 1, 0, "Some description", "")
-    checkLineType("\tSome description", "DESC", 1, 1, "Some description", "")
-    checkLineType("\t\tSome description", "DESC", 1, 2, "Some description", "")
+    #checkLineType("Some description", LineType.DESC, 1, 0, "Some description", "")
+    checkLineType("\tSome description", LineType.DESC, 1, 1, "Some description", "")
+    checkLineType("\t\tSome description", LineType.DESC, 1, 2, "Some description", "")
 
-    checkLineType("\tSome description  // comment", "DESC", 1, 1, "Some description", "comment")
+    checkLineType("\tSome description  // comment", LineType.DESC, 1, 1, "Some description", "comment")
 
 # Process line and compare with expected values (prefix 'x').
 def checkLineType(line, xType, xCost, xIndent, xLine, xComment):
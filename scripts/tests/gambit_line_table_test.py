@@ -0,0 +1,79 @@
+import glob
+import os
+import pytest
+
+from fake_gambit_parser import FakeGambitParser
+from gambit_calc import GambitCalc
+from gambit_line_table import LineTable
+from gambit_parser import GambitParser
+from gambit_vocab import GambitVocab
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_lineTable_roundTrip():
+    parser = FakeGambitParser()
+    parser.addDefLine("Term1", "Noun")
+    parser.addDescLine(1, "Description", "Comment")
+    parser.addBlankLine()
+    parser.addTemplateLine("Template", "Param", "Comment")
+
+    table = LineTable.fromLineInfo(parser.lineInfo)
+    assert len(table) == 4
+    for i in range(len(table)):
+        assert vars(table[i].toLineInfo()) == vars(parser.lineInfo[i])
+
+def test_lineTable_update():
+    parser = FakeGambitParser()
+    parser.addDefLine("Term1", "Noun")
+    table = LineTable.fromLineInfo(parser.lineInfo)
+
+    r = table[0]
+    assert r.cost == 1
+    r.cost = None
+    assert table[0].cost == None
+    r.tokens = None
+    assert table[0].tokens == None
+    r.tokens = []
+    assert table[0].tokens == []
+    assert table[0].types == ["Noun"]
+
+    # Changes to a default value must be assigned back to be stored.
+    r.tokens.append("Card")
+    assert table[0].tokens == []
+    r.tokens = ["Card"]
+    assert table[0].tokens == ["Card"]
+
+    # Costs and indents aren't limited to a byte.
+    r.cost = 300
+    r.indent = 300
+    assert (table[0].cost, table[0].indent) == (300, 300)
+
+    with pytest.raises(IndexError):
+        table[1]
+
+def test_lineTable_defHasDesc():
+    parser = FakeGambitParser()
+    parser.addDefLine("Term1", "Noun")
+    parser.addDescLine(1, "Description", "Comment")
+    parser.addDefLine("Term2", "Noun")
+    parser.addBlankLine()
+    table = LineTable.fromLineInfo(parser.lineInfo)
+
+    calc = GambitCalc(GambitVocab())
+    assert calc.defHasDesc(table, 0) == True
+    assert calc.defHasDesc(table, 2) == False
+
+def test_lineTable_corpus():
+    importFile = os.path.join(SRC_DIR, "_import.gm")
+    for path in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        expected = GambitParser({})
+        expected.loadImportableTerms(importFile)
+        expected.process(SRC_DIR, path)
+
+        parser = GambitParser({'compact': True})
+        parser.loadImportableTerms(importFile)
+        parser.process(SRC_DIR, path)
+        assert isinstance(parser.lineInfo, LineTable)
+        assert parser.calc.getSummary() == expected.calc.getSummary(), path
+        for (r, x) in zip(parser.lineInfo, expected.lineInfo):
+            assert vars(r.toLineInfo()) == vars(x), path
@@ -0,0 +1,74 @@
+import os
+import pytest
+import shutil
+
+from gambit_parse_cache import GambitParseCache
+from gambit_parser import GambitParser
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+IMPORT_FILE = os.path.join(SRC_DIR, "_import.gm")
+
+def test_parseCache_hit(tmp_path):
+    path = copyGame(tmp_path, "t/tic-tac-toe.gm")
+    cache = GambitParseCache(str(tmp_path / "cache"), IMPORT_FILE)
+
+    first = processGame(cache, path)
+    assert (cache.hits, cache.misses) == (0, 1)
+    second = processGame(cache, path)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert second.calc.getSummary() == first.calc.getSummary()
+    assert second.lines == first.lines
+    assert second.gameTitle == first.gameTitle
+    assert second.calc.vocab is second.vocab
+    assert second.vocab.referencedBy == first.vocab.referencedBy
+    assert [r.cost for r in second.lineInfo] == [r.cost for r in first.lineInfo]
+
+def test_parseCache_modified(tmp_path):
+    path = copyGame(tmp_path, "t/tic-tac-toe.gm")
+    cache = GambitParseCache(str(tmp_path / "cache"), IMPORT_FILE)
+    processGame(cache, path)
+
+    with open(path, 'a') as file:
+        file.write("\t// Modified\n")
+    processGame(cache, path)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(os.listdir(tmp_path / "cache")) == 1
+
+def test_parseCache_prefixName(tmp_path):
+    path = copyGame(tmp_path, "c/carcassonne.gm")
+    riverPath = copyGame(tmp_path, "c/carcassonne-river.gm")
+    cache = GambitParseCache(str(tmp_path / "cache"), IMPORT_FILE)
+    processGame(cache, riverPath)
+
+    # Saving "carcassonne" doesn't remove the "carcassonne-river" entry.
+    processGame(cache, path)
+    processGame(cache, riverPath)
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert len(os.listdir(tmp_path / "cache")) == 2
+
+def test_parseCache_gameImport(tmp_path):
+    copyGame(tmp_path, "d/dominion-first10.gm")
+    path = copyGame(tmp_path, "d/dominion-baseset.gm")
+    cache = GambitParseCache(str(tmp_path / "cache"), IMPORT_FILE)
+    processGame(cache, path)
+    processGame(cache, path)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Changing the imported game invalidates the entry.
+    with open(tmp_path / "d" / "dominion-first10.gm", 'a') as file:
+        file.write("\t// Modified\n")
+    processGame(cache, path)
+    assert (cache.hits, cache.misses) == (1, 2)
+
+def copyGame(tmp_path, name):
+    dest = tmp_path / name
+    os.makedirs(dest.parent, exist_ok=True)
+    shutil.copy(os.path.join(SRC_DIR, name), dest)
+    return str(dest)
+
+def processGame(cache, path):
+    parser = GambitParser({})
+    parser.loadImportableTerms(IMPORT_FILE)
+    cache.process(parser, os.path.dirname(os.path.dirname(path)), path)
+    return parser
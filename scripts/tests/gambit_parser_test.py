@@ -1,7 +1,11 @@
+import glob
+import os
 import pytest
 
+from gambit import LineType, VocabType
 from gambit_parser import GambitParser
 from gambit_line_processor import GambitLineProcessor
+from log import GambitError
 from unittest import mock
 
 #def mock_importFile(self, name):
@@ -10,59 +14,164 @@ from unittest import mock
 #@mock.patch.object(GambitParser, 'importFile', new=mock_importFile)
 #def test_processLine_import():
 #    parser = GambitParser({})
-#    checkLineType(parser, "#import file", "IMPORT", None, 0, "", "file")
+#    checkLineType(parser, "#import file", LineType.IMPORT, None, 0, "", "file")
 
 #def test_processLine_commentSpecial():
 #    parser = GambitParser({})
-#    checkLineType(parser, "// NAME: title", "NAME", None, 0, "", "title")
+#    checkLineType(parser, "// NAME: title", LineType.NAME, None, 0, "", "title")
 #    assert parser.gameTitle == "title"
 
 def test_processLine_templateDef():
     parser = GambitParser({})
-    checkLineType(parser, "NewVerb<Type>: Verb", "TEMPLATE", 1, 0, "", "")
-    checkVocab(parser, "NewVerb", ["LOCAL", "Verb", "Type"])
+    checkLineType(parser, "NewVerb<Type>: Verb", LineType.TEMPLATE, 1, 0, "", "")
+    checkVocab(parser, "NewVerb", VocabType.LOCAL, ["Verb"], param="Type")
 
 def test_processLine_def():
     parser = GambitParser({})
-    checkLineType(parser, "NewTerm: Noun", "DEF", 1, 0, "", "")
-    checkVocab(parser, "NewTerm", ["LOCAL", ["Noun"]])
+    checkLineType(parser, "NewTerm: Noun", LineType.DEF, 1, 0, "", "")
+    checkVocab(parser, "NewTerm", VocabType.LOCAL, ["Noun"])
     checkAlt(parser, "NewTerm", "NewTerms")
 
 def test_processLine_defUnknownType():
     parser = GambitParser({})
     with pytest.raises(Exception):
-        checkLineType(parser, "NewTerm: UnknownType", "DEF", 1, 0, "", "")
+        checkLineType(parser, "NewTerm: UnknownType", LineType.DEF, 1, 0, "", "")
 
 def test_processLine_defAlt():
     parser = GambitParser({})
-    checkLineType(parser, "NewTerm|AltTerm: Noun", "DEF", 1, 0, "", "")
-    checkVocab(parser, "NewTerm", ["LOCAL", ["Noun"]])
+    checkLineType(parser, "NewTerm|AltTerm: Noun", LineType.DEF, 1, 0, "", "")
+    checkVocab(parser, "NewTerm", VocabType.LOCAL, ["Noun"])
     checkAlt(parser, "NewTerm", "AltTerm")
 
 def test_processLine_defMultiType():
     parser = GambitParser({})
     parser.processLine("Noun1: Noun")
     parser.processLine("Noun2: Noun")
-    checkLineType(parser, "Noun3: Noun1,Noun2", "DEF", 1, 0, "", "")
+    checkLineType(parser, "Noun3: Noun1,Noun2", LineType.DEF, 1, 0, "", "")
 
 def test_processLine_defParent():
     parser = GambitParser({})
     parser.processLine("Noun1: Noun")
-    checkLineType(parser, "Thing: Attribute of Noun1", "DEF", 1, 0, "", "")
-    checkVocab(parser, "Thing", ["LOCAL", ["Attribute"], "Noun1"])
+    checkLineType(parser, "Thing: Attribute of Noun1", LineType.DEF, 1, 0, "", "")
+    checkVocab(parser, "Thing", VocabType.LOCAL, ["Attribute"], parent="Noun1")
 
 def test_processLine_defParentUnknown():
     parser = GambitParser({})
     with pytest.raises(Exception):
-        checkLineType(parser, "Thing: Attribute of Noun1", "DEF", 1, 0, "", "")
+        checkLineType(parser, "Thing: Attribute of Noun1", LineType.DEF, 1, 0, "", "")
 
 def test_processLine_constraint():
     parser = GambitParser({})
-    checkLineType(parser, "! Some constraint", "CONSTRAINT", 1, 0, "Some constraint", "")
+    checkLineType(parser, "! Some constraint", LineType.CONSTRAINT, 1, 0, "Some constraint", "")
 
 def test_processLine_description():
     parser = GambitParser({})
-    checkLineType(parser, "\tSome description", "DESC", 1, 1, "Some description", "")
+    checkLineType(parser, "\tSome description", LineType.DESC, 1, 1, "Some description", "")
+
+def test_processStream_corpus():
+    for path in corpusFiles():
+        batch = createParser()
+        batch.process(SRC_DIR, path)
+
+        stream = createParser()
+        stream.processStream(SRC_DIR, path)
+        assert stream.calc.getSummary() == batch.calc.getSummary(), path
+        assert stream.vocab.referencedBy == batch.vocab.referencedBy, path
+        assert stream.maxIndent == batch.maxIndent, path
+        assert len(stream.lines) == 0
+
+        costs = [r.cost for r in stream.streamLines(path)]
+        assert costs == [r.cost for r in batch.lineInfo], path
+
+def test_processLines_corpus():
+    for path in corpusFiles():
+        fused = createParser()
+        fused.process(SRC_DIR, path)
+
+        separate = createParser()
+        separate.currentDir = SRC_DIR
+        with open(path, 'r') as file:
+            for line in file:
+                separate.processLine(line)
+        separate.extractAllReferences()
+        separate.updateCosts()
+
+        assert fused.calc.getSummary() == separate.calc.getSummary(), path
+        assert fused.calc.costTotal == separate.calc.costTotal, path
+        assert fused.vocab.referencedBy == separate.vocab.referencedBy, path
+        assert [r.cost for r in fused.lineInfo] == [r.cost for r in separate.lineInfo], path
+        assert [r.tokens for r in fused.lineInfo] == [r.tokens for r in separate.lineInfo], path
+
+def test_replaceLines_desc(tmp_path):
+    parser = checkReplaceLines(tmp_path, None, "t/tic-tac-toe.gm", 11, 12, [])
+    checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 20, 20, ["\tTicTacToken\n", "\tPlaceBoard twice\n"])
+
+def test_replaceLines_newTerm(tmp_path):
+    parser = checkReplaceLines(tmp_path, None, "t/tic-tac-toe.gm", 19, 19, ["Marker: Noun\n"])
+    parser = checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 22, 22, ["\tMarker\n"])
+    parser = checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 15, 16, ["\tPlayer Markers used to claim a space\n"])
+    # Removing the DEF and its uses.
+    parser = checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 15, 16, ["\tPlayer tokens used to claim a space\n"])
+    parser = checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 22, 23, [])
+    checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 19, 20, [])
+
+def test_replaceLines_section(tmp_path):
+    parser = checkReplaceLines(tmp_path, None, "t/tic-tac-toe.gm", 8, 9, ["SECTION: Terms\n"])
+    checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 8, 9, ["SECTION: Vocabulary\n"])
+
+def test_replaceLines_maxIndent(tmp_path):
+    parser = checkReplaceLines(tmp_path, None, "t/tic-tac-toe.gm", 25, 25, ["\t\t\t\tPlaceBoard\n"])
+    assert parser.maxIndent == 4
+    parser = checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 25, 26, [])
+    assert parser.maxIndent == 2
+
+def test_replaceLines_duplicateDef(tmp_path):
+    # A term that is defined twice collects references from both definitions.
+    parser = checkReplaceLines(tmp_path, None, "t/tic-tac-toe.gm", 40, 40, ["Square: Noun\n", "\tOne of the TicTacTokens\n"])
+    checkReplaceLines(tmp_path, parser, "t/tic-tac-toe.gm", 12, 13, ["Square: Part of TicTacToeBoard\n", "\tA Symbol\n"])
+
+def test_replaceLines_errorLine(capsys):
+    parser = createParser()
+    parser.process(SRC_DIR, os.path.join(SRC_DIR, "t/tic-tac-toe.gm"))
+    with pytest.raises(GambitError):
+        parser.replaceLines(10, 11, ["TicTacToeBoard: Nope\n"])
+    assert "LINE 11: TicTacToeBoard: Nope" in capsys.readouterr().out
+
+# Apply an edit with replaceLines and compare the result with processing the
+# edited file. |parser| has the previous edits, or is None to start a new
+# edit sequence.
+def checkReplaceLines(tmp_path, parser, name, start, end, newLines):
+    if parser is None:
+        parser = createParser()
+        parser.process(SRC_DIR, os.path.join(SRC_DIR, name))
+    parser.replaceLines(start, end, newLines)
+
+    path = tmp_path / "edited.gm"
+    with open(path, 'w') as file:
+        file.write("\n".join(parser.lines) + "\n")
+    expected = createParser()
+    expected.process(SRC_DIR, str(path))
+
+    assert parser.lines == expected.lines
+    assert [r.lineNum for r in parser.lineInfo] == [r.lineNum for r in expected.lineInfo]
+    assert [r.cost for r in parser.lineInfo] == [r.cost for r in expected.lineInfo]
+    assert [r.tokens for r in parser.lineInfo] == [r.tokens for r in expected.lineInfo]
+    assert parser.vocab.vocab == expected.vocab.vocab
+    assert parser.vocab.referencedBy == expected.vocab.referencedBy
+    assert parser.calc.getSummary() == expected.calc.getSummary()
+    assert parser.maxIndent == expected.maxIndent
+    assert parser.calc.costTotal == expected.calc.costTotal
+    return parser
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def corpusFiles():
+    return sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm")))
+
+def createParser():
+    parser = GambitParser({})
+    parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+    return parser
 
 # Process line and compare with expected values (prefix 'x').
 def checkLineType(parser, line, xType, xCost, xIndent, xLine, xComment):
@@ -75,8 +184,13 @@ def checkLineType(parser, line, xType, xCost, xIndent, xLine, xComment):
         assert out['comment'] == xComment
     return out
 
-def checkVocab(parser, term, info):
-    assert parser.vocab.vocab[term] == info
+def checkVocab(parser, term, scope, types, parent=None, param=None):
+    entry = parser.vocab.lookup(term)
+    assert entry.name == term
+    assert entry.scope == scope
+    assert entry.types == types
+    assert entry.parent == parent
+    assert entry.param == param
 
 def checkAlt(parser, term, plural):
     assert parser.vocab.vocabPlural[plural] == term
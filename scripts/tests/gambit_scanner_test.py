@@ -0,0 +1,57 @@
+import glob
+import os
+import pytest
+
+from gambit import LineCategory
+from gambit_parser import GambitParser
+from gambit_scanner import GambitScanner
+from gambit_vocab import GambitVocab
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_scan():
+    vocab = GambitVocab()
+    vocab.addDef("Card", None, ["Noun"], None)
+    vocab.addDef("Mouse", "Mice", ["Noun"], None)
+    vocab.addTemplate("Produce", "Item")
+    vocab.addEnumValue("$100")
+    scanner = GambitScanner(vocab)
+
+    assert scanner.scan("Take a Card") == [(7, 11, "Card")]
+    assert scanner.scan("(Mice's) Cards, CardX xCard") == [(1, 5, "Mouse"), (9, 14, "Card")]
+    assert scanner.scan('Say "Card" to the Card-like Mouse') == [(18, 22, "Card"), (28, 33, "Mouse")]
+    assert scanner.scan("Produce<Card> (Produce<Mouse>)") == [(0, 7, "Produce"), (8, 12, "Card"), (15, 22, "Produce")]
+    assert scanner.scan("Pay $100 or $100.") == [(4, 8, "$100")]
+    assert scanner.scan('Unterminated "Card') == []
+
+    # The trie is rebuilt when terms are added.
+    assert scanner.scan("A Deck") == []
+    vocab.addDef("Deck", None, ["Noun"], None)
+    assert scanner.scan("A Deck") == [(2, 6, "Deck")]
+
+class ReferenceRecorder:
+    def __init__(self, vocab):
+        self.vocab = vocab
+        self.refs = []
+
+    def addReference(self, term, refBy):
+        self.refs.append(term)
+
+    def resolveWord(self, word):
+        return self.vocab.resolveWord(word)
+
+# The scanner must find the same references as extractReference.
+def test_scan_corpus():
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        parser = GambitParser({})
+        parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+        parser.process(SRC_DIR, filepath)
+        scanner = GambitScanner(parser.vocab)
+        for info in parser.lineInfo:
+            texts = [info.lineComment]
+            if info.lineType in LineCategory.TEXT:
+                texts.append(info.line)
+            for text in [t for t in texts if t]:
+                recorder = ReferenceRecorder(parser.vocab)
+                info.extractReference(text, None, recorder, True)
+                assert [term for (start, end, term) in scanner.scan(text)] == recorder.refs, text
@@ -0,0 +1,84 @@
+import os
+import pytest
+
+from gambit_def_index import GambitDefIndex
+from gambit_parser import GambitParser
+from gambit_variants import GambitVariantScorer, VariantPatch
+from log import GambitError
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+IMPORT_FILE = os.path.join(SRC_DIR, "_import.gm")
+GAME_PATH = os.path.join(SRC_DIR, "d", "dominion-first10.gm")
+
+def test_variants_match_full_parse(tmp_path):
+    scorer = GambitVariantScorer(SRC_DIR, GAME_PATH, IMPORT_FILE)
+    baseLines = list(scorer.parser.lines)
+    variants = {
+        "base": [],
+        "no-cards": [VariantPatch.removeSubsection("Cards")],
+        "one-card": [VariantPatch.replaceSubsection("Cards", [
+            "",
+            "Market: ActionCard",
+            "\tDrawCard",
+            "\tGainCoin x2",
+        ])],
+        "house-rules": [
+            VariantPatch.addLines(9, ["// House rules", ""]),
+            VariantPatch.replaceLines(26, 27, ["\tTreasureCard with Value = 2 Coins", "\t// Worth more"]),
+            VariantPatch.removeLines(182, 183),
+        ],
+        # Invalid since Silver is used by Merchant.
+        "no-silver": [VariantPatch.removeLines(25, 27)],
+    }
+    results = scorer.scoreAll(variants)
+
+    for (name, patches) in variants.items():
+        try:
+            expected = parseLines(tmp_path, applyPatches(scorer, baseLines, patches)).calc.getSummary()
+        except GambitError:
+            expected = None
+        assert results[name] == expected, name
+    assert results["no-silver"] is None
+    assert results["one-card"] is not None
+    assert results["house-rules"] is not None
+    assert results["no-cards"][0] < results["base"][0]
+    # The parser is restored after each variant.
+    assert scorer.parser.lines == baseLines
+    assert scorer.parser.calc.getSummary() == scorer.baseSummary
+    # The DEF index is rebuilt after the edits.
+    index = scorer.parser.getDefIndex()
+    expected = GambitDefIndex(scorer.parser.lineInfo)
+    assert index.hasDescs == expected.hasDescs
+    assert index.ends == expected.ends
+    assert index.keywords == expected.keywords
+    assert scorer.parser.getDefIndex() is index
+
+def test_variants_error():
+    scorer = GambitVariantScorer(SRC_DIR, GAME_PATH, IMPORT_FILE)
+    results = scorer.scoreAll({
+        "missing": [VariantPatch.removeSubsection("Missing")],
+        "overlap": [VariantPatch.removeLines(10, 20), VariantPatch.removeLines(15, 25)],
+        "ok": [VariantPatch.removeLines(10, 11)],
+    })
+    assert results["missing"] is None
+    assert results["overlap"] is None
+    assert results["ok"] is not None
+    with pytest.raises(GambitError):
+        scorer.score([VariantPatch.removeLines(-1, 2)])
+    assert scorer.parser.calc.getSummary() == scorer.baseSummary
+
+# Apply |patches| to |lines| without using the parser.
+def applyPatches(scorer, lines, patches):
+    lines = list(lines)
+    for (start, end, newLines) in reversed(scorer.resolvePatches(patches)):
+        lines[start:end] = [x.rstrip() for x in newLines]
+    return lines
+
+def parseLines(tmp_path, lines):
+    path = tmp_path / "variant.gm"
+    with open(path, 'w') as file:
+        file.write("\n".join(lines) + "\n")
+    parser = GambitParser({})
+    parser.loadImportableTerms(IMPORT_FILE)
+    parser.process(SRC_DIR, str(path))
+    return parser
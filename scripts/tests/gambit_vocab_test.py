@@ -0,0 +1,124 @@
+import glob
+import os
+import pickle
+import pytest
+
+from gambit_parser import GambitParser
+from gambit_tokenizer import GambitTokenizer
+from gambit_vocab import GambitVocab, calcPlural
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+IMPORT_FILE = os.path.join(SRC_DIR, "_import.gm")
+
+def test_importable_shared():
+    vocab1 = GambitVocab()
+    vocab1.loadImportableTerms(IMPORT_FILE)
+    vocab2 = GambitVocab()
+    vocab2.loadImportableTerms(IMPORT_FILE)
+
+    assert vocab1.isImportable("Player")
+    assert vocab1.importable.maps[1] is vocab2.importable.maps[1]
+    with pytest.raises(TypeError):
+        vocab1.importable.maps[1]["NewTerm"] = None
+
+def test_importable_overlay():
+    vocab1 = GambitVocab()
+    vocab1.loadImportableTerms(IMPORT_FILE)
+    vocab2 = GambitVocab()
+    vocab2.loadImportableTerms(IMPORT_FILE)
+
+    vocab1.addImportable("NewTerm", "NewTermz")
+    assert vocab1.isImportable("NewTerm")
+    assert not vocab2.isImportable("NewTerm")
+
+def test_importable_pickle():
+    vocab = GambitVocab()
+    vocab.loadImportableTerms(IMPORT_FILE)
+    vocab.addImportable("NewTerm", None)
+
+    copy = pickle.loads(pickle.dumps(vocab))
+    assert copy.isImportable("NewTerm")
+    assert copy.isImportable("Player")
+    assert copy.importable.maps[1] is vocab.importable.maps[1]
+
+def test_isDefinedTerm_cache():
+    vocab = GambitVocab()
+    assert not vocab.isDefinedTerm("Card")
+    assert not vocab.isDefinedTerm("Card")
+    assert vocab.getCacheStats()[0:2] == (1, 1)
+
+    # Adding a term invalidates the cache.
+    vocab.addDef("Card", None, ["Noun"], None)
+    assert vocab.isDefinedTerm("Card")
+    assert vocab.isDefinedTerm("Cards")
+    assert vocab.isDefinedTerm("Card<Noun>")
+    assert vocab.getCacheStats()[0:2] == (1, 4)
+
+def test_symbol_table():
+    vocab = GambitVocab()
+    vocab.addDef("Card", None, ["Noun"], None)
+    vocab.addDef("Deck", None, ["Noun"], None)
+    entry = vocab.lookup("Card")
+    assert vocab.names[entry.id] == "Card"
+    assert vocab.intern("Card") == entry.id
+
+    # Repeated references by the same term are stored once.
+    vocab.addReference("Card", "Deck")
+    vocab.addReference("Card", "Deck")
+    vocab.addReference("Card", "Setup")
+    vocab.addReference("Card", "Deck")
+    # Only a repeat of the last referrer is skipped when adding, and the
+    # other duplicates are removed when the ids are read.
+    assert len(entry.refs) == 3
+    assert entry.getRefIds().tolist() == [vocab.intern("Deck"), vocab.intern("Setup")]
+    assert len(entry.refs) == 2
+    assert vocab.getReferencesTo("Card") == ["Deck", "Setup"]
+    assert vocab.referencedBy["Card"] == set(["Deck", "Setup"])
+    assert vocab.getReferencesTo("Deck") == []
+
+    vocab.removeReferencesBy(["Deck"])
+    assert vocab.getReferencesTo("Card") == ["Setup"]
+
+    # A redefined term keeps its id, but loses its references.
+    vocab.addDef("Card", None, ["Noun"], None)
+    assert vocab.lookup("Card").id == entry.id
+    assert vocab.getReferencesTo("Card") == []
+
+@pytest.mark.parametrize("key, plural", [
+    ("Card", "Cards"), ("Bonus", "Bonuses"), ("Index", "Indexes"), ("Pass", "Pass"),
+    ("City", "Cities"), ("Donkey", "Donkeys"), ("Domino", "Dominoes"),
+])
+def test_calcPlural(key, plural):
+    assert calcPlural(key) == plural
+
+def test_resolveWord():
+    vocab = GambitVocab()
+    vocab.addDef("Card", None, ["Noun"], None)
+    vocab.addDef("Mouse", "Mice", ["Noun"], None)
+    vocab.addEnumValue("$100")
+    assert vocab.resolveWord("Card") == ("", "Card", "", "Card")
+    assert vocab.resolveWord("(Cards),") == ("(", "Cards", "),", "Card")
+    assert vocab.resolveWord("Card's") == ("", "Card", "'s", "Card")
+    assert vocab.resolveWord("Cards'.") == ("", "Cards", "'.", "Card")
+    assert vocab.resolveWord("Mice's") == ("", "Mice", "'s", "Mouse")
+    assert vocab.resolveWord("Card-like") == ("", "Card", "-like", "Card")
+    assert vocab.resolveWord("$100") == ("", "$100", "", "$100")
+    assert vocab.resolveWord("the") == ("", "the", "", None)
+    assert vocab.resolveWord("Deck.") == ("", "Deck", ".", None)
+    assert vocab.resolveWord("--") == ("", "--", "", None)
+
+# resolveWord must split and normalize every word in the corpus the same
+# way as extractKeyword + normalize.
+def test_resolveWord_corpus():
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        parser = GambitParser({})
+        parser.loadImportableTerms(IMPORT_FILE)
+        parser.process(SRC_DIR, filepath)
+        vocab = parser.vocab
+        for line in parser.lines:
+            for word in GambitTokenizer.split(line):
+                (prefix, keyword, postfix) = GambitTokenizer.extractKeyword(word)
+                canonicalForm = vocab.normalize(keyword)
+                if not vocab.contains(canonicalForm):
+                    canonicalForm = None
+                assert vocab.resolveWord(word) == (prefix, keyword, postfix, canonicalForm), word
@@ -0,0 +1,43 @@
+import os
+import pytest
+
+from game_manifest import GameManifest
+
+def test_manifest_stale(tmp_path):
+    (srcDir, outputDir) = createGames(tmp_path)
+    manifestPath = str(tmp_path / "manifest.json")
+    manifest = GameManifest(manifestPath, srcDir, outputDir)
+    assert manifest.isStale("expansion")
+
+    # Missing outputs are rebuilt.
+    manifest.update("expansion")
+    assert manifest.isStale("expansion")
+    writeFile(tmp_path / "games" / "e" / "expansion.html", "")
+    assert not manifest.isStale("expansion")
+
+    # The manifest is reloaded by the next run.
+    manifest.save()
+    manifest = GameManifest(manifestPath, srcDir, outputDir)
+    assert not manifest.isStale("expansion")
+
+    # Changing a GAME-IMPORT source makes the game stale.
+    writeFile(tmp_path / "src" / "b" / "base-game.gm", "Card: Noun\nCube: Noun\n")
+    assert manifest.isStale("expansion")
+
+def test_manifest_inputs(tmp_path):
+    (srcDir, outputDir) = createGames(tmp_path)
+    manifest = GameManifest(str(tmp_path / "manifest.json"), srcDir, outputDir)
+    inputs = [os.path.relpath(p, srcDir) for p in manifest.calcInputs("expansion")]
+    assert inputs == ["e/expansion.gm", "e/expansion.xml", "_import.gm", "b/base-game.gm"]
+
+def createGames(tmp_path):
+    writeFile(tmp_path / "src" / "_import.gm", "Player: Noun\n")
+    writeFile(tmp_path / "src" / "b" / "base-game.gm", "Card: Noun\n")
+    writeFile(tmp_path / "src" / "e" / "expansion.gm", "GAME-IMPORT: BaseGame\n")
+    writeFile(tmp_path / "src" / "e" / "expansion.xml", "<game />\n")
+    return (str(tmp_path / "src"), str(tmp_path / "games"))
+
+def writeFile(path, text):
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(text)
@@ -0,0 +1,66 @@
+import os
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gambit_parser import GambitParser
+from gambit_token import TokenType
+from game_similarity import MinHasher, SimilarityIndex, calcFeatures, normalizeDesc
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_normalizeDesc():
+    tokens = ["Take", "2", [TokenType.REF, "Card", "", "Cards", "."], '"Draw"',
+        [TokenType.TEMPLATE_REF, "Produce", "Stone"], "--"]
+    assert normalizeDesc(tokens) == "take 2 Card Produce<Stone>"
+
+def test_minhash_estimate():
+    hasher = MinHasher(256)
+    a = set([f"item{i}" for i in range(300)])
+    b = set([f"item{i}" for i in range(100, 400)])
+    similarity = np.mean(hasher.signature(a) == hasher.signature(b))
+    assert abs(similarity - 0.5) < 0.1
+    assert np.array_equal(hasher.signature(a), hasher.signature(sorted(a)))
+    assert np.mean(hasher.signature([]) == hasher.signature(a)) == 0
+
+def test_lsh_near_duplicates():
+    r = random.Random(1)
+    index = SimilarityIndex(32, 4)
+    hasher = MinHasher(index.getNumPerm())
+    sets = [set([f"w{r.randrange(100000)}" for j in range(100)]) for i in range(200)]
+    # Make set 1 a near duplicate of set 0.
+    sets[1] = set(list(sets[0])[:90] + list(sets[1])[:10])
+    for (i, features) in enumerate(sets):
+        index.add(f"game{i:03}", hasher.signature(features))
+
+    similar = index.findSimilar(0.5)
+    assert [(id1, id2) for (id1, id2, s) in similar] == [("game000", "game001")]
+    assert similar[0][2] > 0.7
+    # Only a few of the 19900 pairs are compared.
+    assert len(index.findCandidates()) < 100
+
+def test_lsh_empty_sets():
+    index = SimilarityIndex(32, 4)
+    hasher = MinHasher(index.getNumPerm())
+    index.add("a", hasher.signature([]))
+    index.add("b", hasher.signature([]))
+    index.add("c", hasher.signature(["x"]))
+    assert index.ids == ["c"]
+    assert index.findSimilar() == []
+
+def test_corpus_variants():
+    features = {}
+    for id in ["carcassonne", "carcassonne-river", "catan"]:
+        parser = GambitParser({})
+        parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+        parser.process(SRC_DIR, os.path.join(SRC_DIR, id[0], id + ".gm"))
+        features[id] = calcFeatures(parser)
+    assert "term:Player" in features["carcassonne"]
+    assert any([f.startswith("desc:") for f in features["carcassonne"]])
+
+    index = SimilarityIndex()
+    hasher = MinHasher(index.getNumPerm())
+    for (id, f) in features.items():
+        index.add(id, hasher.signature(f))
+    assert [(id1, id2) for (id1, id2, s) in index.findSimilar()] == [("carcassonne", "carcassonne-river")]
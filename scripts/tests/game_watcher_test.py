@@ -0,0 +1,55 @@
+import os
+import pytest
+
+from game_watcher import GameWatcher
+
+class FakeGameMgr:
+    def __init__(self, ids):
+        self.gameOrder = ids
+        self.games = {}
+
+class FakeAnalyzer:
+    def __init__(self, ids):
+        self.gameMgr = FakeGameMgr(ids)
+        self.parseCache = None
+        self.termIndex = None
+        self.processed = []
+
+    def processOne(self, id, options):
+        self.processed.append(id)
+
+def test_watcher_dependents(tmp_path):
+    srcDir = createGames(tmp_path)
+    analyzer = FakeAnalyzer(["base-game", "expansion", "other"])
+    watcher = GameWatcher(analyzer, srcDir, {}, ["base-game"])
+    assert watcher.ids == ["base-game", "expansion"]
+
+def test_watcher_poll(tmp_path):
+    srcDir = createGames(tmp_path)
+    analyzer = FakeAnalyzer(["base-game", "expansion", "other"])
+    watcher = GameWatcher(analyzer, srcDir, {}, ["base-game", "expansion", "other"])
+    watcher.update()
+    assert watcher.poll() == []
+
+    # Changing an imported game regenerates the games that import it.
+    writeFile(tmp_path / "b" / "base-game.gm", "Card: Noun\nCube: Noun\n")
+    ids = watcher.poll()
+    assert ids == ["base-game", "expansion"]
+    watcher.regenerate(ids)
+    assert analyzer.processed == ["base-game", "expansion"]
+    assert watcher.poll() == []
+
+    writeFile(tmp_path / "o" / "other.xml", "<game />\n")
+    assert watcher.poll() == ["other"]
+
+def createGames(tmp_path):
+    writeFile(tmp_path / "_import.gm", "Player: Noun\n")
+    writeFile(tmp_path / "b" / "base-game.gm", "Card: Noun\n")
+    writeFile(tmp_path / "e" / "expansion.gm", "GAME-IMPORT: BaseGame\n")
+    writeFile(tmp_path / "o" / "other.gm", "Token: Noun\n")
+    return str(tmp_path)
+
+def writeFile(path, text):
+    os.makedirs(path.parent, exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(text)
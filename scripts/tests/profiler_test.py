@@ -0,0 +1,95 @@
+import glob
+import json
+import os
+import pytest
+
+import gambit_parser
+from gambit_parser import GambitParser
+from profiler import NULL_SPAN, Profiler
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_profiler_disabled():
+    profiler = Profiler()
+    assert profiler.span("lex") is NULL_SPAN
+    with profiler.span("lex"):
+        pass
+    assert profiler.spans == {}
+
+def test_profiler_spans(tmp_path):
+    profiler = Profiler()
+    profiler.enable()
+    profiler.setGame("a")
+    with profiler.span("lex"):
+        pass
+    with profiler.span("lex"):
+        pass
+    profiler.setGame(None)
+    with profiler.span("index"):
+        pass
+    # Spans recorded in another process.
+    profiler.addGame("b", {"lex": [3, 0.5]})
+
+    assert profiler.spans["lex"][0] == 5
+    assert profiler.spans["index"][0] == 1
+    assert list(profiler.games) == ["a", "b"]
+    assert profiler.getGameSpans("a")["lex"][0] == 2
+    assert profiler.getGameSpans("b") == {"lex": [3, 0.5]}
+
+    path = tmp_path / "profile.json"
+    profiler.save(str(path))
+    with open(path) as file:
+        report = json.load(file)
+    assert report["run"]["lex"]["count"] == 5
+    assert report["games"]["b"]["lex"] == {"count": 3, "total_ms": 500.0}
+    assert not "index" in report["games"]["a"]
+
+def test_profiler_nested(capsys):
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.span("parse"):
+        with profiler.span("lex"):
+            pass
+    with profiler.span("html"):
+        pass
+    assert sorted(profiler.spans) == ["html", "parse", "parse/lex"]
+    assert profiler.openSpans == []
+
+    # Nested spans are listed after their parent, without a percentage.
+    profiler.printSummary({
+        "elapsed_ms": 100.0,
+        "run": {
+            "html": {"count": 1, "total_ms": 30.0},
+            "parse/lex": {"count": 1, "total_ms": 40.0},
+            "parse": {"count": 1, "total_ms": 60.0},
+        },
+    })
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split()[0] for line in lines[1:4]] == ["parse", "parse/lex", "html"]
+    assert lines[1].split()[-1] == "60.0"
+    assert lines[2].split()[-1] == "40.0"
+
+def test_process_profiled_corpus(monkeypatch):
+    profiler = Profiler()
+    profiler.enable()
+    for filepath in sorted(glob.glob(os.path.join(SRC_DIR, "*", "*.gm"))):
+        expected = createParser()
+        expected.process(SRC_DIR, filepath)
+
+        monkeypatch.setattr(gambit_parser, "profiler", profiler)
+        parser = createParser()
+        parser.process(SRC_DIR, filepath)
+        monkeypatch.undo()
+
+        assert parser.lines == expected.lines
+        assert [r.cost for r in parser.lineInfo] == [r.cost for r in expected.lineInfo], filepath
+        assert [r.tokens for r in parser.lineInfo] == [r.tokens for r in expected.lineInfo], filepath
+        assert parser.vocab.referencedBy == expected.vocab.referencedBy
+        assert parser.calc.getSummary() == expected.calc.getSummary()
+        assert parser.maxIndent == expected.maxIndent
+    assert sorted(profiler.spans) == ["lex+vocab", "refs+costs"]
+
+def createParser():
+    parser = GambitParser({})
+    parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+    return parser
@@ -0,0 +1,48 @@
+import os
+import pytest
+
+from gambit import VocabType
+from gambit_parser import GambitParser
+from term_index import TermIndex, collectTerms
+
+SRC_DIR = os.path.join(os.path.dirname(__file__), "../../src")
+
+def test_termIndex(tmp_path):
+    path = str(tmp_path / "terms.db")
+    index = TermIndex(path)
+    index.updateGame("a", [("Deck", VocabType.IMPORT, 5), ("Worker", VocabType.LOCAL, 10),
+            ("Worker", VocabType.LOCAL, 20), ("WorkerSpot", VocabType.LOCAL, 30)])
+    index.updateGame("b", [("Deck", VocabType.IMPORT, 3), ("Worker", VocabType.GAME_IMPORT, 4)])
+    index.save()
+    index.close()
+
+    index = TermIndex(path)
+    assert index.getGames() == ["a", "b"]
+    assert index.find("Deck") == [("Deck", "a", VocabType.IMPORT, [5]), ("Deck", "b", VocabType.IMPORT, [3])]
+    assert index.find("Worker", VocabType.LOCAL) == [("Worker", "a", VocabType.LOCAL, [10, 20])]
+    assert [(t, g) for (t, g, s, l) in index.find("Work*")] == [("Worker", "a"), ("Worker", "b"), ("WorkerSpot", "a")]
+    assert index.find("Missing") == []
+
+    # Updating a game replaces all of its entries.
+    index.updateGame("a", [("Card", VocabType.IMPORT, 6)])
+    assert index.getTerms("a") == [("Card", VocabType.IMPORT, [6])]
+    assert index.find("Worker") == [("Worker", "b", VocabType.GAME_IMPORT, [4])]
+
+    index.removeOtherGames(["a"])
+    assert index.getGames() == ["a"]
+    assert index.find("Deck") == []
+
+def test_collectTerms():
+    parser = GambitParser({})
+    parser.loadImportableTerms(os.path.join(SRC_DIR, "_import.gm"))
+    parser.process(SRC_DIR, os.path.join(SRC_DIR, "d", "dominion-first10.gm"))
+    terms = collectTerms(parser, SRC_DIR)
+
+    # Every term in the vocab (except for the base types) is in the index.
+    names = set([term for (term, scope, lineNum) in terms])
+    for (term, entry) in parser.vocab.vocab.items():
+        if entry.scope != VocabType.BASE:
+            assert term in names
+    for (term, scope, lineNum) in terms:
+        if scope == VocabType.LOCAL:
+            assert term in parser.lines[lineNum - 1]